@@ -24,12 +24,18 @@ from modules.module_config import load_config
 from modules.module_character import CharacterManager
 from modules.module_memory import MemoryManager
 from modules.module_stt import STTManager
-from modules.module_tts import update_tts_settings
+from modules.module_tts import update_tts_settings, prerender_phrases, PROCESSING_PHRASE, get_phrase_cache_stats
+from modules.module_fastpath import get_fastpath_stats
 from modules.module_main import initialize_managers, wake_word_callback, utterance_callback, post_utterance_callback, start_bt_controller_thread, start_discord_bot, process_discord_message_callback
 from modules.module_vision import initialize_blip
-from modules.module_llm import initialize_manager_llm
+from modules.module_llm import initialize_manager_llm, save_llm_cache, get_router_stats, get_scheduler_metrics, get_llm_cache_stats
 from modules.module_ui import UIManager
 from modules.module_battery import BatteryModule
+from modules.module_http import close_all as close_http_sessions, get_http_metrics
+from modules.module_engine import shutdown_tools, get_intent_cache_stats, get_tool_stats
+from modules.module_audio import close_audio_outputs
+from modules.module_emotion import get_emotion_stats
+from modules.module_messageQue import queue_message
 import modules.module_chatui
 
 import logging  # This will hide INFO and DEBUG messages
@@ -71,6 +77,27 @@ def init_app():
     if CONFIG['TTS']['ttsoption'] == 'xttsv2':
         update_tts_settings(CONFIG['TTS']['ttsurl'])
 
+def log_runtime_stats():
+    """
+    Print the performance counters collected during this session (called on shutdown).
+    """
+    stats_sources = [
+        ("LLM backends", get_router_stats),
+        ("HTTP hosts", get_http_metrics),
+        ("LLM scheduler", get_scheduler_metrics),
+        ("Tool argument fast path", get_fastpath_stats),
+        ("LLM side-call cache", get_llm_cache_stats),
+        ("Emotion classifier", get_emotion_stats),
+        ("Intent cache", get_intent_cache_stats),
+        ("Tools", get_tool_stats),
+        ("Phrase cache", get_phrase_cache_stats),
+    ]
+    for name, get_stats in stats_sources:
+        try:
+            queue_message(f"STATS: {name}: {get_stats()}")
+        except Exception as e:
+            queue_message(f"ERROR: Could not read {name} stats: {e}")
+
 def start_discord_in_thread():
     """
     Start the Discord bot in a separate thread to prevent blocking.
@@ -108,6 +135,9 @@ if __name__ == "__main__":
     stt_manager.set_utterance_callback(utterance_callback)
     stt_manager.set_post_utterance_callback(post_utterance_callback)
 
+    # Render fixed phrases in the background so acknowledgements play without synthesis latency
+    prerender_phrases(list(stt_manager.WAKE_WORD_RESPONSES) + [PROCESSING_PHRASE])
+
     #DISCORD Callback
     if CONFIG['DISCORD']['enabled'] == 'True':
         start_discord_in_thread()
@@ -148,9 +178,14 @@ if __name__ == "__main__":
         # executor.shutdown(wait=True)
 
     finally:
+        log_runtime_stats()
         ui_manager.stop()
         stt_manager.stop()
         battery.stop()
+        shutdown_tools()
+        close_audio_outputs()
+        close_http_sessions()
+        save_llm_cache()
         if bt_controller_thread is not None:
             bt_controller_thread.join(timeout=5)
         queue_message(f"INFO: All threads and executor stopped gracefully.")
@@ -1,5 +1,4 @@
 import pygame
-import requests
 import cv2
 import numpy as np
 import threading
@@ -8,6 +7,7 @@ from io import BytesIO
 from PIL import Image
 import socket
 from module_config import load_config
+from modules.module_http import http_get
 
 CONFIG = load_config()
 target_fps = CONFIG['UI']['target_fps']
@@ -51,7 +51,7 @@ class StreamingAvatar:
             start_time = time.time()  # Track frame start time
 
             try:
-                response = requests.get(self.stream_url, stream=True, timeout=5)
+                response = http_get(self.stream_url, stream=True, timeout=5, retries=0)
                 if response.status_code == 200:
                     for chunk in response.iter_content(chunk_size=1024):
                         if not self.running:
@@ -1,14 +1,25 @@
-import requests
 import io
-import re
+import queue
 import asyncio
-import wave
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 
 from modules.module_config import load_config
+from modules.module_http import http_get, http_post
 from modules.module_messageQue import queue_message
+from modules.module_segment import speech_chunks
+from modules.module_audio import pcm_chunk, parse_wav_header
 
 CONFIG = load_config()
 
+STREAM_BLOCK_BYTES = 8192      # Bytes read from the streaming response per PCM chunk
+MAX_HEADER_BYTES = 4096        # Give up on a stream whose WAV header is not found by then
+_END = object()                # Ends the audio of one sentence
+
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="AllTalk")
+_streaming_available = CONFIG['TTS']['alltalk_streaming']
+
 async def generate_chunks(text):
     """
     Splits text into sentence chunks for TTS processing.
@@ -19,19 +30,22 @@ async def generate_chunks(text):
     Yields:
     - str: Sentence chunks for processing.
     """
-    # Split text at sentence boundaries (handles period + space)
-    chunks = re.split(r'(?<=\.)\s', text)
-    
+    # Split text at sentence and clause boundaries (handles ?!;: and abbreviations)
+    chunks = speech_chunks(text)
+
     for chunk in chunks:
         chunk = chunk.strip()
         if chunk:
             yield chunk  # ✅ Now an async generator
 
 
-async def synthesize_alltalk(chunk):
+def generate_file(chunk):
     """
     Sends a text chunk to the AllTalk API and returns a BytesIO buffer with the audio.
 
+    AllTalk writes the audio to a file which is then downloaded (two requests over the
+    same kept-alive connection).
+
     Parameters:
     - chunk (str): A sentence chunk from `generate_chunks()`.
 
@@ -56,7 +70,7 @@ async def synthesize_alltalk(chunk):
         }
 
         # Send request to generate TTS
-        response = requests.post(url, data=data)
+        response = http_post(url, data=data, timeout=60)
         response.raise_for_status()
 
         wav_url = response.json().get("output_file_url")
@@ -65,7 +79,7 @@ async def synthesize_alltalk(chunk):
             return None
 
         # Download the WAV file into memory
-        response = requests.get(wav_url)
+        response = http_get(wav_url, timeout=30)
         response.raise_for_status()
 
         # Convert WAV response to BytesIO buffer
@@ -78,15 +92,99 @@ async def synthesize_alltalk(chunk):
         queue_message(f"ERROR: AllTalk TTS synthesis failed: {e}")
         return None
 
+def stream_pcm(chunk, output, cancel):
+    """
+    Read a sentence from AllTalk's streaming endpoint and put PCMChunk pieces into `output`
+    as they arrive.
+
+    Raises if the stream fails before any audio was delivered; a stream that breaks
+    later is logged and cut short.
+    """
+    url = f"{CONFIG['TTS']['ttsurl']}/api/tts-generate-streaming"
+    params = {
+        "text": chunk,
+        "voice": f"{CONFIG['TTS']['tts_voice']}.wav",
+        "language": "en",
+        "output_file": "stream_output.wav",
+    }
+    response = http_get(url, params=params, stream=True, timeout=(5, 60), retries=0)
+    header, sample_rate, leftover = b"", None, b""
+    try:
+        response.raise_for_status()
+        for block in response.iter_content(chunk_size=STREAM_BLOCK_BYTES):
+            if cancel.is_set():
+                return
+            if sample_rate is None:
+                header += block
+                parsed = parse_wav_header(header)
+                if parsed is None:
+                    if len(header) > MAX_HEADER_BYTES:
+                        raise ValueError("No WAV header in streaming response")
+                    continue
+                sample_rate, offset = parsed
+                block = header[offset:]
+            data = leftover + block
+            usable = len(data) - len(data) % 2  # Whole 16-bit samples only
+            leftover = data[usable:]
+            if usable:
+                output.put(pcm_chunk(data[:usable], sample_rate))
+    except Exception as e:
+        if sample_rate is None:
+            raise
+        queue_message(f"ERROR: AllTalk stream interrupted: {e}")
+        output.put(None)  # The sentence was cut short
+    finally:
+        response.close()
+
+def _run_sentence(chunk, output, cancel):
+    """
+    Generate one sentence (streamed when possible) into `output`, then mark its end.
+    """
+    global _streaming_available
+    try:
+        if _streaming_available:
+            try:
+                stream_pcm(chunk, output, cancel)
+                return
+            except Exception as e:
+                # Nothing was delivered yet: use file generation from now on
+                _streaming_available = False
+                queue_message(f"WARNING: AllTalk streaming unavailable, using file generation: {e}")
+        if not cancel.is_set():
+            output.put(generate_file(chunk))  # None if generation failed
+    finally:
+        output.put(_END)
 
 async def text_to_speech_with_pipelining_alltalk(text):
     """
     Converts text to speech using the AllTalk API and streams audio as it's generated.
 
+    The sentence being played and up to [TTS] alltalk_prefetch following sentences are
+    generated concurrently; their audio is delivered in order.
+
     Yields:
-    - BytesIO: Processed audio chunks as they're generated.
+    - PCMChunk | BytesIO: Audio as it's generated.
     """
-    async for chunk in generate_chunks(text):  # ✅ Now works with async generator
-        wav_buffer = await synthesize_alltalk(chunk)  # Send to API
-        if wav_buffer:
-            yield wav_buffer  # Yield processed audio chunk
+    chunks = [chunk async for chunk in generate_chunks(text)]
+    in_flight = deque()
+    cancel = threading.Event()
+
+    def start_next():
+        if chunks:
+            output = queue.Queue()
+            _executor.submit(_run_sentence, chunks.pop(0), output, cancel)
+            in_flight.append(output)
+
+    try:
+        for _ in range(1 + max(0, CONFIG['TTS']['alltalk_prefetch'])):
+            start_next()
+        while in_flight:
+            output = in_flight.popleft()
+            while True:
+                item = await asyncio.to_thread(output.get)
+                if item is _END:
+                    break
+                yield item
+            start_next()
+    finally:
+        cancel.set()  # Playback stopped early: abandon the remaining sentences
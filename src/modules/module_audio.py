@@ -0,0 +1,398 @@
+"""
+module_audio.py
+
+Persistent audio output engine for the TARS-AI application.
+
+Provides:
+- One long-lived PortAudio output stream per device, fed by a callback from a ring buffer,
+  so speech chunks play back to back without reopening the device.
+- Resampling of every input to the device rate.
+- Cues (beeps) mixed over speech, with the speech ducked while a cue plays.
+- Playback handles with the exact playback position, and start/end events delivered
+  when the audio actually reaches the speaker (output latency included).
+"""
+
+# === Standard Libraries ===
+import io
+import math
+import struct
+import asyncio
+import time
+import wave
+import queue
+import threading
+from collections import namedtuple
+
+import numpy as np
+import sounddevice as sd
+from scipy.signal import resample_poly
+
+from modules.module_messageQue import queue_message
+from modules.module_config import load_config
+from modules.module_dsp import PolyphaseResampler
+
+# === Constants ===
+CONFIG = load_config()
+BUFFER_SECONDS = 30     # Speech that can be queued ahead of the speaker
+DEFAULT_RATE = 48000    # Used when the device does not report a default rate
+
+_outputs = {}
+_outputs_lock = threading.Lock()
+
+_END_OF_STREAM = object()
+
+# Raw 16-bit mono PCM from a streaming backend; played without a WAV container
+PCMChunk = namedtuple("PCMChunk", ["samples", "samplerate"])
+
+def pcm_chunk(data, samplerate):
+    """Wrap int16 PCM bytes (or an int16 array) as a PCMChunk."""
+    samples = np.frombuffer(data, dtype=np.int16) if isinstance(data, (bytes, bytearray, memoryview)) else data
+    return PCMChunk(samples, samplerate)
+
+def parse_wav_header(data):
+    """
+    Find the sample rate and the start of the samples in the beginning of a WAV stream.
+
+    Returns:
+    - tuple: (sample_rate, data_offset), or None if the header is not complete yet.
+    """
+    if len(data) < 12:
+        return None
+    if data[:4] != b"RIFF" or data[8:12] != b"WAVE":
+        raise ValueError("Stream is not a WAV stream")
+    offset, sample_rate = 12, None
+    while offset + 8 <= len(data):
+        chunk_id, size = data[offset:offset + 4], struct.unpack_from("<I", data, offset + 4)[0]
+        if chunk_id == b"fmt " and offset + 16 <= len(data):
+            sample_rate = struct.unpack_from("<I", data, offset + 12)[0]
+        if chunk_id == b"data":
+            return (sample_rate, offset + 8) if sample_rate else None
+        offset += 8 + size + (size % 2)
+    return None
+
+def pcm_stream(blocks, samplerate):
+    """
+    Turn an iterable of raw int16 byte blocks of any length (e.g. an HTTP body) into PCMChunk
+    pieces holding whole samples.
+    """
+    leftover = b""
+    for block in blocks:
+        data = leftover + block
+        usable = len(data) - len(data) % 2
+        leftover = data[usable:]
+        if usable:
+            yield pcm_chunk(data[:usable], samplerate)
+
+async def iterate_in_thread(produce, *args):
+    """
+    Run the blocking generator `produce(*args)` on a worker thread and yield its items as
+    they arrive. Exceptions are re-raised here; closing the async generator stops the worker
+    at its next item.
+    """
+    items, stop = queue.Queue(), threading.Event()
+
+    def run():
+        try:
+            for item in produce(*args):
+                if stop.is_set():
+                    break
+                items.put(item)
+        except Exception as e:
+            items.put(e)
+        finally:
+            items.put(_END_OF_STREAM)
+
+    threading.Thread(target=run, name="AudioStream", daemon=True).start()
+    try:
+        while True:
+            item = await asyncio.to_thread(items.get)
+            if item is _END_OF_STREAM:
+                break
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        stop.set()
+
+def pcm_to_wav(chunk):
+    """Return a PCMChunk as WAV file bytes (for storing it with WAV chunks)."""
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(chunk.samplerate)
+        wav_file.writeframes(np.asarray(chunk.samples, dtype=np.int16).tobytes())
+    return buffer.getvalue()
+
+def resample(data, source_rate, target_rate):
+    """
+    Resample a complete piece of mono float32 audio to `target_rate` with a polyphase filter.
+    """
+    if source_rate == target_rate or len(data) == 0:
+        return data
+    divisor = math.gcd(int(source_rate), int(target_rate))
+    return resample_poly(data, int(target_rate) // divisor, int(source_rate) // divisor).astype(np.float32)
+
+def to_mono_float32(data):
+    """
+    Convert int16/float audio with any channel count to mono float32 in [-1, 1].
+    """
+    data = np.asarray(data)
+    if data.dtype == np.int16:
+        data = data.astype(np.float32) / 32768.0
+    elif data.dtype != np.float32:
+        data = data.astype(np.float32)
+    if data.ndim > 1:
+        data = data.mean(axis=1)
+    return data
+
+class PlaybackHandle:
+    """
+    A queued piece of audio: wait for it, or read how much of it has been played.
+    """
+    def __init__(self, output, start_frame, frames, kind="speech"):
+        self.output = output
+        self.start_frame = start_frame
+        self.end_frame = start_frame + frames
+        self.kind = kind
+        self.started = threading.Event()
+        self.done = threading.Event()
+        self.cancelled = False
+        self.announced = False    # "start" event queued
+
+    @property
+    def duration(self):
+        return (self.end_frame - self.start_frame) / self.output.samplerate
+
+    @property
+    def position(self):
+        """Seconds of this item already played (0 before it starts, duration when done)."""
+        played = self.output.played_frames(self.kind) - self.start_frame
+        return min(max(played, 0), self.end_frame - self.start_frame) / self.output.samplerate
+
+    def wait(self, timeout=None):
+        """Block until the item has finished playing (or was stopped). Returns False on timeout."""
+        return self.done.wait(timeout)
+
+class AudioOutput:
+    """
+    A persistent output stream with a speech ring buffer and a cue mixer.
+    """
+    def __init__(self, device=None, samplerate=None, duck_gain=0.35, buffer_seconds=BUFFER_SECONDS):
+        """
+        Parameters:
+        - device (int | str): sounddevice output device (None for the default).
+        - samplerate (int): Stream rate; the device's default rate when None.
+        - duck_gain (float): Speech gain while a cue plays.
+        - buffer_seconds (float): Ring buffer length.
+        """
+        self.device = device
+        if samplerate is None:
+            try:
+                samplerate = int(sd.query_devices(device, kind="output")["default_samplerate"])
+            except Exception:
+                samplerate = DEFAULT_RATE
+        self.samplerate = samplerate
+        self.duck_gain = duck_gain
+        self.ring = np.zeros(int(buffer_seconds * samplerate), dtype=np.float32)
+        self.written = 0          # Speech frames written into the ring (absolute count)
+        self.read = 0             # Speech frames handed to the device (absolute count)
+        self.cue_clock = 0        # Frames rendered since start, used for cue positions
+        self.pending = []         # Speech handles not finished yet, in order
+        self.cues = []            # Active cues as [handle, data, offset, gain]
+        self.listeners = []
+        self.resamplers = {}      # Source rate -> streaming resampler for speech
+        self.resample_lock = threading.Lock()
+        self.lock = threading.Condition()
+        self.events = queue.SimpleQueue()
+        self.stream = None
+        self.notifier = threading.Thread(target=self._notify, name="AudioEvents", daemon=True)
+        self.notifier.start()
+
+    # === Stream ===
+    def start(self):
+        """Open the output stream (done automatically on first playback)."""
+        with self.lock:
+            if self.stream is None:
+                self.stream = sd.OutputStream(
+                    device=self.device, samplerate=self.samplerate, channels=1,
+                    dtype="float32", callback=self._callback,
+                )
+                self.stream.start()
+                queue_message(f"LOAD: Audio output open on device {self.device} at {self.samplerate} Hz.")
+
+    def close(self):
+        """Stop playback and close the stream."""
+        self.stop()
+        with self.lock:
+            if self.stream is not None:
+                self.stream.close()
+                self.stream = None
+
+    def played_frames(self, kind="speech"):
+        with self.lock:
+            return self.read if kind == "speech" else self.cue_clock
+
+    def _callback(self, outdata, frames, time_info, status):
+        out = outdata[:, 0]
+        with self.lock:
+            available = min(frames, self.written - self.read)
+            start = self.read % len(self.ring)
+            first = min(available, len(self.ring) - start)
+            out[:first] = self.ring[start:start + first]
+            out[first:available] = self.ring[:available - first]
+            out[available:] = 0.0
+            self.read += available
+
+            # Cues are mixed over the (ducked) speech
+            if self.cues:
+                out *= self.duck_gain
+                for cue in list(self.cues):
+                    handle, data, offset, gain = cue
+                    if offset == 0:
+                        self._emit("start", handle)
+                    count = min(frames, len(data) - offset)
+                    out[:count] += data[offset:offset + count] * gain
+                    cue[2] += count
+                    if cue[2] >= len(data):
+                        self.cues.remove(cue)
+                        self._emit("end", handle)
+                np.clip(out, -1.0, 1.0, out=out)
+            self.cue_clock += frames
+
+            while self.pending and self.read > self.pending[0].start_frame:
+                handle = self.pending[0]
+                if not handle.announced:
+                    handle.announced = True
+                    self._emit("start", handle)
+                if self.read < handle.end_frame:
+                    break
+                self.pending.pop(0)
+                self._emit("end", handle)
+            self.lock.notify_all()
+
+    def _emit(self, event, handle):
+        latency = self.stream.latency if self.stream is not None else 0.0
+        self.events.put((time.monotonic() + latency, event, handle))
+
+    def _notify(self):
+        # Delivers events when the audio reaches the speaker, outside the audio callback
+        while True:
+            due, event, handle = self.events.get()
+            delay = due - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            (handle.started if event == "start" else handle.done).set()
+            for callback in list(self.listeners):
+                try:
+                    callback(event, handle)
+                except Exception as e:
+                    queue_message(f"ERROR: Audio event listener failed: {e}")
+
+    # === Playback ===
+    def play(self, data, samplerate):
+        """
+        Queue speech audio after anything already queued. Blocks while the ring buffer is full.
+
+        Consecutive speech blocks are resampled as one continuous stream, so small blocks from
+        streaming backends join without clicks.
+
+        Returns:
+        - PlaybackHandle: Tracks the chunk's playback.
+        """
+        self.start()
+        data = to_mono_float32(data)
+        if samplerate != self.samplerate:
+            with self.resample_lock:
+                if samplerate not in self.resamplers:
+                    self.resamplers[samplerate] = PolyphaseResampler(self.samplerate, samplerate)
+                data = self.resamplers[samplerate].process(data)
+        with self.lock:
+            handle = PlaybackHandle(self, self.written, len(data))
+            if len(data) == 0:
+                handle.started.set()
+                handle.done.set()
+                return handle
+            self.pending.append(handle)
+            position = 0
+            while position < len(data) and not handle.cancelled:
+                free = len(self.ring) - (self.written - self.read)
+                if free == 0:
+                    self.lock.wait(0.5)
+                    continue
+                count = min(free, len(data) - position)
+                start = self.written % len(self.ring)
+                first = min(count, len(self.ring) - start)
+                self.ring[start:start + first] = data[position:position + first]
+                self.ring[:count - first] = data[position + first:position + count]
+                self.written += count
+                position += count
+        return handle
+
+    def play_cue(self, data, samplerate, gain=1.0):
+        """
+        Mix a cue (e.g. a beep) over whatever is playing, ducking the speech meanwhile.
+
+        Returns:
+        - PlaybackHandle: Tracks the cue's playback.
+        """
+        self.start()
+        data = resample(to_mono_float32(data), samplerate, self.samplerate)
+        with self.lock:
+            handle = PlaybackHandle(self, self.cue_clock, len(data), kind="cue")
+            self.cues.append([handle, data, 0, gain])
+        return handle
+
+    def stop(self):
+        """
+        Drop queued speech and cues (e.g. when the user interrupts).
+        """
+        with self.lock:
+            self.read = self.written
+            for handle in self.pending:
+                handle.cancelled = True
+                handle.done.set()
+            for handle, *_ in self.cues:
+                handle.cancelled = True
+                handle.done.set()
+            self.pending.clear()
+            self.cues.clear()
+            self.lock.notify_all()
+
+    def is_playing(self):
+        with self.lock:
+            return self.written > self.read or bool(self.cues)
+
+    def add_listener(self, callback):
+        """Call `callback(event, handle)` with "start"/"end" events as audio reaches the speaker."""
+        self.listeners.append(callback)
+
+def parse_device(value):
+    """
+    Convert a configured device ("1", "USB Audio", "") to what sounddevice expects.
+    """
+    value = str(value or "").strip()
+    if not value:
+        return None
+    return int(value) if value.isdigit() else value
+
+def get_audio_output(device=None):
+    """
+    Return the shared output engine for `device` ([TTS] audio_device when None),
+    creating it on first use.
+    """
+    if device is None:
+        device = parse_device(CONFIG['TTS']['audio_device'])
+    with _outputs_lock:
+        if device not in _outputs:
+            _outputs[device] = AudioOutput(device, duck_gain=CONFIG['TTS']['duck_gain'])
+        return _outputs[device]
+
+def close_audio_outputs():
+    """
+    Close every output stream (used on shutdown).
+    """
+    with _outputs_lock:
+        for output in _outputs.values():
+            output.close()
+        _outputs.clear()
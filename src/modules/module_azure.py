@@ -1,15 +1,29 @@
-import io
-import re
+import queue
 import asyncio
+import functools
+import threading
+from xml.sax.saxutils import escape
 import azure.cognitiveservices.speech as speechsdk
 from modules.module_config import load_config
+from modules.module_messageQue import queue_message
+from modules.module_segment import speech_chunks
+from modules.module_audio import pcm_chunk
 
 
 CONFIG = load_config()
 
-def init_speech_config() -> speechsdk.SpeechConfig:
+OUTPUT_FORMAT = speechsdk.SpeechSynthesisOutputFormat.Raw16Khz16BitMonoPcm
+SAMPLE_RATE = 16000
+_END = object()  # Ends the audio stream of one request
+
+_voices = {}  # Voice name -> AzureVoice
+_voices_lock = threading.Lock()
+
+def init_speech_config(voice=None) -> speechsdk.SpeechConfig:
     """
     Initialize and return Azure speech configuration.
+
+    Audio is requested as raw 16-bit PCM so it can be played as it streams in.
     
     Returns:
         speechsdk.SpeechConfig: Configured speech configuration object
@@ -25,143 +39,153 @@ def init_speech_config() -> speechsdk.SpeechConfig:
             subscription=CONFIG['TTS']['azure_api_key'],
             region=CONFIG['TTS']['azure_region']
         )
-        speech_config.speech_synthesis_voice_name = CONFIG['TTS']['tts_voice']
-        speech_config.set_speech_synthesis_output_format(
-            speechsdk.SpeechSynthesisOutputFormat.Riff16Khz16BitMonoPcm
-        )
+        speech_config.speech_synthesis_voice_name = voice or CONFIG['TTS']['tts_voice']
+        speech_config.set_speech_synthesis_output_format(OUTPUT_FORMAT)
         return speech_config
     except Exception as e:
         raise RuntimeError(f"Failed to initialize Azure speech config: {str(e)}")
 
-async def synthesize_azure(chunk: str) -> io.BytesIO:
-    try:
-        speech_config = init_speech_config()
-        audio_config = None
-        
-        synthesizer = speechsdk.SpeechSynthesizer(
-            speech_config=speech_config,
-            audio_config=audio_config
+@functools.lru_cache(maxsize=None)
+def ssml_template(voice: str) -> str:
+    """
+    Return the SSML for a voice with a {text} placeholder (built once per voice).
+    """
+    return f"""
+    <speak version='1.0' xmlns='http://www.w3.org/2001/10/synthesis'
+           xmlns:mstts='http://www.w3.org/2001/mstts' xml:lang='en-US'>
+        <voice name='{voice}'>
+            <prosody rate="+18%" pitch="-55%" volume="+30%" range="-20%" contour="(0%,+20Hz) (10%,-2st) (40%,+10Hz)">
+                <mstts:express-as style="depressed" styledegree="6">
+                    <p>{{text}}</p>
+                </mstts:express-as>
+            </prosody>
+        </voice>
+    </speak>
+    """
+    """ 
+    style="advertisement_upbeat"	Expresses an excited and high-energy tone for promoting a product or service.
+    style="affectionate"	Expresses a warm and affectionate tone, with higher pitch and vocal energy. The speaker is in a state of attracting the attention of the listener. The personality of the speaker is often endearing in nature.
+    style="angry"	Expresses an angry and annoyed tone.
+    style="assistant"	Expresses a warm and relaxed tone for digital assistants.
+    style="calm"	Expresses a cool, collected, and composed attitude when speaking. Tone, pitch, and prosody are more uniform compared to other types of speech.
+    style="chat"	Expresses a casual and relaxed tone.
+    style="cheerful"	Expresses a positive and happy tone.
+    style="customerservice"	Expresses a friendly and helpful tone for customer support.
+    style="depressed"	Expresses a melancholic and despondent tone with lower pitch and energy.
+    style="disgruntled"	Expresses a disdainful and complaining tone. Speech of this emotion displays displeasure and contempt.
+    style="documentary-narration"	Narrates documentaries in a relaxed, interested, and informative style suitable for documentaries, expert commentary, and similar content.
+    style="embarrassed"	Expresses an uncertain and hesitant tone when the speaker is feeling uncomfortable.
+    style="empathetic"	Expresses a sense of caring and understanding.
+    style="envious"	Expresses a tone of admiration when you desire something that someone else has.
+    style="excited"	Expresses an upbeat and hopeful tone. It sounds like something great is happening and the speaker is happy about it.
+    style="fearful"	Expresses a scared and nervous tone, with higher pitch, higher vocal energy, and faster rate. The speaker is in a state of tension and unease.
+    style="friendly"	Expresses a pleasant, inviting, and warm tone. It sounds sincere and caring.
+    style="gentle"	Expresses a mild, polite, and pleasant tone, with lower pitch and vocal energy.
+    style="hopeful"	Expresses a warm and yearning tone. It sounds like something good will happen to the speaker.
+    style="lyrical"	Expresses emotions in a melodic and sentimental way.
+    style="narration-professional"	Expresses a professional, objective tone for content reading.
+    style="narration-relaxed"	Expresses a soothing and melodious tone for content reading.
+    style="newscast"	Expresses a formal and professional tone for narrating news.
+    style="newscast-casual"	Expresses a versatile and casual tone for general news delivery.
+    style="newscast-formal"	Expresses a formal, confident, and authoritative tone for news delivery.
+    style="poetry-reading"	Expresses an emotional and rhythmic tone while reading a poem.
+    style="sad"	Expresses a sorrowful tone.
+    style="serious"	Expresses a strict and commanding tone. Speaker often sounds stiffer and much less relaxed with firm cadence.
+    style="shouting"	Expresses a tone that sounds as if the voice is distant or in another location and making an effort to be clearly heard.
+    style="sports_commentary"	Expresses a relaxed and interested tone for broadcasting a sports event.
+    style="sports_commentary_excited"	Expresses an intensive and energetic tone for broadcasting exciting moments in a sports event.
+    style="whispering"	Expresses a soft tone that's trying to make a quiet and gentle sound.
+    style="terrified"	Expresses a scared tone, with a faster pace and a shakier voice. It sounds like the speaker is in an unsteady and frantic status.
+    style="unfriendly"	Expresses a cold and indifferent tone. """
+
+
+class AzureVoice:
+    """
+    One reusable synthesizer per voice. Audio is pushed to the caller from the SDK's
+    synthesizing events as it arrives, instead of waiting for the whole sentence.
+    """
+    def __init__(self, voice: str):
+        self.voice = voice
+        self.synthesizer = speechsdk.SpeechSynthesizer(
+            speech_config=init_speech_config(voice),
+            audio_config=None
         )
+        self.connection = speechsdk.Connection.from_speech_synthesizer(self.synthesizer)
+        self.lock = threading.Lock()  # One request at a time, so events belong to it
+        self.output = None
+        self.synthesizer.synthesizing.connect(self._on_audio)
 
-        ssml = f"""
-        <speak version='1.0' xmlns='http://www.w3.org/2001/10/synthesis'
-               xmlns:mstts='http://www.w3.org/2001/mstts' xml:lang='en-US'>
-            <voice name='{CONFIG['TTS']['tts_voice']}'>
-                <prosody rate="+18%" pitch="-55%" volume="+30%" range="-20%" contour="(0%,+20Hz) (10%,-2st) (40%,+10Hz)">
-                    <mstts:express-as style="depressed" styledegree="6">
-                        <p>{chunk}</p>
-                    </mstts:express-as>
-                </prosody>
-            </voice>
-        </speak>
-        """
-        """ 
-        style="advertisement_upbeat"	Expresses an excited and high-energy tone for promoting a product or service.
-        style="affectionate"	Expresses a warm and affectionate tone, with higher pitch and vocal energy. The speaker is in a state of attracting the attention of the listener. The personality of the speaker is often endearing in nature.
-        style="angry"	Expresses an angry and annoyed tone.
-        style="assistant"	Expresses a warm and relaxed tone for digital assistants.
-        style="calm"	Expresses a cool, collected, and composed attitude when speaking. Tone, pitch, and prosody are more uniform compared to other types of speech.
-        style="chat"	Expresses a casual and relaxed tone.
-        style="cheerful"	Expresses a positive and happy tone.
-        style="customerservice"	Expresses a friendly and helpful tone for customer support.
-        style="depressed"	Expresses a melancholic and despondent tone with lower pitch and energy.
-        style="disgruntled"	Expresses a disdainful and complaining tone. Speech of this emotion displays displeasure and contempt.
-        style="documentary-narration"	Narrates documentaries in a relaxed, interested, and informative style suitable for documentaries, expert commentary, and similar content.
-        style="embarrassed"	Expresses an uncertain and hesitant tone when the speaker is feeling uncomfortable.
-        style="empathetic"	Expresses a sense of caring and understanding.
-        style="envious"	Expresses a tone of admiration when you desire something that someone else has.
-        style="excited"	Expresses an upbeat and hopeful tone. It sounds like something great is happening and the speaker is happy about it.
-        style="fearful"	Expresses a scared and nervous tone, with higher pitch, higher vocal energy, and faster rate. The speaker is in a state of tension and unease.
-        style="friendly"	Expresses a pleasant, inviting, and warm tone. It sounds sincere and caring.
-        style="gentle"	Expresses a mild, polite, and pleasant tone, with lower pitch and vocal energy.
-        style="hopeful"	Expresses a warm and yearning tone. It sounds like something good will happen to the speaker.
-        style="lyrical"	Expresses emotions in a melodic and sentimental way.
-        style="narration-professional"	Expresses a professional, objective tone for content reading.
-        style="narration-relaxed"	Expresses a soothing and melodious tone for content reading.
-        style="newscast"	Expresses a formal and professional tone for narrating news.
-        style="newscast-casual"	Expresses a versatile and casual tone for general news delivery.
-        style="newscast-formal"	Expresses a formal, confident, and authoritative tone for news delivery.
-        style="poetry-reading"	Expresses an emotional and rhythmic tone while reading a poem.
-        style="sad"	Expresses a sorrowful tone.
-        style="serious"	Expresses a strict and commanding tone. Speaker often sounds stiffer and much less relaxed with firm cadence.
-        style="shouting"	Expresses a tone that sounds as if the voice is distant or in another location and making an effort to be clearly heard.
-        style="sports_commentary"	Expresses a relaxed and interested tone for broadcasting a sports event.
-        style="sports_commentary_excited"	Expresses an intensive and energetic tone for broadcasting exciting moments in a sports event.
-        style="whispering"	Expresses a soft tone that's trying to make a quiet and gentle sound.
-        style="terrified"	Expresses a scared tone, with a faster pace and a shakier voice. It sounds like the speaker is in an unsteady and frantic status.
-        style="unfriendly"	Expresses a cold and indifferent tone. """
-
-
-        result = await asyncio.to_thread(lambda: synthesizer.speak_ssml_async(ssml).get())
-    
-        if result.reason != speechsdk.ResultReason.SynthesizingAudioCompleted:
-            cancellation_details = getattr(result, "cancellation_details", None)
-            return None
+    def prewarm(self):
+        """Open the service connection ahead of the first request (returns immediately)."""
+        self.connection.open(True)
 
-        if not result.audio_data:
-            return None
+    def _on_audio(self, event):
+        output = self.output
+        if output is not None and event.result.audio_data:
+            output.put(bytes(event.result.audio_data))
 
-        audio_buffer = io.BytesIO(result.audio_data)
-        audio_buffer.seek(0)
-        
-        return audio_buffer
+    def _speak(self, text: str, output: queue.Queue):
+        with self.lock:
+            self.output = output
+            try:
+                ssml = ssml_template(self.voice).format(text=escape(text))
+                result = self.synthesizer.speak_ssml_async(ssml).get()
+                if result.reason != speechsdk.ResultReason.SynthesizingAudioCompleted:
+                    details = getattr(result, "cancellation_details", None)
+                    queue_message(f"ERROR: Azure synthesis failed: {getattr(details, 'error_details', result.reason)}")
+                    output.put(None)  # Marks the sentence as failed
+            except Exception as e:
+                queue_message(f"ERROR: Azure synthesis failed: {e}")
+                output.put(None)
+            finally:
+                self.output = None
+                output.put(_END)
 
-    except Exception as e:
-        return None
+    async def synthesize(self, text: str):
+        """
+        Async generator of PCMChunk pieces for `text` as the service streams them.
+        """
+        output = queue.Queue()
+        asyncio.get_running_loop().run_in_executor(None, self._speak, text, output)
+        while True:
+            pcm = await asyncio.to_thread(output.get)
+            if pcm is _END:
+                break
+            yield pcm_chunk(pcm, SAMPLE_RATE) if pcm is not None else None
+
+def get_voice(voice: str = None) -> AzureVoice:
+    """
+    Return the synthesizer for `voice` (the configured voice by default), creating it once.
+    """
+    voice = voice or CONFIG['TTS']['tts_voice']
+    with _voices_lock:
+        if voice not in _voices:
+            _voices[voice] = AzureVoice(voice)
+        return _voices[voice]
 
-async def apply_tars_effects(audio_buffer):
+def prewarm_azure():
+    """
+    Create the synthesizer and open its connection (called when the wake word fires, so
+    the connection is ready by the time the reply is synthesized).
+    """
     try:
-        from pydub import AudioSegment
-        from pydub.effects import compress_dynamic_range, normalize
-        audio_buffer.seek(0)
-        sound = AudioSegment.from_file(audio_buffer, format="wav")
-        sound = compress_dynamic_range(sound, ratio=3.0, threshold=-15.0)
-        sound = sound.low_shelf_filter(frequency=300, gain_db=4.0)
-        sound = sound.high_shelf_filter(frequency=5000, gain_db=2.0)
-        robot_effect = sound + 2
-        robot_effect = normalize(robot_effect, headroom=1.0)
-        high_freq = sound.high_pass_filter(3000) - 12
-        robot_effect = robot_effect.overlay(high_freq, gain_during_overlay=-8)
-        chunk_length = 500
-        final_sound = AudioSegment.empty()
-        
-        for i in range(0, len(robot_effect), chunk_length):
-            chunk = robot_effect[i:i+chunk_length]
-            if i % 3 == 0:
-                pitch_change = -0.1
-                chunk = chunk._spawn(chunk.raw_data, overrides={
-                    "frame_rate": int(chunk.frame_rate * (1 + pitch_change/100))
-                })
-            final_sound += chunk
-        output_buffer = io.BytesIO()
-        final_sound.export(output_buffer, format="wav")
-        output_buffer.seek(0)
-        return output_buffer
-        
-    except ImportError:
-        audio_buffer.seek(0)
-        return audio_buffer
+        get_voice().prewarm()
+    except Exception as e:
+        queue_message(f"WARNING: Could not pre-open the Azure connection: {e}")
 
 async def text_to_speech_with_pipelining_azure(text: str):
     """
-    Converts text to speech by splitting the text into chunks, synthesizing each chunk concurrently,
-    and yielding audio buffers as soon as each is ready.
+    Converts text to speech by splitting the text into chunks and streaming each chunk's
+    audio from the shared synthesizer as it arrives.
     """
     if not CONFIG['TTS']['azure_api_key'] or not CONFIG['TTS']['azure_region']:
         raise ValueError("Azure API key and region must be provided for the 'azure' TTS option.")
 
-    # Split text into chunks based on sentence endings (adjust regex as needed)
-    chunks = re.split(r'(?<=\.)\s', text)
+    voice = get_voice()
 
-    # Schedule synthesis for all non-empty chunks concurrently.
-    tasks = []
-    for index, chunk in enumerate(chunks):
+    # Split text into chunks (short first clause, then sentence groups)
+    for chunk in speech_chunks(text):
         chunk = chunk.strip()
         if chunk:
-            tasks.append(asyncio.create_task(synthesize_azure(chunk)))
-
-    # Now await and yield the results in the original order.
-    for i, task in enumerate(tasks):
-        audio_buffer = await task  # Each task is already running concurrently.
-        if audio_buffer:
-            yield audio_buffer
\ No newline at end of file
+            async for pcm in voice.synthesize(chunk):
+                yield pcm
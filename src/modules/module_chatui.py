@@ -51,10 +51,11 @@ from PIL import Image, UnidentifiedImageError
 
 # === Custom Modules ===
 from modules.module_config import load_config
-from modules.module_llm import get_completion
+from modules.module_llm import process_completion, SchedulerBusy
+from modules.module_utterance import UtteranceContext
 from modules.module_vision import get_image_caption_from_base64
 from modules.module_tts import generate_tts_audio
-from modules.module_llm import detect_emotion
+from modules.module_emotion import register_emotion_listener
 from modules.module_messageQue import queue_message
 
 # Suppress Flask logs
@@ -298,41 +299,52 @@ def stop_talking_endpoint():
     #queue_message("DEBUG: Talking mode disabled.")
     return Response("stopped", status=200)
 
-@flask_app.route('/emotion', methods=['POST'])
-def set_emotion():
+def apply_emotion(detected_emotion):
     """
-    Receives a single-word emotion and updates the stored emotion.
+    Switch the avatar images to the given emotion, falling back to 'neutral' if the
+    character has no images for it. Called in-process by module_emotion.
+
+    Returns:
+    - str: The emotion that was applied.
     """
     global CHARACTER_DIR, img_nottalking_open, img_nottalking_closed, img_talking_open, img_talking_closed
-    detected_emotion = request.data.decode("utf-8").strip()  # Read raw data as a string
 
-    if detected_emotion:  # Ensure it's not empty
-        # Build the new emotion folder path
+    # Build the new emotion folder path
+    new_character_dir = os.path.join(BASE_DIR, "character", character_name, "images", detected_emotion)
+
+    # Check if the folder exists, otherwise, fallback to 'neutral'
+    if not os.path.exists(new_character_dir):
+        #queue_message(f"Emotion folder '{new_character_dir}' not found. Falling back to 'neutral'.")
+        detected_emotion = "neutral"
         new_character_dir = os.path.join(BASE_DIR, "character", character_name, "images", detected_emotion)
 
-        # Check if the folder exists, otherwise, fallback to 'neutral'
-        if not os.path.exists(new_character_dir):
-            #queue_message(f"Emotion folder '{new_character_dir}' not found. Falling back to 'neutral'.")
-            detected_emotion = "neutral"
-            new_character_dir = os.path.join(BASE_DIR, "character", character_name, "images", detected_emotion)
+    # **🔄 Load Character Images for New Emotion**
+    animation_dir = os.path.join(new_character_dir, "animation")
+    nottalking_open = Image.open(os.path.join(animation_dir, f"{sprite}_{detected_emotion}_nottalking_eyes_open.png")).convert("RGBA")
+    nottalking_closed = Image.open(os.path.join(animation_dir, f"{sprite}_{detected_emotion}_nottalking_eyes_closed.png")).convert("RGBA")
+    talking_open = Image.open(os.path.join(animation_dir, f"{sprite}_{detected_emotion}_talking_eyes_open.png")).convert("RGBA")
+    talking_closed = Image.open(os.path.join(animation_dir, f"{sprite}_{detected_emotion}_talking_eyes_closed.png")).convert("RGBA")
 
-        # **Update Global Emotion Directory**
-        CHARACTER_DIR = new_character_dir
-        #queue_message(f"Updated CHARACTER_DIR: {CHARACTER_DIR}")
+    # Resize images to match the frame dimensions, then swap them in together
+    img_nottalking_open = nottalking_open.resize((FRAME_WIDTH, FRAME_HEIGHT))
+    img_nottalking_closed = nottalking_closed.resize((FRAME_WIDTH, FRAME_HEIGHT))
+    img_talking_open = talking_open.resize((FRAME_WIDTH, FRAME_HEIGHT))
+    img_talking_closed = talking_closed.resize((FRAME_WIDTH, FRAME_HEIGHT))
+    CHARACTER_DIR = new_character_dir
+    return detected_emotion
 
-        try:
-            # **🔄 Reload Character Images for New Emotion**
-            img_nottalking_open = Image.open(os.path.join(CHARACTER_DIR, "animation", f"{sprite}_{detected_emotion}_nottalking_eyes_open.png")).convert("RGBA")
-            img_nottalking_closed = Image.open(os.path.join(CHARACTER_DIR, "animation", f"{sprite}_{detected_emotion}_nottalking_eyes_closed.png")).convert("RGBA")
-            img_talking_open = Image.open(os.path.join(CHARACTER_DIR, "animation", f"{sprite}_{detected_emotion}_talking_eyes_open.png")).convert("RGBA")
-            img_talking_closed = Image.open(os.path.join(CHARACTER_DIR, "animation", f"{sprite}_{detected_emotion}_talking_eyes_closed.png")).convert("RGBA")
-
-            # Resize images to match the frame dimensions
-            img_nottalking_open = img_nottalking_open.resize((FRAME_WIDTH, FRAME_HEIGHT))
-            img_nottalking_closed = img_nottalking_closed.resize((FRAME_WIDTH, FRAME_HEIGHT))
-            img_talking_open = img_talking_open.resize((FRAME_WIDTH, FRAME_HEIGHT))
-            img_talking_closed = img_talking_closed.resize((FRAME_WIDTH, FRAME_HEIGHT))
+register_emotion_listener(apply_emotion)
 
+@flask_app.route('/emotion', methods=['POST'])
+def set_emotion():
+    """
+    Receives a single-word emotion and updates the stored emotion.
+    """
+    detected_emotion = request.data.decode("utf-8").strip()  # Read raw data as a string
+
+    if detected_emotion:  # Ensure it's not empty
+        try:
+            detected_emotion = apply_emotion(detected_emotion)
             return jsonify({"message": "Emotion updated", "emotion": detected_emotion}), 200
 
         except FileNotFoundError as e:
@@ -364,16 +376,18 @@ def receive_user_message():
             caption = "Failed to process image"
 
         cmessage = f"*The Uploaded photo has the following description {caption}* and the user sent the following message with the photo: {user_message}"
-        reply = get_completion(cmessage)
     else:
-        reply = get_completion(user_message)
+        cmessage = user_message
+
+    try:
+        reply = process_completion(UtteranceContext(cmessage, source="chatui"), source="chatui")
+    except SchedulerBusy:
+        return jsonify({"status": "busy"}), 503
 
     latest_text_to_read = reply
     socketio.emit('bot_message', {'message': latest_text_to_read})
 
-    if CONFIG['EMOTION']['enabled']:
-        detect_emotion(reply)
-        
+    # Emotion detection for the reply is already queued by llm_process
     return jsonify({"status": "success"})
 
 @flask_app.route('/upload', methods=['GET', 'POST'])
@@ -410,7 +424,10 @@ def upload():
         caption = get_image_caption_from_base64(base64_image)
         cmessage = f"*Sends {CONFIG['CHAR']['user_name']} a picture of: {caption}*"
 
-        reply = get_completion(cmessage)
+        try:
+            reply = process_completion(cmessage, source="chatui")
+        except SchedulerBusy:
+            return 'LLM busy', 503
         latest_text_to_read = reply
 
         socketio.emit('bot_message', {'message': latest_text_to_read})
@@ -694,7 +711,7 @@ def get_config():
             'description': 'Token encoding model'
         },
         'LLM.functioncalling': {
-            'options': ['llm', 'nb'],
+            'options': ['llm', 'nb', 'embedding'],
             'description': 'Function calling method'
         },
         'TTS.ttsoption': {
@@ -0,0 +1,129 @@
+"""
+module_compress.py
+
+Extractive compression of tool output for the TARS-AI application.
+
+Tool results (web search snippets, Home Assistant replies...) are split into sentences,
+deduplicated, ranked against the user's query with the same MiniLM embeddings and BM25
+tokens the memory search uses, and trimmed to a token budget. The kept sentences stay in
+their original order.
+"""
+
+# === Standard Libraries ===
+import re
+import math
+
+from modules.module_messageQue import queue_message
+from modules.module_segment import split_sentences
+
+# === Constants ===
+RRF_K = 60                 # Same reciprocal rank fusion constant as HyperDB.hybrid_query
+NEAR_DUPLICATE = 0.8       # Word-set overlap above which a sentence counts as a repeat
+CHARS_PER_TOKEN = 4.0      # Estimate used when the backend cannot count tokens
+MIN_SENTENCE_CHARS = 3
+
+_WORD = re.compile(r"\w+")
+
+def estimate_tokens(text):
+    """
+    Character-based token estimate, used where a backend round trip is not worth it.
+    """
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+def deduplicate(sentences):
+    """
+    Drop exact and near-duplicate sentences (search providers often repeat a snippet).
+    """
+    kept, seen = [], []
+    for sentence in sentences:
+        words = set(_WORD.findall(sentence.lower()))
+        if not words:
+            continue
+        if any(len(words & other) / len(words | other) >= NEAR_DUPLICATE for other in seen):
+            continue
+        kept.append(sentence)
+        seen.append(words)
+    return kept
+
+def _ranks(scores):
+    order = sorted(range(len(scores)), key=lambda i: scores[i], reverse=True)
+    return {index: rank + 1 for rank, index in enumerate(order)}
+
+def _embedding_scores(sentences, utterance):
+    import numpy as np
+    from modules.module_hyperdb import get_embedding, cosine_similarity
+    vectors = np.asarray(get_embedding(sentences))
+    return list(cosine_similarity(vectors, np.asarray(utterance.embedding)))
+
+def _bm25_scores(sentences, utterance, stemmer):
+    import bm25s
+    retriever = bm25s.BM25(method="lucene")
+    retriever.index(bm25s.tokenize(sentences, stopwords="en", stemmer=stemmer, show_progress=False), show_progress=False)
+    results, scores = retriever.retrieve(utterance.bm25_tokens(stemmer), k=len(sentences), show_progress=False)
+    by_index = dict(zip(results[0].tolist(), scores[0].tolist()))
+    return [by_index.get(i, 0.0) for i in range(len(sentences))]
+
+def _overlap_scores(sentences, utterance):
+    query = {word for word in _WORD.findall(utterance.normalized) if len(word) > 3}
+    return [len(query & set(_WORD.findall(s.lower()))) for s in sentences]
+
+def rank_sentences(sentences, utterance, stemmer=None):
+    """
+    Rank sentences by relevance to the utterance with RRF over embedding and BM25 scores.
+
+    Falls back to whichever signal is available, then to plain word overlap.
+
+    Returns:
+    - list: Sentence indices, most relevant first.
+    """
+    rankings = []
+    for name, scorer in (("embedding", lambda: _embedding_scores(sentences, utterance)),
+                         ("bm25", lambda: _bm25_scores(sentences, utterance, stemmer))):
+        try:
+            rankings.append(_ranks(scorer()))
+        except Exception as e:
+            queue_message(f"WARNING: Tool output {name} ranking unavailable: {e}")
+    if not rankings:
+        rankings.append(_ranks(_overlap_scores(sentences, utterance)))
+
+    fused = {i: sum(1 / (RRF_K + ranking[i]) for ranking in rankings) for i in range(len(sentences))}
+    return sorted(fused, key=lambda i: (-fused[i], i))
+
+def compress_tool_output(text, utterance, budget_tokens, token_count=None, stemmer=None, with_tokens=False):
+    """
+    Deduplicate tool output and, if it exceeds `budget_tokens`, keep the sentences most
+    relevant to the utterance that fit.
+
+    Parameters:
+    - text (str): The tool result.
+    - utterance (UtteranceContext): The user's utterance (its embedding/tokens are reused).
+    - budget_tokens (int): Token budget for the result.
+    - token_count (callable): Returns the token length of a text; counted once for the whole
+      output and prorated per sentence. Defaults to a character estimate.
+    - stemmer: Stemmer used for BM25 tokens (the memory database's, so tokens are shared).
+    - with_tokens (bool): Also return the token length of the result, so callers need not
+      count it again.
+
+    Returns:
+    - str: The compressed result, or (result, tokens) with `with_tokens`.
+    """
+    sentences = deduplicate(split_sentences(text, MIN_SENTENCE_CHARS))
+    if not sentences:
+        text = text.strip()
+        return (text, estimate_tokens(text)) if with_tokens else text
+    deduplicated = "\n".join(sentences)
+
+    total_tokens = token_count(deduplicated) if token_count else 0
+    tokens_per_char = total_tokens / len(deduplicated) if total_tokens else 1 / CHARS_PER_TOKEN
+    if len(deduplicated) * tokens_per_char <= budget_tokens:
+        return (deduplicated, math.ceil(len(deduplicated) * tokens_per_char)) if with_tokens else deduplicated
+
+    selected, used = [], 0.0
+    for index in rank_sentences(sentences, utterance, stemmer):
+        cost = (len(sentences[index]) + 1) * tokens_per_char
+        if used + cost <= budget_tokens:
+            selected.append(index)
+            used += cost
+    queue_message(f"INFO: Tool output compressed from {len(sentences)} to {len(selected)} sentences.")
+    compressed = "\n".join(sentences[i] for i in sorted(selected))
+    return (compressed, math.ceil(used)) if with_tokens else compressed
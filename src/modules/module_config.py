@@ -51,11 +51,25 @@ class TTSConfig:
     
     # Server specific settings
     ttsurl: Optional[str] = None
+    alltalk_streaming: bool = True
+    alltalk_prefetch: int = 2
 
     #openai tts
     openai_voice: Optional[str] = None
     openai_api_key: Optional[str] = None
+    tts_streaming: bool = True
+    silero_threads: int = 2
+    silero_optimize: bool = False
 
+    # Phrase audio cache size in MB (0 disables it)
+    phrase_cache_mb: int = 32
+
+    # Synthesized chunks kept ready ahead of playback
+    lookahead: int = 2
+
+    # Output device and speech gain under beeps
+    audio_device: Optional[str] = "1"
+    duck_gain: float = 0.35
 
 
     def __getitem__(self, key):
@@ -95,8 +109,17 @@ class TTSConfig:
             voice_id=config_dict.get('voice_id'),
             model_id=config_dict.get('model_id'),
             ttsurl=config_dict.get('ttsurl'),
+            alltalk_streaming=config_dict.get('alltalk_streaming', True),
+            alltalk_prefetch=config_dict.get('alltalk_prefetch', 2),
             openai_voice=config_dict.get('openai_voice'),
-            openai_api_key=config_dict.get('openai_api_key')
+            openai_api_key=config_dict.get('openai_api_key'),
+            tts_streaming=config_dict.get('tts_streaming', True),
+            silero_threads=config_dict.get('silero_threads', 2),
+            silero_optimize=config_dict.get('silero_optimize', False),
+            phrase_cache_mb=config_dict.get('phrase_cache_mb', 32),
+            lookahead=config_dict.get('lookahead', 2),
+            audio_device=config_dict.get('audio_device', "1"),
+            duck_gain=config_dict.get('duck_gain', 0.35),
         )
 
 def load_config():
@@ -195,6 +218,17 @@ def load_config():
             "systemprompt": config['LLM']['systemprompt'],
             "instructionprompt": config['LLM']['instructionprompt'],
             "functioncalling": config['LLM']['functioncalling'], 
+            "fallback_backends": config.get('LLM', 'fallback_backends', fallback=''),
+            "request_timeout": config.getfloat('LLM', 'request_timeout', fallback=30.0),
+            "hedge_requests": config.getboolean('LLM', 'hedge_requests', fallback=True),
+            "max_concurrent": config.get('LLM', 'max_concurrent', fallback='auto'),
+            "queue_size": config.getint('LLM', 'queue_size', fallback=4),
+            "cache_enabled": config.getboolean('LLM', 'cache_enabled', fallback=True),
+            "cache_size": config.getint('LLM', 'cache_size', fallback=512),
+            "cache_ttl": config.getfloat('LLM', 'cache_ttl', fallback=86400.0),
+            "online_learning": config.getboolean('LLM', 'online_learning', fallback=True),
+            "retrain_every": config.getint('LLM', 'retrain_every', fallback=20),
+            "embedding_threshold": config.getfloat('LLM', 'embedding_threshold', fallback=0.6),
         },
         "VISION": {
             "enabled": config.getboolean('VISION', 'enabled'),
@@ -204,6 +238,7 @@ def load_config():
         "EMOTION": {
             "enabled": config.getboolean('EMOTION', 'enabled'),
             "emotion_model": config['EMOTION']['emotion_model'],
+            "runtime": config.get('EMOTION', 'runtime', fallback='onnx'),
         },
         "TTS": TTSConfig.from_config_dict({
             "ttsoption": config['TTS']['ttsoption'],
@@ -211,6 +246,8 @@ def load_config():
             "elevenlabs_api_key": os.getenv('ELEVENLABS_API_KEY'),
             "azure_region": config['TTS']['azure_region'],
             "ttsurl": config['TTS']['ttsurl'],
+            "alltalk_streaming": config.getboolean('TTS', 'alltalk_streaming', fallback=True),
+            "alltalk_prefetch": config.getint('TTS', 'alltalk_prefetch', fallback=2),
             "toggle_charvoice": config.getboolean('TTS', 'toggle_charvoice'),
             "tts_voice": config['TTS']['tts_voice'],
             "voice_id": config['TTS']['voice_id'],
@@ -221,6 +258,13 @@ def load_config():
             "global_timer_paused": config.getboolean('TTS', 'global_timer_paused'),
             "openai_voice" : config['TTS']['openai_voice'],
             "openai_api_key": os.getenv('OPENAI_API_KEY'),
+            "tts_streaming": config.getboolean('TTS', 'tts_streaming', fallback=True),
+            "silero_threads": config.getint('TTS', 'silero_threads', fallback=2),
+            "silero_optimize": config.getboolean('TTS', 'silero_optimize', fallback=False),
+            "phrase_cache_mb": config.getint('TTS', 'phrase_cache_mb', fallback=32),
+            "lookahead": config.getint('TTS', 'lookahead', fallback=2),
+            "audio_device": config.get('TTS', 'audio_device', fallback="1"),
+            "duck_gain": config.getfloat('TTS', 'duck_gain', fallback=0.35),
         }),
         "CHATUI": {
             "enabled": config['CHATUI']['enabled'],
@@ -230,6 +274,24 @@ def load_config():
             "vector_weight": config.getfloat('RAG', 'vector_weight', fallback=0.5),
             "top_k": config.getint('RAG', 'top_k', fallback=5),
         },
+        "TOOLS": {
+            "max_workers": config.getint('TOOLS', 'max_workers', fallback=4),
+            "timeout": config.getfloat('TOOLS', 'timeout', fallback=20.0),
+            "timeouts": config.get('TOOLS', 'timeouts', fallback='Vision:30, SDmodule-Generate:120, Move:15, Volume:10'),
+            "cache_ttls": config.get('TOOLS', 'cache_ttls', fallback=''),
+            "warmup": config.get('TOOLS', 'warmup', fallback=''),
+            "idle_unload": config.getint('TOOLS', 'idle_unload', fallback=600),
+            "compress_results": config.getboolean('TOOLS', 'compress_results', fallback=True),
+            "result_share": config.getfloat('TOOLS', 'result_share', fallback=0.5),
+        },
+        "WEBSEARCH": {
+            "max_bytes": config.getint('WEBSEARCH', 'max_bytes', fallback=1500000),
+            "fetch_timeout": config.getfloat('WEBSEARCH', 'fetch_timeout', fallback=8.0),
+            "selenium_fallback": config.getboolean('WEBSEARCH', 'selenium_fallback', fallback=True),
+            "providers": [p.strip() for p in config.get('WEBSEARCH', 'providers', fallback='google, duckduckgo, mojeek').split(',') if p.strip()],
+            "category_ttls": config.get('WEBSEARCH', 'category_ttls', fallback='weather:900, news:1800, search:86400'),
+            "cache_size": config.getint('WEBSEARCH', 'cache_size', fallback=256),
+        },
         "HOME_ASSISTANT": {
             "enabled": config['HOME_ASSISTANT']['enabled'],
             "url": config['HOME_ASSISTANT']['url'],
@@ -473,7 +535,7 @@ class TarsConfigIntegration:
                             'is_talking', 'global_timer_paused', 'use_indicators', 'server_hosted',
                             'restore_faces', 'UI_enabled', 'maximize_console', 'neural_net',
                             'neural_net_always_visible', 'show_mouse', 'use_camera_module',
-                            'fullscreen', 'auto_shutdown']:
+                            'fullscreen', 'auto_shutdown', 'hedge_requests', 'cache_enabled', 'online_learning', 'selenium_fallback', 'compress_results', 'alltalk_streaming', 'tts_streaming', 'silero_optimize']:
                 return (isinstance(value, bool) or 
                        str_value in ['true', 'false', '1', '0', 'yes', 'no', 'on', 'off'])
             
@@ -481,7 +543,7 @@ class TarsConfigIntegration:
             elif field_name in ['sensitivity', 'speechdelay', 'contextsize', 'max_tokens',
                               'seed', 'top_k', 'steps', 'width', 'height', 'screen_width',
                               'screen_height', 'rotation', 'background_id', 'font_size',
-                              'target_fps', 'battery_capacity_mAh']:
+                              'target_fps', 'battery_capacity_mAh', 'queue_size', 'cache_size', 'retrain_every', 'max_workers', 'idle_unload', 'max_bytes', 'phrase_cache_mb', 'lookahead', 'alltalk_prefetch', 'silero_threads']:
                 try:
                     int(float(str_value))  # Allow "8.0" -> 8
                     return True
@@ -490,7 +552,8 @@ class TarsConfigIntegration:
             
             # Float fields - accept float, numeric strings
             elif field_name in ['temperature', 'top_p', 'vector_weight', 'denoising_strength',
-                              'cfg_scale', 'battery_initial_voltage', 'battery_cutoff_voltage']:
+                              'cfg_scale', 'battery_initial_voltage', 'battery_cutoff_voltage',
+                              'request_timeout', 'cache_ttl', 'embedding_threshold', 'timeout', 'fetch_timeout', 'result_share', 'duck_gain']:
                 try:
                     float(str_value)
                     return True
@@ -0,0 +1,251 @@
+"""
+module_dsp.py
+
+Voice effects for the TARS-AI application, implemented with numpy/scipy.
+
+Provides streaming building blocks that keep their state between blocks, so a voice can be
+processed as it is synthesized:
+- PolyphaseResampler: rational-ratio resampling (the pitch drop).
+- WSOLA: time-stretch without changing the pitch (the speed-up).
+- Echo: a delay line adding delayed copies of the input.
+
+TarsEffect chains them into the TARS voice used by the Silero and espeak backends.
+Fixed-length stages work in place on float32 buffers; int16 input and output are
+converted without intermediate copies.
+"""
+
+# === Standard Libraries ===
+from fractions import Fraction
+
+import numpy as np
+from scipy import signal
+
+# === Constants ===
+# Changing any effect parameter must change this, so cached phrases are re-rendered
+TARS_EFFECTS_VERSION = "tars-dsp-1"
+
+TARS_PITCH = 0.88          # Pitch (and formant) factor of the TARS voice
+TARS_SPEED = 1.42          # Tempo factor applied after the pitch drop
+TARS_ECHOES = ((3.0, 2.0), (6.0, 1.0))  # (delay ms, gain dB) of the echo taps
+
+# === Conversions ===
+def int16_to_float(data, out=None):
+    """Convert int16 samples to float32 in [-1, 1) (into `out` when given)."""
+    if out is None:
+        out = np.empty(len(data), dtype=np.float32)
+    np.multiply(data, 1.0 / 32768.0, out=out, casting="unsafe")
+    return out
+
+def float_to_int16(data, out=None):
+    """Convert float samples to int16 with clipping (clips `data` in place; into `out` when given)."""
+    if out is None:
+        out = np.empty(len(data), dtype=np.int16)
+    np.clip(data, -1.0, 32767.0 / 32768.0, out=data)
+    np.multiply(data, 32768.0, out=out, casting="unsafe")
+    return out
+
+def as_float32(data):
+    """Return mono float32 samples for int16 or float input."""
+    data = np.asarray(data)
+    if data.dtype == np.int16:
+        return int16_to_float(data)
+    return data.astype(np.float32, copy=False)
+
+def db_to_gain(db):
+    return 10.0 ** (db / 20.0)
+
+# === Resampling ===
+class PolyphaseResampler:
+    """
+    Streaming resampler by the rational factor up/down (same filter design as
+    scipy.signal.resample_poly, with the filter delay compensated).
+    """
+    def __init__(self, up, down, half_taps=10):
+        divisor = np.gcd(up, down)
+        self.up, self.down = up // divisor, down // divisor
+        max_rate = max(self.up, self.down)
+        half_len = half_taps * max_rate
+        taps = signal.firwin(2 * half_len + 1, 1.0 / max_rate, window=("kaiser", 5.0)) * self.up
+        # Pad the filter so its delay lands on the output grid, then skip that many outputs
+        pad = -half_len % self.down
+        self.taps = np.concatenate([np.zeros(pad), taps]).astype(np.float32)
+        self.skip = (half_len + pad) // self.down
+        self._reset()
+
+    def _reset(self):
+        self.buffer = np.zeros(0, dtype=np.float32)
+        self.base = 0          # Input index of buffer[0] (a multiple of `down`)
+        self.produced = 0      # Output grid index of the next output
+        self.total_in = 0
+        self.total_out = 0
+
+    @classmethod
+    def from_factor(cls, factor, max_denominator=100):
+        """Resampler producing 1/factor times as many samples (0.88 -> up 25, down 22)."""
+        ratio = Fraction(factor).limit_denominator(max_denominator)
+        return cls(ratio.denominator, ratio.numerator)
+
+    def process(self, block):
+        """Resample a block; returns the output samples that are final so far."""
+        self.buffer = np.concatenate([self.buffer, as_float32(block)])
+        self.total_in += len(block)
+        if not len(self.buffer):
+            return np.zeros(0, dtype=np.float32)
+
+        grid_base = self.base * self.up // self.down
+        last = (len(self.buffer) * self.up - 1) // self.down  # Outputs not needing future input
+        start = max(self.produced, self.skip) - grid_base
+        output = np.zeros(0, dtype=np.float32)
+        if last >= start:
+            output = signal.upfirdn(self.taps, self.buffer, self.up, self.down)[start:last + 1]
+            output = output.astype(np.float32)
+            self.produced = grid_base + last + 1
+        self.total_out += len(output)
+
+        # Keep the input the next output still needs, starting at a multiple of `down`
+        needed = (self.produced * self.down - len(self.taps) + 1) // self.up
+        keep_from = max(0, needed // self.down * self.down)
+        if keep_from > self.base:
+            self.buffer = self.buffer[keep_from - self.base:]
+            self.base = keep_from
+        return output
+
+    def flush(self):
+        """Return the remaining output (the filter tail) and reset the stream."""
+        remaining = -(-self.total_in * self.up // self.down) - self.total_out
+        tail = self.process(np.zeros(len(self.taps) // self.up + self.down + 1, dtype=np.float32))
+        self._reset()
+        return tail[:max(0, remaining)]
+
+# === Time-stretch ===
+class WSOLA:
+    """
+    Streaming waveform-similarity overlap-add time-stretch: `speed` > 1 shortens the audio
+    without changing its pitch.
+    """
+    def __init__(self, sample_rate, speed, frame_ms=20.0, tolerance_ms=5.0):
+        self.speed = speed
+        self.frame = int(sample_rate * frame_ms / 1000) // 2 * 2
+        self.hop_out = self.frame // 2
+        self.hop_in = self.hop_out * speed
+        self.tolerance = int(sample_rate * tolerance_ms / 1000)
+        self.window = np.hanning(self.frame + 1)[:-1].astype(np.float32)  # Periodic: sums to 1 at 50% overlap
+        self._reset()
+
+    def _reset(self):
+        self.buffer = np.zeros(0, dtype=np.float32)
+        self.base = 0              # Input index of buffer[0]
+        self.index = 0             # Next output frame
+        self.previous = None       # Input position of the previous frame
+        self.pending = np.zeros(self.frame, dtype=np.float32)  # Overlap region of the output
+        self.total_in = 0
+        self.total_out = 0
+
+    def _next_position(self):
+        """Input position of the next frame, or None when more input is needed."""
+        nominal = int(round(self.index * self.hop_in))
+        end = self.base + len(self.buffer)
+        if self.previous is None:
+            return nominal if nominal + self.frame <= end else None
+        natural = self.previous + self.hop_out
+        low = max(nominal - self.tolerance, self.base)
+        high = nominal + self.tolerance + self.frame
+        if max(high, natural + self.frame) > end:
+            return None
+        # Pick the offset whose frame best continues the previous one
+        template = self.buffer[natural - self.base:natural - self.base + self.frame]
+        region = self.buffer[low - self.base:high - self.base]
+        correlation = np.correlate(region, template, mode="valid")
+        return low + int(np.argmax(correlation))
+
+    def process(self, block):
+        """Stretch a block; returns the output samples that are final so far."""
+        self.buffer = np.concatenate([self.buffer, as_float32(block)])
+        self.total_in += len(block)
+        outputs = []
+        while True:
+            position = self._next_position()
+            if position is None:
+                break
+            start = position - self.base
+            self.pending += self.buffer[start:start + self.frame] * self.window
+            outputs.append(self.pending[:self.hop_out].copy())
+            self.pending[:self.hop_out] = self.pending[self.hop_out:]
+            self.pending[self.hop_out:] = 0.0
+            self.previous = position
+            self.index += 1
+
+        # Drop input no later frame can reach
+        keep_from = min(self.previous + self.hop_out if self.previous is not None else 0,
+                        int(round(self.index * self.hop_in)) - self.tolerance)
+        if keep_from > self.base:
+            self.buffer = self.buffer[keep_from - self.base:]
+            self.base = keep_from
+
+        output = np.concatenate(outputs) if outputs else np.zeros(0, dtype=np.float32)
+        self.total_out += len(output)
+        return output
+
+    def flush(self):
+        """Return the remaining output and reset the stream."""
+        remaining = int(round(self.total_in / self.speed)) - self.total_out
+        tail = self.process(np.zeros(self.frame + 2 * self.tolerance + int(self.hop_in) + 1, dtype=np.float32))
+        tail = np.concatenate([tail, self.pending])
+        self._reset()
+        return tail[:max(0, remaining)]
+
+# === Filters ===
+class Echo:
+    """
+    Delay line adding delayed copies of the input: y[n] = x[n] + sum(g * x[n - d]).
+    """
+    def __init__(self, sample_rate, taps):
+        """
+        Parameters:
+        - taps: (delay ms, gain dB) pairs.
+        """
+        self.taps = [(int(sample_rate * ms / 1000), db_to_gain(db)) for ms, db in taps]
+        self.history = np.zeros(max(delay for delay, _ in self.taps), dtype=np.float32)
+
+    def process(self, block):
+        """Add the echoes to a float32 block in place."""
+        extended = np.concatenate([self.history, block])
+        offset = len(self.history)
+        for delay, gain in self.taps:
+            block += gain * extended[offset - delay:offset - delay + len(block)]
+        self.history = extended[len(extended) - offset:]
+        return block
+
+    def reset(self):
+        self.history[:] = 0.0
+
+# === Effect Chains ===
+class TarsEffect:
+    """
+    The TARS voice: pitch drop by resampling, WSOLA speed-up, then two short echoes.
+
+    Feed blocks with process() as they are synthesized and call flush() at the end of an
+    utterance, or use apply() on a whole buffer.
+    """
+    def __init__(self, sample_rate, pitch=TARS_PITCH, speed=TARS_SPEED, echoes=TARS_ECHOES):
+        self.resampler = PolyphaseResampler.from_factor(pitch)
+        self.stretch = WSOLA(sample_rate, speed)
+        self.echo = Echo(sample_rate, echoes)
+
+    def _finish(self, block):
+        return float_to_int16(self.echo.process(block))
+
+    def process(self, block):
+        """Process int16 or float samples; returns int16 output ready so far."""
+        return self._finish(self.stretch.process(self.resampler.process(block)))
+
+    def flush(self):
+        """Return the remaining int16 output and reset for the next utterance."""
+        stretched = np.concatenate([self.stretch.process(self.resampler.flush()), self.stretch.flush()])
+        output = self._finish(stretched)
+        self.echo.reset()
+        return output
+
+    def apply(self, data):
+        """Process a complete utterance."""
+        return np.concatenate([self.process(data), self.flush()])
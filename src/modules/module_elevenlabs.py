@@ -1,37 +1,39 @@
 import io
-import re
 import asyncio
-import os
-import hashlib
 from modules.module_config import load_config
 from elevenlabs.client import ElevenLabs
 
 from modules.module_messageQue import queue_message
+from modules.module_segment import speech_chunks
+from modules.module_audio import pcm_stream, iterate_in_thread
 
 CONFIG = load_config()
 
-elevenlabs_client = ElevenLabs(api_key=CONFIG['TTS']['elevenlabs_api_key'])
+PCM_RATE = 24000  # Raw 16-bit mono PCM format requested when streaming
 
-CACHE_DIR = os.path.expanduser("~/.local/share/tars_ai_replies")
-os.makedirs(CACHE_DIR, exist_ok=True)
+elevenlabs_client = ElevenLabs(api_key=CONFIG['TTS']['elevenlabs_api_key'])
 
-def get_cache_filename(text):
-    """Generate a cache filename based on text hash"""
-    text_hash = hashlib.md5(text.encode('utf-8')).hexdigest()
-    return os.path.join(CACHE_DIR, f"elevenlabs_{text_hash}.mp3")
+def _tts_params(chunk, output_format):
+    return {
+        "text": chunk,
+        "voice_id": CONFIG['TTS']['voice_id'],
+        "model_id": CONFIG['TTS']['model_id'],
+        "output_format": output_format,
+    }
+
+def stream_sentence(chunk):
+    """
+    Yield PCMChunk pieces of a sentence as ElevenLabs streams them.
+    """
+    tts = elevenlabs_client.text_to_speech
+    request = getattr(tts, "stream", None) or tts.convert  # The streaming endpoint when the SDK has it
+    yield from pcm_stream(request(**_tts_params(chunk, f"pcm_{PCM_RATE}")), PCM_RATE)
 
 async def synthesize_elevenlabs(chunk):
     try:
-        tts_params = {
-            "text": chunk,
-            "voice_id": CONFIG['TTS']['voice_id'],
-            "model_id": CONFIG['TTS']['model_id'],
-            "output_format": "mp3_44100_128",
-        }
-
-        audio_generator = elevenlabs_client.text_to_speech.convert(**tts_params)
+        audio_generator = elevenlabs_client.text_to_speech.convert(**_tts_params(chunk, "mp3_44100_128"))
 
-        audio_bytes = b"".join(audio_generator)
+        audio_bytes = await asyncio.to_thread(b"".join, audio_generator)
 
         if not audio_bytes:
             queue_message(f"ERROR: ElevenLabs returned an empty response for chunk: {chunk}")
@@ -46,44 +48,19 @@ async def synthesize_elevenlabs(chunk):
         queue_message(f"ERROR: ElevenLabs TTS synthesis failed: {e}")
         return None
 
-async def text_to_speech_with_pipelining_elevenlabs(text, is_wakeword):
-    #print(f"is_wakeword: {is_wakeword}")
-
-    if is_wakeword:
-        cache_file = get_cache_filename(text)
-
-        if os.path.exists(cache_file):
-            #queue_message(f"Loading wakeword from cache: {cache_file}")
-            try:
-                with open(cache_file, 'rb') as f:
-                    audio_bytes = f.read()
-                audio_buffer = io.BytesIO(audio_bytes)
-                audio_buffer.seek(0)
-                yield audio_buffer
-                return
-            except Exception as e:
-                queue_message(f"ERROR: Failed to load cache file: {e}")
-
-        queue_message(f"Generating and caching wakeword: {text}")
-        wav_buffer = await synthesize_elevenlabs(text)
-        if wav_buffer:
-
-            try:
-                audio_bytes = wav_buffer.read()
-                with open(cache_file, 'wb') as f:
-                    f.write(audio_bytes)
-                #queue_message(f"Cached wakeword to: {cache_file}")
-
-                audio_buffer = io.BytesIO(audio_bytes)
-                audio_buffer.seek(0)
-                yield audio_buffer
-            except Exception as e:
-                queue_message(f"ERROR: Failed to cache audio: {e}")
-
-                wav_buffer.seek(0)
-                yield wav_buffer
-    else:
-
-        wav_buffer = await synthesize_elevenlabs(text)
-        if wav_buffer:
-            yield wav_buffer
\ No newline at end of file
+async def text_to_speech_with_pipelining_elevenlabs(text):
+    """
+    Converts text to speech with ElevenLabs sentence by sentence, streaming raw PCM as it
+    arrives ([TTS] tts_streaming) or one MP3 per sentence.
+    """
+    # Wake word responses are cached by the shared phrase cache in module_tts
+    for chunk in speech_chunks(text):
+        if not CONFIG['TTS']['tts_streaming']:
+            yield await synthesize_elevenlabs(chunk)  # None if the sentence failed
+            continue
+        try:
+            async for pcm in iterate_in_thread(stream_sentence, chunk):
+                yield pcm
+        except Exception as e:
+            queue_message(f"ERROR: ElevenLabs TTS streaming failed: {e}")
+            yield None  # Marks the sentence as failed
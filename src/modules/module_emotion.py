@@ -0,0 +1,171 @@
+"""
+module_emotion.py
+
+Emotion detection for the TARS-AI avatar.
+
+Provides:
+- A lazily loaded go_emotions classifier, exported to ONNX and quantized to int8 when
+  optimum[onnxruntime] is available, with the full-precision transformers pipeline as fallback.
+- A single bounded worker: only the newest reply is classified, older pending ones are dropped.
+- An LRU cache of results keyed by reply hash.
+- In-process delivery to a registered listener (the chat UI avatar), or HTTP when none is registered.
+"""
+
+# === Standard Libraries ===
+import os
+import time
+import hashlib
+import platform
+import threading
+from collections import OrderedDict
+
+from modules.module_config import load_config
+from modules.module_http import http_post, CHATUI_URL
+from modules.module_messageQue import queue_message
+
+# === Constants and Globals ===
+CONFIG = load_config()
+CACHE_SIZE = 256
+MAX_CHARS = 1000  # Replies are truncated before classification, the tokenizer truncates further
+
+classifier = None
+_classifier_lock = threading.Lock()
+_listener = None
+_cache = OrderedDict()
+_condition = threading.Condition()
+_pending = None
+_worker = None
+_stats = {"submitted": 0, "classified": 0, "cache_hits": 0, "dropped": 0, "errors": 0, "total_latency": 0.0}
+
+# === Classifier ===
+def _load_onnx_classifier(model_name):
+    """
+    Export the model to ONNX and quantize it to int8 (once), then load it into a pipeline.
+    """
+    from transformers import AutoTokenizer, pipeline
+    from optimum.onnxruntime import ORTModelForSequenceClassification, ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+
+    export_dir = os.path.join(CONFIG['BASE_DIR'], 'emotion', model_name.replace('/', '_'))
+    quantized_file = "model_quantized.onnx"
+
+    if not os.path.exists(os.path.join(export_dir, quantized_file)):
+        queue_message(f"INFO: Exporting {model_name} to ONNX int8, this only happens once...")
+        model = ORTModelForSequenceClassification.from_pretrained(model_name, export=True)
+        model.save_pretrained(export_dir)
+        AutoTokenizer.from_pretrained(model_name).save_pretrained(export_dir)
+
+        if platform.machine().lower() in ["aarch64", "arm64"]:
+            qconfig = AutoQuantizationConfig.arm64(is_static=False, per_channel=False)
+        else:
+            qconfig = AutoQuantizationConfig.avx2(is_static=False, per_channel=False)
+        ORTQuantizer.from_pretrained(model).quantize(save_dir=export_dir, quantization_config=qconfig)
+
+    model = ORTModelForSequenceClassification.from_pretrained(export_dir, file_name=quantized_file)
+    tokenizer = AutoTokenizer.from_pretrained(export_dir)
+    return pipeline("text-classification", model=model, tokenizer=tokenizer, top_k=None)
+
+def _load_transformers_classifier(model_name):
+    from transformers import pipeline
+    return pipeline("text-classification", model=model_name, top_k=None)
+
+def get_classifier():
+    """
+    Return the emotion classifier, loading it on first use.
+    """
+    global classifier
+    with _classifier_lock:
+        if classifier is None:
+            model_name = CONFIG['EMOTION']['emotion_model']
+            if CONFIG['EMOTION']['runtime'] == "onnx":
+                try:
+                    classifier = _load_onnx_classifier(model_name)
+                    queue_message(f"INFO: Emotion classifier loaded (ONNX int8): {model_name}")
+                except Exception as e:
+                    queue_message(f"WARNING: ONNX emotion classifier unavailable ({e}), using transformers.")
+            if classifier is None:
+                classifier = _load_transformers_classifier(model_name)
+                queue_message(f"INFO: Emotion classifier loaded: {model_name}")
+    return classifier
+
+def classify_emotion(text):
+    """
+    Return the most likely emotion label for `text`, using the result cache.
+    """
+    key = hashlib.sha1(text.encode("utf-8")).hexdigest()
+    with _condition:
+        if key in _cache:
+            _cache.move_to_end(key)
+            _stats["cache_hits"] += 1
+            return _cache[key]
+
+    started = time.monotonic()
+    model_outputs = get_classifier()(text[:MAX_CHARS], truncation=True)
+    label = max(model_outputs[0], key=lambda x: x['score'])['label']
+
+    with _condition:
+        _stats["classified"] += 1
+        _stats["total_latency"] += time.monotonic() - started
+        _cache[key] = label
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return label
+
+# === Delivery ===
+def register_emotion_listener(callback):
+    """
+    Deliver detected emotions to `callback(emotion)` in-process instead of over HTTP.
+    """
+    global _listener
+    _listener = callback
+
+def _deliver(emotion):
+    if _listener is not None:
+        _listener(emotion)
+    else:
+        http_post(f"{CHATUI_URL}/emotion", data=emotion, timeout=10)
+
+# === Worker ===
+def _work():
+    global _pending
+    while True:
+        with _condition:
+            while _pending is None:
+                _condition.wait()
+            text, _pending = _pending, None
+        try:
+            _deliver(classify_emotion(text))
+        except Exception as e:
+            with _condition:
+                _stats["errors"] += 1
+            queue_message(f"ERROR: Emotion detection failed: {e}")
+
+def submit_emotion(text):
+    """
+    Queue a bot reply for emotion detection without blocking the caller.
+
+    Only the newest reply is kept: if the worker is still busy, a reply that has not
+    been classified yet is replaced and counted as dropped.
+    """
+    global _pending, _worker
+    if not text:
+        return
+    with _condition:
+        if _worker is None:
+            _worker = threading.Thread(target=_work, name="EmotionWorker", daemon=True)
+            _worker.start()
+        if _pending is not None:
+            _stats["dropped"] += 1
+        _pending = text
+        _stats["submitted"] += 1
+        _condition.notify()
+
+def get_emotion_stats():
+    """
+    Return counters for the emotion worker, including the average inference latency in seconds.
+    """
+    with _condition:
+        stats = dict(_stats)
+        stats["cache_size"] = len(_cache)
+    stats["avg_latency"] = round(stats.pop("total_latency") / stats["classified"], 4) if stats["classified"] else None
+    return stats
@@ -5,7 +5,7 @@ Core module for TARS-AI responsible for:
 - Predicting user intents and determining required modules.
 - Executing tool-specific functions like web searches, vision analysis, and volume control.
 
-This is achieved using a pre-trained Naive Bayes classifier and TF-IDF vectorizer.
+This is achieved using a pre-trained Naive Bayes classifier over hashed text features.
 """
 # MIT License
 # 
@@ -36,44 +36,141 @@ from datetime import datetime
 import threading
 import json
 import re
+import csv
+import time
+import hashlib
+import subprocess
+import sys
+from collections import OrderedDict
+import numpy as np
 
 # === Custom Modules ===
-from modules.module_websearch import search_google, search_google_news
-from modules.module_vision import describe_camera_view
-from modules.module_stablediffusion import generate_image
-from modules.module_volume import handle_volume_command
-from modules.module_homeassistant import send_prompt_to_homeassistant
-from modules.module_tts import generate_tts_audio
+from modules.module_tts import play_phrase, PROCESSING_PHRASE
 from modules.module_config import load_config, update_character_setting
 from modules.module_messageQue import queue_message
+from modules.module_fastpath import parse_movement, parse_persona
+from modules.module_engineTrainer import append_labelled_utterance, read_online_rows
+from modules.module_utterance import as_utterance
+from modules.module_tools import ToolRuntime, parse_tool_settings
+from modules.module_toolregistry import ToolRegistry
 
 # === Constants ===
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))  # Move up to "src"
 MODEL_FILENAME = os.path.join(BASE_DIR, 'engine/pickles/naive_bayes_model.pkl')
 VECTORIZER_FILENAME = os.path.join(BASE_DIR, 'engine/pickles/module_engine_model.pkl')
 TRAINING_DATA_PATH = os.path.join(BASE_DIR, 'engine/training/training_data.csv')
+EMBEDDING_INDEX_FILENAME = os.path.join(BASE_DIR, 'engine/pickles/intent_embeddings.npz')
+INTENT_CACHE_SIZE = 512
+INTENT_THRESHOLD = 0.75
+EMBEDDING_NEIGHBOURS = 5
 
 CONFIG = load_config()
 
+nb_classifier = None
+tfidf_vectorizer = None
+_model_lock = threading.Lock()
+_model_version = 0
+
+_intent_cache = OrderedDict()
+_intent_cache_lock = threading.Lock()
+_intent_stats = {"hits": 0, "misses": 0}
+
+tool_runtime = ToolRuntime(
+    max_workers=CONFIG['TOOLS']['max_workers'],
+    default_timeout=CONFIG['TOOLS']['timeout'],
+    timeouts=parse_tool_settings(CONFIG['TOOLS']['timeouts']),
+    cache_ttls=parse_tool_settings(CONFIG['TOOLS']['cache_ttls']),
+)
+
+_embedding_index = None
+_embedding_index_lock = threading.Lock()
+
+_retrain_lock = threading.Lock()
+_retrain_process = None
+_retrain_again = False
+_new_utterances = 0
 
 # === Load Models ===
-try:
-    if not os.path.exists(VECTORIZER_FILENAME):
-        raise FileNotFoundError("Vectorizer file not found.")
-    if not os.path.exists(MODEL_FILENAME):
-        raise FileNotFoundError("Model file not found.")
-    nb_classifier = joblib.load(MODEL_FILENAME)
-    tfidf_vectorizer = joblib.load(VECTORIZER_FILENAME)
-
-except FileNotFoundError as e:
-    # Attempt to train models if files are missing
-    import module_engineTrainer
-    module_engineTrainer.train_text_classifier()
+def load_intent_model():
+    """
+    Load the classifier and vectorizer pickles and swap them in together.
+
+    Returns:
+        bool: True if a model is now loaded.
+    """
+    global nb_classifier, tfidf_vectorizer, _model_version
+    try:
+        classifier = joblib.load(MODEL_FILENAME)
+        vectorizer = joblib.load(VECTORIZER_FILENAME)
+    except (OSError, EOFError, ValueError) as e:
+        queue_message(f"LOAD: Intent model not available: {e}")
+        return False
+
+    with _model_lock:
+        nb_classifier, tfidf_vectorizer = classifier, vectorizer
+        _model_version += 1
+    clear_intent_cache()
+    return True
+
+def start_retraining(full=False):
+    """
+    Update the intent model in a background process and hot-swap it when done.
+
+    The trainer runs as a separate interpreter so training never blocks (or shares the GIL
+    with) the voice loop; its pickles are written atomically before they are reloaded here.
+    A request made while a run is in progress is queued as one follow-up run.
+    """
+    global _retrain_process, _retrain_again
+    with _retrain_lock:
+        if _retrain_process is not None:
+            _retrain_again = True
+            return
+        _retrain_process = subprocess.Popen(
+            [sys.executable, "-m", "modules.module_engineTrainer", "full" if full else "update"],
+            cwd=BASE_DIR,
+        )
+    threading.Thread(target=_await_retraining, args=(_retrain_process,), daemon=True).start()
+
+def _await_retraining(process):
+    global _retrain_process, _retrain_again
+    if process.wait() == 0:
+        if load_intent_model():
+            queue_message("LOAD: Intent model reloaded.")
+        if get_routing_method() == "embedding":
+            build_embedding_index(rebuild=True)
+    else:
+        queue_message(f"ERROR: Intent model training failed (exit code {process.returncode}).")
+
+    with _retrain_lock:
+        _retrain_process = None
+        run_again, _retrain_again = _retrain_again, False
+    if run_again:
+        start_retraining()
+
+def record_labelled_utterance(user_input, label):
+    """
+    Store an utterance with a trusted label for online learning, retraining every
+    `retrain_every` new utterances when routing uses the trained data (nb or embedding).
+    Otherwise the rows are only kept for the next training run.
+    """
+    global _new_utterances
+    if not CONFIG['LLM']['online_learning']:
+        return
     try:
-        nb_classifier = joblib.load(MODEL_FILENAME)
-        tfidf_vectorizer = joblib.load(VECTORIZER_FILENAME)
-    except Exception as retry_exception:
-        raise RuntimeError("Critical error while loading models.") from retry_exception
+        append_labelled_utterance(user_input, label)
+    except OSError as e:
+        queue_message(f"ERROR: Could not store labelled utterance: {e}")
+        return
+    if get_routing_method() not in ("nb", "embedding"):
+        return  # The running config does not use the NB model or the embedding index
+
+    with _retrain_lock:
+        _new_utterances += 1
+        due = _new_utterances >= CONFIG['LLM']['retrain_every']
+        if due:
+            _new_utterances = 0
+    if due:
+        start_retraining()
 
 # === Functions ===
 def execute_movement(movement, times):
@@ -128,7 +225,15 @@ def movement_llmcall(user_input):
     - bool: True if the movement command was successfully interpreted and executed, False otherwise.
     - str: Error message if the command could not be processed.
     """
-    from module_llm import raw_complete_llm
+    # Common phrasings are parsed directly, the LLM is only used when the parser is unsure
+    parsed = parse_movement(user_input)
+    if parsed:
+        movement, times = parsed
+        queue_message(f"[DEBUG] FastPath: {movement}, {times}")
+        execute_movement(movement, times)
+        return True
+
+    from modules.module_llm import raw_complete_llm
     # Define the prompt with placeholders
     prompt = f"""
     You are TARS, an AI module responsible for interpreting movement commands. Your job is to:
@@ -209,7 +314,7 @@ def movement_llmcall(user_input):
     Output:
     """
     try:
-        data = raw_complete_llm(prompt)
+        data = raw_complete_llm(prompt, temperature=0)
 
         import json
         # Parse the JSON response
@@ -244,69 +349,305 @@ def call_function(module_name, *args, **kwargs):
     if module_name not in FUNCTION_REGISTRY:
         #queue_message(f"[DEBUG] No function registered for module: {module_name}")
         return "Not a Function"
-    func = FUNCTION_REGISTRY[module_name]
+    tool = FUNCTION_REGISTRY[module_name]
     try:
-        # Check if the function requires arguments
-        if func.__code__.co_argcount == 0:  # No arguments expected
-            return func()
-        else:  # Pass arguments if required
-            return func(*args, **kwargs)
+        # Runs on the tool pool with the tool's deadline; results may come from the tool cache.
+        # The tool loads its module on first call and drops the arguments if it takes none.
+        query = args[0] if args else None
+        return tool_runtime.run(module_name, tool, *args, query=query, **kwargs)
     except Exception as e:
         queue_message(f"[DEBUG] Error while executing {module_name}: {e}")
 
+def get_tool_stats():
+    """
+    Return per-tool latency, timeout, error and cache statistics.
+    """
+    return tool_runtime.get_stats()
+
+def shutdown_tools():
+    """
+    Cancel running tool calls and run the shutdown hooks of loaded tool modules.
+    """
+    tool_runtime.cancel_all()
+    FUNCTION_REGISTRY.shutdown()
+
 def check_for_module(user_input):
     """
     Determines the appropriate module to handle the user's input and invokes it.
+
+    Parameters:
+        user_input (str | UtteranceContext): The user's utterance.
     """
-    predicted_class, probability = predict_class(user_input)
+    utterance = as_utterance(user_input)
+    predicted_class, probability = predict_class(utterance)
     if not predicted_class:
         return "None"
+    if utterance.source == "voice":
+        play_phrase(PROCESSING_PHRASE)  # Pre-rendered acknowledgement, plays while the tool runs
     
     # Call the function associated with the predicted class
-    return call_function(predicted_class, user_input)
+    return call_function(predicted_class, utterance.text)
+
+def get_routing_method():
+    """Return the configured function calling method in lower case: nb, embedding or llm."""
+    return CONFIG['LLM']['functioncalling'].strip().lower()
 
 def predict_class(user_input):
     """
-    Which method to use for function calling NB (single LLM CALL) or LLM (Multiple LLM Calls)
+    Which method to use for function calling NB (single LLM CALL), embedding (nearest labelled
+    utterances, reuses the memory embedding) or LLM (Multiple LLM Calls)
     """
-    if CONFIG['LLM']['functioncalling'] == 'NB':
+    method = get_routing_method()
+    if method == 'nb':
         return predict_class_nb(user_input)
+    elif method == 'embedding':
+        return predict_class_embedding(user_input)
     else:
-        return predict_class_llm(user_input)
-    return
+        return predict_class_llm(as_utterance(user_input).text)
 
 def predict_class_nb(user_input):
     """
     Predicts the class and its confidence score for a given user input.
 
     Parameters:
-        user_input (str): The input text from the user.
+        user_input (str | UtteranceContext): The input text from the user.
 
     Returns:
         tuple: Predicted class and its probability score.
     """
-    query_vector = tfidf_vectorizer.transform([user_input])
-    predictions = nb_classifier.predict(query_vector)
-    predicted_probabilities = nb_classifier.predict_proba(query_vector)
-
-    predicted_class = predictions[0]
-    max_probability = max(predicted_probabilities[0])
+    predicted_class, max_probability = predict_intent(user_input)
     # Return None if confidence is below threshold
 
     #queue_message(f"TOOL: Using Tool {predicted_class} ({max_probability})")
 
-    if max_probability < 0.75:
+    if max_probability < INTENT_THRESHOLD:
         return None, max_probability
 
     # Format the value as a percentage with 2 decimal places
     formatted_probability = "{:.2f}%".format(max_probability * 100)
     queue_message(f"TOOL: Using Tool {predicted_class} ({formatted_probability})")
-    generate_tts_audio("processing, processing, processing", False, CONFIG['TTS']['ttsoption'], CONFIG['TTS']['azure_api_key'], CONFIG['TTS']['azure_region'], CONFIG['TTS']['ttsurl'], CONFIG['TTS']['toggle_charvoice'], CONFIG['TTS']['tts_voice'])
 
     return predicted_class, max_probability
 
+def predict_class_embedding(user_input):
+    """
+    Predicts the class by comparing the utterance embedding with the embedded training data.
+
+    The query embedding comes from the utterance context, so the memory search of the same
+    turn reuses it instead of running the transformer again.
+
+    Parameters:
+        user_input (str | UtteranceContext): The input text from the user.
+
+    Returns:
+        tuple: Predicted class and its cosine similarity score.
+    """
+    index = build_embedding_index()
+    if index is None:
+        return None, 0.0
+    vectors, labels = index
+
+    query_vector = np.asarray(as_utterance(user_input).embedding, dtype=np.float32)
+    similarities = vectors @ (query_vector / (np.linalg.norm(query_vector) or 1.0))
+    neighbours = np.argsort(similarities)[::-1][:EMBEDDING_NEIGHBOURS]
+
+    # Similarity-weighted vote over the nearest labelled utterances
+    votes = {}
+    for i in neighbours:
+        votes[labels[i]] = votes.get(labels[i], 0.0) + float(similarities[i])
+    predicted_class = max(votes, key=votes.get)
+    similarity = max(float(similarities[i]) for i in neighbours if labels[i] == predicted_class)
+
+    if similarity < CONFIG['LLM']['embedding_threshold']:
+        return None, similarity
+
+    queue_message(f"TOOL: Using Tool {predicted_class} ({similarity * 100:.2f}%)")
+
+    return predicted_class, similarity
+
+def build_embedding_index(rebuild=False):
+    """
+    Embed the labelled training utterances (training data plus online rows) for the embedding router.
+
+    The normalized vectors are cached in engine/pickles/intent_embeddings.npz and only
+    recomputed when the labelled data changes.
+
+    Returns:
+        tuple: (vectors, labels) numpy arrays, or None if there is no training data.
+    """
+    global _embedding_index
+    with _embedding_index_lock:
+        if _embedding_index is not None and not rebuild:
+            return _embedding_index
+
+        rows = []
+        with open(TRAINING_DATA_PATH, newline="", encoding="utf-8") as file:
+            rows.extend((row["query"], row["label"].strip()) for row in csv.DictReader(file))
+        rows.extend(read_online_rows())
+        if not rows:
+            return None
+
+        signature = hashlib.sha256("\n".join(f"{query}\t{label}" for query, label in rows).encode("utf-8")).hexdigest()
+        try:
+            cached = np.load(EMBEDDING_INDEX_FILENAME)
+            if str(cached["signature"]) == signature:
+                _embedding_index = (cached["vectors"], cached["labels"])
+                return _embedding_index
+        except (OSError, KeyError, ValueError):
+            pass
+
+        from modules.module_hyperdb import get_embedding
+        queue_message(f"LOAD: Embedding {len(rows)} labelled utterances for intent routing...")
+        vectors = np.asarray(get_embedding([query for query, _ in rows]), dtype=np.float32)
+        vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+        labels = np.array([label for _, label in rows])
+
+        tmp_path = f"{EMBEDDING_INDEX_FILENAME}.tmp"
+        with open(tmp_path, "wb") as file:
+            np.savez(file, vectors=vectors, labels=labels, signature=np.array(signature))
+        os.replace(tmp_path, EMBEDDING_INDEX_FILENAME)
+
+        _embedding_index = (vectors, labels)
+        return _embedding_index
+
+def _predict_vectors(classifier, query_vectors):
+    """
+    Single predict_proba pass over a batch; the label is the argmax of the probabilities.
+
+    Returns:
+        list: (label, probability) tuples.
+    """
+    probabilities = classifier.predict_proba(query_vectors)
+    best = probabilities.argmax(axis=1)
+    labels = classifier.classes_[best]
+    scores = probabilities[np.arange(len(best)), best]
+    return [(str(label), float(score)) for label, score in zip(labels, scores)]
+
+def predict_many(utterances, use_cache=True):
+    """
+    Predict the intent of a batch of utterances with one vectorizer call.
+
+    Parameters:
+        utterances (list): Input texts or UtteranceContext objects.
+        use_cache (bool): Serve and store results in the intent cache.
+
+    Returns:
+        list: (label, probability) tuples in input order; (None, 0.0) while no model is loaded.
+    """
+    with _model_lock:
+        classifier, vectorizer, version = nb_classifier, tfidf_vectorizer, _model_version
+    if classifier is None:
+        return [(None, 0.0) for _ in utterances]
+
+    contexts = [as_utterance(text) for text in utterances]
+    keys = [context.intent_key for context in contexts]
+    results = [None] * len(keys)
+
+    if use_cache:
+        with _intent_cache_lock:
+            for i, key in enumerate(keys):
+                if key in _intent_cache:
+                    _intent_cache.move_to_end(key)
+                    results[i] = _intent_cache[key]
+                    _intent_stats["hits"] += 1
+                else:
+                    _intent_stats["misses"] += 1
+
+    missing = [i for i, result in enumerate(results) if result is None]
+    if missing:
+        if len(missing) == 1:
+            query_vectors = contexts[missing[0]].tfidf_vector(vectorizer)
+        else:
+            query_vectors = vectorizer.transform([keys[i] for i in missing])
+        for i, result in zip(missing, _predict_vectors(classifier, query_vectors)):
+            results[i] = result
+
+        # Skip caching if the model was swapped while predicting
+        if use_cache and version == _model_version:
+            with _intent_cache_lock:
+                for i in missing:
+                    _intent_cache[keys[i]] = results[i]
+                while len(_intent_cache) > INTENT_CACHE_SIZE:
+                    _intent_cache.popitem(last=False)
+
+    return results
+
+def predict_intent(user_input):
+    """
+    Predict the intent of a single utterance.
+
+    Returns:
+        tuple: Predicted class and its probability score.
+    """
+    return predict_many([user_input])[0]
+
+def clear_intent_cache():
+    """
+    Drop cached predictions (e.g. after the model has been retrained).
+    """
+    with _intent_cache_lock:
+        _intent_cache.clear()
+
+def get_intent_cache_stats():
+    """
+    Return hit/miss counts, size and hit rate of the intent cache.
+    """
+    with _intent_cache_lock:
+        stats = dict(_intent_stats)
+        stats["size"] = len(_intent_cache)
+    lookups = stats["hits"] + stats["misses"]
+    stats["hit_rate"] = round(stats["hits"] / lookups, 3) if lookups else None
+    return stats
+
+def evaluate_intents(training_data_path=TRAINING_DATA_PATH, batch_size=64):
+    """
+    Stream a labelled CSV (query,label) through predict_many and report accuracy and throughput.
+
+    The file is read in batches, so arbitrarily large replay logs can be evaluated.
+    The cache is bypassed to measure the model itself.
+
+    Parameters:
+        training_data_path (str): CSV with "query" and "label" columns.
+        batch_size (int): Utterances per predict_many call.
+
+    Returns:
+        dict: Totals, accuracy, share above the tool threshold and utterances per second.
+    """
+    total = correct = confident = 0
+    elapsed = 0.0
+
+    def run(batch):
+        nonlocal total, correct, confident, elapsed
+        started = time.perf_counter()
+        predictions = predict_many([row["query"] for row in batch], use_cache=False)
+        elapsed += time.perf_counter() - started
+        for row, (label, probability) in zip(batch, predictions):
+            total += 1
+            correct += label == row["label"]
+            confident += probability >= INTENT_THRESHOLD
+
+    with open(training_data_path, newline="", encoding="utf-8") as file:
+        batch = []
+        for row in csv.DictReader(file):
+            batch.append(row)
+            if len(batch) >= batch_size:
+                run(batch)
+                batch = []
+        if batch:
+            run(batch)
+
+    report = {
+        "utterances": total,
+        "accuracy": round(correct / total, 4) if total else None,
+        "above_threshold": round(confident / total, 4) if total else None,
+        "seconds": round(elapsed, 4),
+        "utterances_per_second": round(total / elapsed, 1) if elapsed else None,
+    }
+    queue_message(f"INFO: Intent evaluation: {report}")
+    return report
+
 def predict_class_llm(user_input):
-    from module_llm import raw_complete_llm
+    from modules.module_llm import raw_complete_llm
 
     prompt = f"""
     You are an AI module tasked with predicting the appropriate tool usage based on the user's message, with a high level of accuracy and understanding of the intent behind their words. The available tools and their descriptions are as follows: {FUNCTION_REGISTRY}.
@@ -345,7 +686,7 @@ def predict_class_llm(user_input):
 
     try:
         # Get the raw response from the LLM
-        data = raw_complete_llm(prompt)
+        data = raw_complete_llm(prompt, temperature=0)
         #queue_message(f"[DEBUG] Raw LLM response: {repr(data)}")  # Show exact response
 
         # Strip out the markdown block (```) from the raw response
@@ -401,7 +742,7 @@ def predict_class_llm(user_input):
 
         formatted_probability = f"{max_probability * 100:.2f}%"
         queue_message(f"TOOL: Using Tool {predicted_class} ({formatted_probability})")
-        generate_tts_audio("processing, processing, processing", False, CONFIG['TTS']['ttsoption'], CONFIG['TTS']['azure_api_key'], CONFIG['TTS']['azure_region'], CONFIG['TTS']['ttsurl'], CONFIG['TTS']['toggle_charvoice'], CONFIG['TTS']['tts_voice'])
+        record_labelled_utterance(user_input, predicted_class)  # Teach the NB model from confident LLM picks
 
         return predicted_class, max_probability
 
@@ -419,8 +760,14 @@ def adjust_persona(user_input):
     Returns:
     - str: A confirmation message indicating the updated trait and value, or an error message if the input is invalid.
     """
-
-    from module_llm import raw_complete_llm
+    parsed = parse_persona(user_input)
+    if parsed:
+        trait, value = parsed
+        queue_message(f"INFO: Saving {trait}, {value}")
+        update_character_setting(trait, value)
+        return f"Updated {trait} setting to {value}"
+
+    from modules.module_llm import raw_complete_llm
     # Define the prompt with placeholders
     prompt = f"""
     You are TARS, an AI module responsible for extracting personality trait adjustments. Your job is to:
@@ -505,7 +852,7 @@ def adjust_persona(user_input):
     """
 
     try:
-        data = raw_complete_llm(prompt)
+        data = raw_complete_llm(prompt, temperature=0)
 
         # Strip out the markdown block (```json) and newlines, then parse the JSON response
         data = re.sub(r'```json\n|\n```', '', data).strip()
@@ -539,14 +886,47 @@ def adjust_persona(user_input):
 
  
 # === Function Calling ===
-FUNCTION_REGISTRY = {
-    "Weather": search_google, 
-    "News": search_google_news,
-    "Move": movement_llmcall,
-    "Vision": describe_camera_view,
-    "Search": search_google,
-    "SDmodule-Generate": generate_image,
-    "Volume": handle_volume_command,
-    "Persona": adjust_persona,
-    "Home_Assistant": send_prompt_to_homeassistant
-}
+# Tools are entry points resolved on first use, so a tool's module is only loaded when the
+# tool is called or warmed up. The web search browser is released again when idle.
+FUNCTION_REGISTRY = ToolRegistry()
+FUNCTION_REGISTRY.register_module(
+    "modules.module_websearch", shutdown="close_search",
+    idle_unload=CONFIG['TOOLS']['idle_unload'] or None,
+)
+FUNCTION_REGISTRY.register("Weather", "modules.module_websearch:search_weather")
+FUNCTION_REGISTRY.register("News", "modules.module_websearch:search_news")
+FUNCTION_REGISTRY.register("Move", movement_llmcall)
+FUNCTION_REGISTRY.register("Vision", "modules.module_vision:describe_camera_view")
+FUNCTION_REGISTRY.register("Search", "modules.module_websearch:search_web")
+FUNCTION_REGISTRY.register("SDmodule-Generate", "modules.module_stablediffusion:generate_image")
+FUNCTION_REGISTRY.register("Volume", "modules.module_volume:handle_volume_command")
+FUNCTION_REGISTRY.register("Persona", adjust_persona)
+FUNCTION_REGISTRY.register("Home_Assistant", "modules.module_homeassistant:send_prompt_to_homeassistant")
+
+def registry_fingerprint():
+    """
+    Return a short hash of the registered tool names and handlers.
+
+    Cached LLM side-call results are tied to this value and dropped when it changes.
+    """
+    entries = sorted(f"{name}={tool.target}" for name, tool in FUNCTION_REGISTRY.items())
+    return hashlib.sha256("|".join(entries).encode("utf-8")).hexdigest()[:16]
+
+# === Startup ===
+# Never block startup on training: without pickles, NB predictions return no tool until
+# the background run finishes.
+if not load_intent_model():
+    queue_message("LOAD: Training intent model in the background...")
+    start_retraining(full=True)
+
+FUNCTION_REGISTRY.start_reaper()
+if CONFIG['TOOLS']['warmup']:
+    FUNCTION_REGISTRY.warm_up([name.strip() for name in CONFIG['TOOLS']['warmup'].split(",")])
+
+if get_routing_method() == "embedding":
+    threading.Thread(target=build_embedding_index, daemon=True).start()
+
+if __name__ == "__main__":
+    # Offline evaluation: python -m modules.module_engine [path/to/data.csv] [batch_size]
+    args = sys.argv[1:]
+    evaluate_intents(args[0] if args else TRAINING_DATA_PATH, int(args[1]) if len(args) > 1 else 64)
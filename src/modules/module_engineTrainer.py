@@ -3,27 +3,56 @@ module_engineTrainer.py
 
 Text Classification Training Module for TARS-AI Application.
 
-This module uses labeled training data to build a Naive Bayes-based text classifier with TF-IDF vectorization. 
+This module uses labeled training data to build a Naive Bayes-based text classifier with a hashing vectorizer. 
 The trained model and vectorizer are saved as pickle files for use by other components of the application.
+
+The hashing vectorizer has a fixed feature space, so the model can also be updated incrementally
+(partial_fit) with labelled utterances collected by the running system. Run as a background process:
+
+    python -m modules.module_engineTrainer [update|full]
 """
 
 # === Standard Libraries ===
 import os
+import sys
+import csv
+import json
+import threading
 from datetime import datetime
-import pandas as pd
 import joblib
 from sklearn.naive_bayes import MultinomialNB
 from sklearn.calibration import CalibratedClassifierCV
-from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.feature_extraction.text import HashingVectorizer
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import accuracy_score
 
 from modules.module_messageQue import queue_message
 
 # === Constants ===
-DEFAULT_TRAINING_DATA_PATH = '../engine/training/training_data.csv'
-DEFAULT_MODEL_PATH = '../engine/pickles/naive_bayes_model.pkl'
-DEFAULT_VECTORIZER_PATH = '../engine/pickles/module_engine_model.pkl'
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))  # Move up to "src"
+DEFAULT_TRAINING_DATA_PATH = os.path.join(BASE_DIR, 'engine/training/training_data.csv')
+DEFAULT_ONLINE_DATA_PATH = os.path.join(BASE_DIR, 'engine/training/online_data.csv')
+DEFAULT_MODEL_PATH = os.path.join(BASE_DIR, 'engine/pickles/naive_bayes_model.pkl')
+DEFAULT_VECTORIZER_PATH = os.path.join(BASE_DIR, 'engine/pickles/module_engine_model.pkl')
+DEFAULT_STATE_PATH = os.path.join(BASE_DIR, 'engine/pickles/online_state.json')
+N_FEATURES = 2 ** 18
+
+_append_lock = threading.Lock()
+
+def build_vectorizer():
+    """
+    Return the stateless hashing vectorizer shared by full and incremental training.
+    alternate_sign=False keeps every feature non-negative, as MultinomialNB requires.
+    """
+    return HashingVectorizer(n_features=N_FEATURES, alternate_sign=False, norm='l2')
+
+def save_atomic(obj, path):
+    """
+    Pickle `obj` next to `path` and move it into place, so readers never see a partial file.
+    """
+    tmp_path = f"{path}.tmp"
+    joblib.dump(obj, tmp_path)
+    os.replace(tmp_path, path)
 
 def delete_existing_files(nb_classifier_path=DEFAULT_MODEL_PATH, vectorizer_path=DEFAULT_VECTORIZER_PATH):
     """
@@ -47,7 +76,7 @@ def sort_and_save_data(df):
 
 def train_and_validate_model(df_train, nb_classifier_path, vectorizer_path):
     """
-    Train a Naive Bayes classifier with TF-IDF vectorization and validate the model.
+    Train a Naive Bayes classifier on hashed features (see build_vectorizer) and validate the model.
 
     Parameters:
     - df_train (DataFrame): Raw training data.
@@ -66,8 +95,8 @@ def train_and_validate_model(df_train, nb_classifier_path, vectorizer_path):
         val_df = val_df.sample(frac=1).reset_index(drop=True)
 
     # Train the model
-    vectorizer = TfidfVectorizer()
-    train_vectors = vectorizer.fit_transform(train_df['query'])
+    vectorizer = build_vectorizer()
+    train_vectors = vectorizer.transform(train_df['query'])
     val_vectors = vectorizer.transform(val_df['query'])
 
     nb_classifier = MultinomialNB(alpha=0.1)
@@ -83,8 +112,8 @@ def train_and_validate_model(df_train, nb_classifier_path, vectorizer_path):
     queue_message(f"LOAD: Validation Accuracy: {accuracy:.2%}")
 
     # Save the model and vectorizer
-    joblib.dump(nb_classifier, nb_classifier_path)
-    joblib.dump(vectorizer, vectorizer_path)
+    save_atomic(nb_classifier, nb_classifier_path)
+    save_atomic(vectorizer, vectorizer_path)
     queue_message(f"LOAD: Model and vectorizer saved successfully.")
 
     return accuracy
@@ -120,7 +149,9 @@ def train_text_classifier(
     training_data_path=DEFAULT_TRAINING_DATA_PATH,
     nb_classifier_path=DEFAULT_MODEL_PATH,
     vectorizer_path=DEFAULT_VECTORIZER_PATH,
-    user_input='y'
+    user_input='y',
+    online_data_path=DEFAULT_ONLINE_DATA_PATH,
+    state_path=DEFAULT_STATE_PATH
 ):
     """
     Train a text classification model using labeled training data.
@@ -128,21 +159,116 @@ def train_text_classifier(
     Parameters:
     - training_data_path (str): Path to the training data CSV file.
     - nb_classifier_path (str): Path to save the trained Naive Bayes classifier.
-    - vectorizer_path (str): Path to save the TF-IDF vectorizer.
+    - vectorizer_path (str): Path to save the hashing vectorizer.
     - user_input (str): User input to control data preparation ('y' for training, 's' for sorting).
+    - online_data_path (str): Labelled utterances collected at runtime, included in training.
+    - state_path (str): Where the number of online rows already learned is recorded.
     """
+    import pandas as pd
     # queue_message(f"Using scikit-learn version: {sklearn_version}")
 
-    # Remove existing model and vectorizer files
-    delete_existing_files(nb_classifier_path, vectorizer_path)
-
-    # Load the training data
+    # Load the training data, the existing model files are replaced atomically once training succeeds
     df_train = pd.read_csv(training_data_path)
+    online_rows = read_online_rows(online_data_path)
+    if online_rows:
+        df_train = pd.concat([df_train, pd.DataFrame(online_rows, columns=['query', 'label'])], ignore_index=True)
 
     # Data preparation based on user input
     if user_input.lower() == 's':
         sort_and_save_data(df_train)
     elif user_input.lower() == 'y':
         train_and_validate_model(df_train, nb_classifier_path, vectorizer_path)
+        save_state(state_path, len(online_rows))
     else:
-        queue_message("Script terminated. Run the script again and type 'y' or 's' when prompted.")
\ No newline at end of file
+        queue_message("Script terminated. Run the script again and type 'y' or 's' when prompted.")
+
+# === Incremental Training ===
+def append_labelled_utterance(query, label, online_data_path=DEFAULT_ONLINE_DATA_PATH):
+    """
+    Append a labelled utterance from the running system to the online training data.
+    """
+    with _append_lock:
+        is_new = not os.path.exists(online_data_path)
+        with open(online_data_path, 'a', newline='', encoding='utf-8') as file:
+            writer = csv.writer(file)
+            if is_new:
+                writer.writerow(['query', 'label'])
+            writer.writerow([query.strip(), label])
+
+def read_online_rows(online_data_path=DEFAULT_ONLINE_DATA_PATH, start=0):
+    """
+    Return (query, label) rows of the online training data, skipping the first `start` rows.
+    """
+    if not os.path.exists(online_data_path):
+        return []
+    with open(online_data_path, newline='', encoding='utf-8') as file:
+        reader = csv.reader(file)
+        next(reader, None)  # Header
+        return [(row[0], row[1]) for i, row in enumerate(reader) if i >= start and len(row) >= 2]
+
+def load_state(state_path=DEFAULT_STATE_PATH):
+    try:
+        with open(state_path, 'r', encoding='utf-8') as file:
+            return json.load(file).get('online_rows', 0)
+    except (OSError, ValueError):
+        return 0
+
+def save_state(state_path, online_rows):
+    tmp_path = f"{state_path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as file:
+        json.dump({'online_rows': online_rows, 'updated': datetime.now().isoformat()}, file)
+    os.replace(tmp_path, state_path)
+
+def update_text_classifier(
+    training_data_path=DEFAULT_TRAINING_DATA_PATH,
+    nb_classifier_path=DEFAULT_MODEL_PATH,
+    vectorizer_path=DEFAULT_VECTORIZER_PATH,
+    online_data_path=DEFAULT_ONLINE_DATA_PATH,
+    state_path=DEFAULT_STATE_PATH
+):
+    """
+    Incrementally update the classifier with online rows it has not learned yet.
+
+    Falls back to a full training run when there is no model yet, or when the saved
+    vectorizer is not a hashing vectorizer (models from older versions).
+
+    Returns:
+    - bool: True if new model files were written.
+    """
+    try:
+        nb_classifier = joblib.load(nb_classifier_path)
+        vectorizer = joblib.load(vectorizer_path)
+    except (OSError, EOFError, ValueError):
+        nb_classifier = vectorizer = None
+
+    if nb_classifier is None or not isinstance(vectorizer, HashingVectorizer):
+        queue_message("LOAD: Training intent model from scratch...")
+        train_text_classifier(training_data_path, nb_classifier_path, vectorizer_path, 'y', online_data_path, state_path)
+        return True
+
+    learned = load_state(state_path)
+    rows = read_online_rows(online_data_path, start=learned)
+    if not rows:
+        return False
+
+    # partial_fit cannot introduce new classes, unknown labels wait for the next full training
+    known = set(nb_classifier.classes_)
+    usable = [(query, label) for query, label in rows if label in known]
+    if usable:
+        queries, labels = zip(*usable)
+        nb_classifier.partial_fit(vectorizer.transform(queries), labels)
+        save_atomic(nb_classifier, nb_classifier_path)
+    save_state(state_path, learned + len(rows))
+    queue_message(f"LOAD: Intent model updated with {len(usable)} new utterances ({len(rows) - len(usable)} skipped).")
+    return bool(usable)
+
+if __name__ == "__main__":
+    from modules.module_messageQue import stop_message_processing
+    mode = sys.argv[1] if len(sys.argv) > 1 else 'update'
+    try:
+        if mode == 'full':
+            train_text_classifier()
+        else:
+            update_text_classifier()
+    finally:
+        stop_message_processing()
@@ -1,80 +1,179 @@
-import io
-import os
-import wave
+import queue
+import asyncio
+import ctypes
+import ctypes.util
 import subprocess
-import re
-from pydub import AudioSegment
+import threading
+import numpy as np
 
 from modules.module_messageQue import queue_message
+from modules.module_segment import speech_chunks
+from modules.module_dsp import TarsEffect
+from modules.module_audio import pcm_chunk, parse_wav_header
 
-def apply_tars_effects(audio):
+VOICE = "en-us+m3"
+RATE = 140       # Words per minute
+PITCH = 50       # 0-100
+
+# libespeak-ng constants (speak_lib.h)
+AUDIO_OUTPUT_SYNCHRONOUS = 2
+INITIALIZE_DONT_EXIT = 0x8000
+POS_CHARACTER = 1
+CHARS_UTF8 = 1
+PARAMETER_RATE = 1
+PARAMETER_PITCH = 3
+BUFFER_MS = 100  # Audio is handed to the callback in blocks of this length
+
+_SYNTH_CALLBACK = ctypes.CFUNCTYPE(ctypes.c_int, ctypes.POINTER(ctypes.c_short), ctypes.c_int, ctypes.c_void_p)
+_END = object()  # Ends the audio of one sentence
+
+_engine = None
+_engine_lock = threading.Lock()
+
+class EspeakLibrary:
+    """
+    libespeak-ng loaded once and kept initialized with the TARS voice. Synthesis runs
+    in-process and the samples arrive through the synth callback as they are generated.
+    """
+    def __init__(self):
+        path = ctypes.util.find_library("espeak-ng")
+        if not path:
+            raise OSError("libespeak-ng not found")
+        self.lib = ctypes.cdll.LoadLibrary(path)
+        self.lib.espeak_Initialize.restype = ctypes.c_int
+        self.lib.espeak_Initialize.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_char_p, ctypes.c_int]
+        self.lib.espeak_Synth.argtypes = [
+            ctypes.c_char_p, ctypes.c_size_t, ctypes.c_uint, ctypes.c_int, ctypes.c_uint,
+            ctypes.c_uint, ctypes.POINTER(ctypes.c_uint), ctypes.c_void_p,
+        ]
+        self.lib.espeak_SetVoiceByName.argtypes = [ctypes.c_char_p]
+        self.lib.espeak_SetParameter.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_int]
+
+        self.sample_rate = self.lib.espeak_Initialize(AUDIO_OUTPUT_SYNCHRONOUS, BUFFER_MS, None, INITIALIZE_DONT_EXIT)
+        if self.sample_rate <= 0:
+            raise OSError("espeak_Initialize failed")
+        self._callback = _SYNTH_CALLBACK(self._on_audio)  # Keep a reference for the C side
+        self.lib.espeak_SetSynthCallback(self._callback)
+        if self.lib.espeak_SetVoiceByName(VOICE.encode()) != 0:
+            raise OSError(f"espeak-ng voice {VOICE} not available")
+        self.lib.espeak_SetParameter(PARAMETER_RATE, RATE, 0)
+        self.lib.espeak_SetParameter(PARAMETER_PITCH, PITCH, 0)
+        self.lock = threading.Lock()  # The library has global state: one synthesis at a time
+        self.on_audio = None
+        self.cancel = None
+
+    def _on_audio(self, wav, count, events):
+        if wav and count > 0 and self.on_audio is not None:
+            self.on_audio(np.ctypeslib.as_array(wav, shape=(count,)).copy(), self.sample_rate)
+        return 1 if self.cancel is not None and self.cancel.is_set() else 0  # 1 aborts synthesis
+
+    def synthesize(self, text, on_audio, cancel):
+        """Synthesize `text`, calling `on_audio(samples, sample_rate)` for each block."""
+        data = text.encode("utf-8") + b"\0"
+        with self.lock:
+            self.on_audio, self.cancel = on_audio, cancel
+            try:
+                self.lib.espeak_Synth(data, len(data), 0, POS_CHARACTER, 0, CHARS_UTF8, None, None)
+            finally:
+                self.on_audio = self.cancel = None
+
+class EspeakProcess:
     """
-    Apply TARS-like effects: pitch change, speed up, reverb, and echo.
+    Fallback when the library cannot be loaded: one espeak-ng process per sentence, with its
+    WAV output read as it is written instead of after the process exits.
     """
-    sample_rate = audio.frame_rate  # Get the actual sample rate
-    lower_rate = int(sample_rate * 0.88)
-    audio = audio._spawn(audio.raw_data, overrides={"frame_rate": lower_rate})
-    audio = audio.set_frame_rate(sample_rate)
-    audio = audio.speedup(playback_speed=1.42)
-    
-    # Apply echo and reverb
-    reverb_decay = -2
-    delay_ms = 3
-    echo1 = audio - reverb_decay
-    echo2 = echo1 - 1
-    audio = audio.overlay(echo1, position=delay_ms)
-    audio = audio.overlay(echo2, position=delay_ms * 2)  # Fixed the delay overlap
-    
-    return audio
+    def synthesize(self, text, on_audio, cancel):
+        """Synthesize `text`, calling `on_audio(samples, sample_rate)` for each block."""
+        command = ["espeak-ng", "-s", str(RATE), "-p", str(PITCH), "-v", VOICE, text, "--stdout"]
+        process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        header, sample_rate, leftover = b"", None, b""
+        try:
+            while not cancel.is_set():
+                block = process.stdout.read1(8192)
+                if not block:
+                    break
+                if sample_rate is None:
+                    header += block
+                    parsed = parse_wav_header(header)
+                    if parsed is None:
+                        continue
+                    sample_rate, offset = parsed
+                    block = header[offset:]
+                data = leftover + block
+                usable = len(data) - len(data) % 2  # Whole 16-bit samples only
+                leftover = data[usable:]
+                if usable:
+                    on_audio(np.frombuffer(data[:usable], dtype=np.int16), sample_rate)
+        finally:
+            if cancel.is_set():
+                process.kill()
+            _, stderr = process.communicate()
+        if process.returncode != 0 and not cancel.is_set():
+            raise RuntimeError(f"espeak-ng failed: {stderr.decode()}")
+
+def get_engine():
+    """
+    Return the in-process engine, or the subprocess fallback if libespeak-ng is unavailable.
+    """
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            try:
+                _engine = EspeakLibrary()
+                queue_message(f"LOAD: libespeak-ng loaded ({_engine.sample_rate} Hz).")
+            except (OSError, AttributeError) as e:
+                queue_message(f"WARNING: Using the espeak-ng command instead of the library: {e}")
+                _engine = EspeakProcess()
+        return _engine
+
+def _render(chunk, output, cancel):
+    """
+    Synthesize one sentence and stream it through the TARS effects into `output`.
+    """
+    state = {}  # The effect is created once the sample rate is known
+
+    def on_audio(samples, sample_rate):
+        if not state:
+            state.update(effect=TarsEffect(sample_rate), sample_rate=sample_rate)
+        processed = state["effect"].process(samples)
+        if len(processed):
+            output.put(pcm_chunk(processed, sample_rate))
+
+    try:
+        get_engine().synthesize(chunk, on_audio, cancel)
+        if state:
+            output.put(pcm_chunk(state["effect"].flush(), state["sample_rate"]))
+    except Exception as e:
+        queue_message(f"ERROR: Local TTS generation failed: {e}")
+        output.put(None)  # Marks the sentence as failed
+    finally:
+        output.put(_END)
 
 async def text_to_speech_with_pipelining_espeak(text):
     """
-    Converts text to speech using `espeak-ng`, applies TARS effects, and streams playback.
-    
+    Converts text to speech using espeak-ng, applies TARS effects, and streams playback.
+
     Parameters:
     - text (str): The text to convert into speech.
 
     Yields:
-    - BytesIO: Chunks of processed audio as they're generated.
+    - PCMChunk: Processed audio as it's generated.
     """
-    # Split text into smaller chunks at sentence boundaries
-    chunks = re.split(r'(?<=\.)\s', text)
+    # Split text into smaller chunks (short first clause, then sentence groups)
+    chunks = speech_chunks(text)
 
     for chunk in chunks:
         chunk = chunk.strip()
         if not chunk:
             continue  # Skip empty chunks
 
+        output, cancel = queue.Queue(), threading.Event()
+        asyncio.get_running_loop().run_in_executor(None, _render, chunk, output, cancel)
         try:
-            # Generate raw WAV data using espeak-ng
-            command = [
-                "espeak-ng", "-s", "140", "-p", "50", "-v", "en-us+m3", chunk, "--stdout"
-            ]
-            
-            # Run espeak-ng and capture the output
-            process = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-
-            if process.returncode != 0:
-                queue_message(f"ERROR: espeak-ng failed: {process.stderr.decode()}")
-                continue
-
-            # Convert espeak output to Pydub AudioSegment
-            audio = AudioSegment.from_file(io.BytesIO(process.stdout), format="wav")
-
-            # Apply TARS-like effects
-            audio = apply_tars_effects(audio)
-
-            # Convert modified audio to BytesIO buffer
-            wav_buffer = io.BytesIO()
-            with wave.open(wav_buffer, 'wb') as wav_file:
-                wav_file.setnchannels(1)  # Mono
-                wav_file.setsampwidth(2)  # 16-bit samples
-                wav_file.setframerate(audio.frame_rate)  # Keep the same sample rate
-                wav_file.writeframes(audio.raw_data)
-
-            wav_buffer.seek(0)
-            yield wav_buffer  # Yield the processed audio chunk
-
-        except Exception as e:
-            queue_message(f"ERROR: Local TTS generation failed: {e}")
-            continue
\ No newline at end of file
+            while True:
+                pcm = await asyncio.to_thread(output.get)
+                if pcm is _END:
+                    break
+                yield pcm  # Yield the processed audio as soon as it exists
+        finally:
+            cancel.set()  # Playback stopped early: abort the synthesis
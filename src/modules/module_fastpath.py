@@ -0,0 +1,285 @@
+"""
+module_fastpath.py
+
+Deterministic fast-path parsers for tool arguments in the TARS-AI application.
+
+Turns the common phrasings of Move, Persona and Volume commands ("turn right twice",
+"set humor to 70%", "volume down by twenty") into structured arguments without an LLM
+round-trip. Each parser returns None when it is not confident, in which case the caller
+falls back to the LLM. Hit/miss counters are kept per tool.
+"""
+
+# === Standard Libraries ===
+import re
+import threading
+
+# === Constants ===
+UNITS = {
+    "zero": 0, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6, "seven": 7,
+    "eight": 8, "nine": 9, "ten": 10, "eleven": 11, "twelve": 12, "thirteen": 13,
+    "fourteen": 14, "fifteen": 15, "sixteen": 16, "seventeen": 17, "eighteen": 18, "nineteen": 19,
+}
+TENS = {
+    "twenty": 20, "thirty": 30, "forty": 40, "fifty": 50,
+    "sixty": 60, "seventy": 70, "eighty": 80, "ninety": 90,
+}
+MULTIPLIERS = {"once": 1, "twice": 2, "thrice": 3}
+DIRECTIONS = {
+    "forward": "forward", "forwards": "forward", "ahead": "forward", "closer": "forward",
+    "back": "back", "backward": "back", "backwards": "back", "reverse": "back",
+    "left": "left", "right": "right", "around": "around",
+}
+
+_WORD = "|".join(sorted(list(UNITS) + list(TENS) + ["hundred", "a"], key=len, reverse=True))
+NUMBER_PATTERN = rf"\b(?:\d+|(?:{_WORD})(?:[\s-]+(?:{_WORD}|and))*)\b"
+
+TRAITS = [
+    "honesty", "humor", "empathy", "curiosity", "confidence", "formality", "sarcasm",
+    "adaptability", "discipline", "imagination", "emotional_stability", "pragmatism",
+    "optimism", "resourcefulness", "cheerfulness", "engagement", "respectfulness",
+]
+TRAIT_ALIASES = {
+    "humour": "humor",
+    "funny": "humor",
+    "honest": "honesty",
+    "empathetic": "empathy",
+    "curious": "curiosity",
+    "confident": "confidence",
+    "formal": "formality",
+    "sarcastic": "sarcasm",
+    "adaptable": "adaptability",
+    "disciplined": "discipline",
+    "imaginative": "imagination",
+    "emotional stability": "emotional_stability",
+    "emotionally stable": "emotional_stability",
+    "pragmatic": "pragmatism",
+    "optimistic": "optimism",
+    "resourceful": "resourcefulness",
+    "cheerful": "cheerfulness",
+    "engaged": "engagement",
+    "respectful": "respectfulness",
+    "respect": "respectfulness",
+}
+
+# === Compiled Grammar ===
+RE_NUMBER = re.compile(NUMBER_PATTERN)
+RE_DEGREES = re.compile(rf"({NUMBER_PATTERN})\s*-?\s*(?:degrees?|deg|°)")
+RE_COUNT = re.compile(rf"({NUMBER_PATTERN})\s*(?:steps?|times|paces?|turns?)\b")
+RE_MULTIPLIER = re.compile(r"\b(once|twice|thrice)\b")
+RE_PERCENT = re.compile(rf"({NUMBER_PATTERN})\s*(?:%|percent\b|per cent\b)")
+RE_TO_VALUE = re.compile(rf"\b(?:to|at|of|=)\s+({NUMBER_PATTERN})\b")
+RE_BY_VALUE = re.compile(rf"\bby\s+({NUMBER_PATTERN})\b")
+
+RE_UNPOSE = re.compile(r"\b(?:un-?pose|stop posing|stand down|relax your pose)\b")
+RE_POSE = re.compile(r"\b(?:pose|strike a pose)\b")
+RE_TURN = re.compile(r"\b(?:turn|rotate|spin|pivot)\b")
+RE_TURN_AROUND = re.compile(r"\b(?:turn around|about face|u-?turn|spin around)\b")
+RE_LEFT = re.compile(r"\bleft\b")
+RE_RIGHT = re.compile(r"\bright\b")
+RE_FORWARD = re.compile(r"\b(?:step|walk|move|go|come)\b.*?\b(?:forwards?|ahead|closer)\b|\bstep\b")
+RE_BACKWARD = re.compile(r"\b(?:back|backwards?|reverse)\b")
+RE_MOVE_VERB = re.compile(r"\b(?:turn|rotate|spin|pivot|step|walk|move|go|come|pose)\b")
+RE_DIRECTION = re.compile(r"\b(?:left|right|forwards?|ahead|closer|back|backwards?|reverse|around)\b")
+RE_CONJUNCTION = re.compile(r"\b(?:then|and|after that|afterwards)\b")
+RE_RELATIVE = re.compile(r"\b(?:increase|decrease|raise|lower|reduce|boost|more|less)\b")
+
+RE_VOLUME_UNMUTE = re.compile(r"\b(?:unmute|activate sound|sound on)\b")
+RE_VOLUME_MUTE = re.compile(r"\b(?:mute|silence|sound off)\b")
+RE_VOLUME_CHECK = re.compile(r"\b(?:check|current|what(?:'s| is)(?: the)?)\s+volume\b|\bhow loud\b")
+RE_VOLUME_UP = re.compile(r"\b(?:increase|raise|louder|turn (?:it )?up|volume up|boost)\b")
+RE_VOLUME_DOWN = re.compile(r"\b(?:decrease|lower|reduce|quieter|softer|turn (?:it )?down|volume down)\b")
+RE_VOLUME_ADJUST = re.compile(r"\badjust\b")
+RE_VOLUME_SET = re.compile(r"\bset\b|\bvolume (?:to|at)\b")
+
+_stats_lock = threading.Lock()
+FASTPATH_STATS = {tool: {"hits": 0, "misses": 0} for tool in ["Move", "Persona", "Volume"]}
+
+# === Helpers ===
+def _record(tool, hit):
+    with _stats_lock:
+        FASTPATH_STATS[tool]["hits" if hit else "misses"] += 1
+
+def get_fastpath_stats():
+    """
+    Return per-tool hit/miss counts and hit rate for the fast-path parsers.
+    """
+    with _stats_lock:
+        stats = {tool: dict(counts) for tool, counts in FASTPATH_STATS.items()}
+    for counts in stats.values():
+        total = counts["hits"] + counts["misses"]
+        counts["hit_rate"] = round(counts["hits"] / total, 3) if total else None
+    return stats
+
+def normalize(text):
+    """Lowercase, unify whitespace and drop the wake word."""
+    text = text.lower().replace("’", "'")
+    text = re.sub(r"^\s*(?:hey|ok|okay)?\s*tars\s*[,!.]?\s*", "", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+def parse_number(token):
+    """
+    Convert a numeric token ("42", "forty two", "a hundred", "twenty-five") to an int.
+
+    Returns:
+    - int or None: The value, or None if the token is not a number.
+    """
+    token = token.strip().lower()
+    if token.isdigit():
+        return int(token)
+
+    total = 0
+    current = 0
+    seen = False
+    for word in re.split(r"[\s-]+", token):
+        if word in ("and", ""):
+            continue
+        if word == "a":
+            current = max(current, 1)
+            continue
+        if word in UNITS:
+            current += UNITS[word]
+        elif word in TENS:
+            current += TENS[word]
+        elif word == "hundred":
+            current = max(current, 1) * 100
+        else:
+            return None
+        seen = True
+    total += current
+    return total if seen else None
+
+def _first_number(pattern, text):
+    for match in pattern.finditer(text):
+        value = parse_number(match.group(1))
+        if value is not None:
+            return value
+    return None
+
+# === Parsers ===
+def parse_movement(user_input):
+    """
+    Parse a movement command.
+
+    Returns:
+    - tuple or None: (movement, times) using the movement names of module_engine, or None
+      when the phrasing is ambiguous or unsupported.
+    """
+    text = normalize(user_input)
+    result = None
+
+    if _is_compound(text):
+        result = None  # "step forward then turn left" is more than one movement
+    elif RE_UNPOSE.search(text):
+        result = ("unposeaction", 1)
+    elif RE_POSE.search(text) and not RE_TURN.search(text):
+        result = ("poseaction", 1)
+    elif RE_TURN.search(text) or RE_TURN_AROUND.search(text):
+        left, right = bool(RE_LEFT.search(text)), bool(RE_RIGHT.search(text))
+        degrees = _first_number(RE_DEGREES, text)
+        if left and right:
+            result = None
+        elif degrees is not None:
+            if degrees % 90 == 0 and degrees > 0:
+                result = ("turnRight" if right else "turnLeft", degrees // 90)
+        elif RE_TURN_AROUND.search(text):
+            result = ("turnRight" if right else "turnLeft", 2)
+        elif left or right:
+            result = ("turnRight" if right else "turnLeft", _parse_times(text))
+    elif RE_FORWARD.search(text) and not RE_BACKWARD.search(text):
+        result = ("stepForward", _parse_times(text))
+
+    if result and not 1 <= result[1] <= 10:
+        result = None
+    _record("Move", result is not None)
+    return result
+
+def _is_compound(text):
+    """
+    True when the command names more than one movement: several different verbs or
+    directions, or movement phrases joined by "then"/"and".
+    """
+    verbs = set(RE_MOVE_VERB.findall(text))
+    directions = {DIRECTIONS[word] for word in RE_DIRECTION.findall(text)}
+    if len(verbs) > 1 or len(directions) > 1:
+        return True
+    phrases = [part for part in RE_CONJUNCTION.split(text) if RE_MOVE_VERB.search(part) or RE_DIRECTION.search(part)]
+    return len(phrases) > 1
+
+def _parse_times(text):
+    multiplier = RE_MULTIPLIER.search(text)
+    if multiplier:
+        return MULTIPLIERS[multiplier.group(1)]
+    count = _first_number(RE_COUNT, text)
+    return count if count is not None else 1
+
+def parse_persona(user_input):
+    """
+    Parse a personality trait adjustment such as "set humor to 70%".
+
+    Relative changes ("lower humor by 10%") are left to the LLM, since the value
+    returned here replaces the trait rather than adjusting it.
+
+    Returns:
+    - tuple or None: (trait, value) with value in 0-100, or None if either part is missing
+      or the change is relative.
+    """
+    text = normalize(user_input)
+    if RE_BY_VALUE.search(text) or RE_RELATIVE.search(text):
+        _record("Persona", False)
+        return None
+
+    found = {trait for trait in TRAITS if re.search(rf"\b{trait.replace('_', '[ _]')}\b", text)}
+    found |= {trait for alias, trait in TRAIT_ALIASES.items() if re.search(rf"\b{alias}\b", text)}
+
+    value = _first_number(RE_PERCENT, text)
+    if value is None:
+        value = _first_number(RE_TO_VALUE, text)
+
+    result = None
+    if len(found) == 1 and value is not None and 0 <= value <= 100:
+        result = (found.pop(), value)
+    _record("Persona", result is not None)
+    return result
+
+def parse_volume(user_input):
+    """
+    Parse a volume command.
+
+    Returns:
+    - tuple or None: (action, amount) where action is one of increase, decrease, adjust_up,
+      adjust_down, set, mute, unmute or check, and amount is an int or None.
+    """
+    text = normalize(user_input)
+    by_value = _first_number(RE_BY_VALUE, text)
+    target = None
+    if by_value is None:
+        target = _first_number(RE_PERCENT, text)
+        if target is None:
+            target = _first_number(RE_TO_VALUE, text)
+
+    if RE_VOLUME_UNMUTE.search(text):
+        result = ("unmute", None)
+    elif RE_VOLUME_MUTE.search(text):
+        result = ("mute", None)
+    elif target is not None and (RE_VOLUME_ADJUST.search(text) or RE_VOLUME_UP.search(text) or RE_VOLUME_DOWN.search(text)):
+        result = ("set", target)  # "increase volume to 80" names the target, not a step
+    elif RE_VOLUME_ADJUST.search(text) and re.search(r"\bup\b", text):
+        result = ("adjust_up", by_value)
+    elif RE_VOLUME_ADJUST.search(text) and re.search(r"\bdown\b", text):
+        result = ("adjust_down", by_value)
+    elif RE_VOLUME_UP.search(text):
+        result = ("increase", by_value)
+    elif RE_VOLUME_DOWN.search(text):
+        result = ("decrease", by_value)
+    elif RE_VOLUME_SET.search(text):
+        value = _first_number(RE_PERCENT, text)
+        if value is None:
+            value = _first_number(RE_TO_VALUE, text)
+        result = ("set", value)
+    elif RE_VOLUME_CHECK.search(text):
+        result = ("check", None)
+    else:
+        result = None
+
+    _record("Volume", result is not None)
+    return result
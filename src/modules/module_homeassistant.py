@@ -1,5 +1,5 @@
-import requests
 from modules.module_config import load_config
+from modules.module_http import http_post
 
 from modules.module_messageQue import queue_message
 
@@ -40,7 +40,7 @@ def send_prompt_to_homeassistant(prompt):
         cleaned_prompt = clean_prompt(prompt)  # Clean the prompt
         data = {"text": cleaned_prompt}
         queue_message(data)
-        response = requests.post(url, json=data, headers=HEADERS)
+        response = http_post(url, json=data, headers=HEADERS, timeout=15)
         if response.ok:
             queue_message(response.json())
             return response.json()
@@ -0,0 +1,215 @@
+"""
+module_htmlselect.py
+
+Streaming HTML extraction with CSS selectors for the TARS-AI application.
+
+Built on html.parser, so pages can be fed in chunks as they are downloaded and parsing can
+stop as soon as a byte or time limit is reached. Supports the selector subset the search
+providers need: type, .class, #id, [attr], [attr=value] (also ~= ^= $= *=), compound
+selectors, descendant and child (>) combinators, and comma separated groups.
+"""
+
+# === Standard Libraries ===
+import re
+from html.parser import HTMLParser
+
+# === Constants ===
+VOID_ELEMENTS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta",
+                 "param", "source", "track", "wbr"}
+SKIPPED_ELEMENTS = {"script", "style", "noscript", "template"}
+SELF_CLOSING_SIBLINGS = {"li", "p", "tr", "td", "th", "dt", "dd", "option"}  # <li>a<li>b closes the first li
+BLOCK_ELEMENTS = {"br", "p", "div", "li", "tr", "h1", "h2", "h3", "h4", "h5", "h6", "section", "article"}
+
+_COMPOUND = re.compile(r"""
+    (?P<tag>[a-zA-Z][\w-]*|\*)
+  | \.(?P<cls>[\w-]+)
+  | \#(?P<id>[\w-]+)
+  | \[\s*(?P<attr>[\w-]+)\s*(?:(?P<op>[~^$*]?=)\s*(?P<quote>["']?)(?P<value>.*?)(?P=quote)\s*)?\]
+""", re.VERBOSE)
+
+class SelectorError(ValueError):
+    """Raised for selectors outside the supported subset."""
+
+# === Selector Parsing ===
+def _parse_compound(text):
+    """Parse e.g. 'div.result#top[data-x="1"]' into a list of (kind, name, op, value) tests."""
+    tests, position = [], 0
+    while position < len(text):
+        match = _COMPOUND.match(text, position)
+        if not match:
+            raise SelectorError(f"Unsupported selector: {text!r}")
+        if match.group("tag"):
+            if match.group("tag") != "*":
+                tests.append(("tag", match.group("tag").lower(), None, None))
+        elif match.group("cls"):
+            tests.append(("class", match.group("cls"), None, None))
+        elif match.group("id"):
+            tests.append(("attr", "id", "=", match.group("id")))
+        else:
+            tests.append(("attr", match.group("attr").lower(), match.group("op"), match.group("value")))
+        position = match.end()
+    return tests
+
+def parse_selector(selector):
+    """
+    Parse a selector group into alternatives, each a list of (combinator, tests) from left to right.
+    The first combinator of each alternative is None.
+    """
+    alternatives = []
+    for part in selector.split(","):
+        tokens = re.sub(r"\s*>\s*", " > ", part.strip()).split()
+        if not tokens:
+            continue
+        steps, combinator = [], None
+        for token in tokens:
+            if token == ">":
+                combinator = ">"
+                continue
+            steps.append((combinator, _parse_compound(token)))
+            combinator = " "
+        alternatives.append(steps)
+    if not alternatives:
+        raise SelectorError(f"Empty selector: {selector!r}")
+    return alternatives
+
+def _matches_element(tests, element):
+    tag, attrs, classes = element
+    for kind, name, op, value in tests:
+        if kind == "tag":
+            if tag != name:
+                return False
+        elif kind == "class":
+            if name not in classes:
+                return False
+        else:
+            actual = attrs.get(name)
+            if actual is None:
+                return False
+            if op == "=" and actual != value:
+                return False
+            if op == "~=" and value not in actual.split():
+                return False
+            if op == "^=" and not actual.startswith(value):
+                return False
+            if op == "$=" and not actual.endswith(value):
+                return False
+            if op == "*=" and value not in actual:
+                return False
+    return True
+
+def _matches(steps, stack, index):
+    """Match `steps` with the last step on stack[index], walking ancestors for combinators."""
+    combinator, tests = steps[-1]
+    if not _matches_element(tests, stack[index]):
+        return False
+    if len(steps) == 1:
+        return True
+    if combinator == ">":
+        return index > 0 and _matches(steps[:-1], stack, index - 1)
+    return any(_matches(steps[:-1], stack, ancestor) for ancestor in range(index - 1, -1, -1))
+
+# === Extraction ===
+class SelectorExtractor(HTMLParser):
+    """
+    Incremental extractor: `feed()` HTML chunks, then read `results`.
+
+    `results` maps each selector name to a list of {"text": str, "href": str | None} matches
+    in document order. Matches nested inside an earlier match of the same selector are merged
+    into the outer one, like the text of a single element.
+    """
+    def __init__(self, selectors):
+        """
+        Parameters:
+        - selectors (dict): Name -> CSS selector.
+        """
+        super().__init__(convert_charrefs=True)
+        self.selectors = {name: parse_selector(css) for name, css in selectors.items()}
+        self.results = {name: [] for name in selectors}
+        self.stack = []       # Open elements as (tag, attrs, classes)
+        self.captures = []    # Open captures as [name, depth, text parts, href]
+        self.skip_depth = None
+
+    def handle_starttag(self, tag, attrs):
+        attrs = {name.lower(): value or "" for name, value in attrs}
+        element = (tag, attrs, set(attrs.get("class", "").split()))
+        if tag in SELF_CLOSING_SIBLINGS and self.stack and self.stack[-1][0] == tag:
+            self.handle_endtag(tag)
+        if tag in BLOCK_ELEMENTS:
+            self._text("\n")
+        if tag in VOID_ELEMENTS:
+            return
+        self.stack.append(element)
+        if tag in SKIPPED_ELEMENTS and self.skip_depth is None:
+            self.skip_depth = len(self.stack)
+
+        open_names = {capture[0] for capture in self.captures}
+        for name, alternatives in self.selectors.items():
+            if name in open_names:
+                continue
+            if any(_matches(steps, self.stack, len(self.stack) - 1) for steps in alternatives):
+                self.captures.append([name, len(self.stack), [], attrs.get("href")])
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_ELEMENTS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        # Close up to the most recent matching open element; stray end tags are ignored
+        for depth in range(len(self.stack), 0, -1):
+            if self.stack[depth - 1][0] == tag:
+                break
+        else:
+            return
+        if tag in BLOCK_ELEMENTS:
+            self._text("\n")
+        while len(self.stack) >= depth:
+            self.stack.pop()
+            if self.skip_depth is not None and len(self.stack) < self.skip_depth:
+                self.skip_depth = None
+            while self.captures and self.captures[-1][1] > len(self.stack):
+                self._finish(self.captures.pop())
+
+    def handle_data(self, data):
+        if self.skip_depth is None:
+            self._text(data)
+
+    def _text(self, data):
+        for capture in self.captures:
+            capture[2].append(data)
+
+    def _finish(self, capture):
+        name, _, parts, href = capture
+        lines = (re.sub(r"[ \t\r\f\v]+", " ", line).strip() for line in "".join(parts).split("\n"))
+        text = "\n".join(line for line in lines if line)
+        if text:
+            self.results[name].append({"text": text, "href": href})
+
+    def close(self):
+        """Finish parsing and flush elements that were never closed (e.g. a truncated page)."""
+        super().close()
+        while self.captures:
+            self._finish(self.captures.pop())
+        self.stack.clear()
+        return self.results
+
+def extract(html, selectors):
+    """
+    Extract matches for each named selector from a complete HTML document.
+
+    Parameters:
+    - html (str): The page source.
+    - selectors (dict): Name -> CSS selector.
+
+    Returns:
+    - dict: Name -> list of {"text", "href"} matches.
+    """
+    parser = SelectorExtractor(selectors)
+    parser.feed(html)
+    return parser.close()
+
+def extract_text(html, selector):
+    """
+    Return the newline-joined text of every element matching `selector`.
+    """
+    return "\n".join(match["text"] for match in extract(html, {"content": selector})["content"])
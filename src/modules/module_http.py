@@ -0,0 +1,155 @@
+"""
+module_http.py
+
+Shared HTTP client layer for the TARS-AI application.
+
+Provides:
+- Pooled keep-alive sessions per host, shared by every network-bound module.
+- Per-call timeouts and retry with exponential backoff.
+- Connection-level metrics (requests, new connections, retries, errors, latency) per host.
+- Asyncio flavours that run calls on the pooled sessions without blocking the event loop.
+"""
+
+# === Standard Libraries ===
+import time
+import asyncio
+import threading
+from dataclasses import dataclass, asdict
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# === Constants ===
+DEFAULT_TIMEOUT = 30          # Seconds, used when a caller does not pass a timeout
+POOL_MAXSIZE = 8              # Keep-alive connections kept per host
+RETRY_STATUSES = {502, 503, 504}
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+CHATUI_URL = "http://127.0.0.1:5012"  # Local chat UI / avatar server
+
+_sessions = {}
+_metrics = {}
+_lock = threading.Lock()
+
+@dataclass
+class HostMetrics:
+    """Connection-level counters for a single host."""
+    requests: int = 0
+    new_connections: int = 0
+    retries: int = 0
+    errors: int = 0
+    total_latency: float = 0.0
+
+def _host_key(url):
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+def get_session(url) -> requests.Session:
+    """
+    Return the pooled keep-alive session for the host of `url`, creating it on first use.
+    """
+    host = _host_key(url)
+    with _lock:
+        session = _sessions.get(host)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_MAXSIZE, max_retries=0)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _sessions[host] = session
+            _metrics[host] = HostMetrics()
+    return session
+
+def _connection_count(session, url):
+    """Number of TCP connections urllib3 has opened so far for the host of `url`."""
+    try:
+        pool = session.get_adapter(url).poolmanager.connection_from_url(url)
+        return pool.num_connections
+    except Exception:
+        return 0
+
+def http_request(method, url, timeout=DEFAULT_TIMEOUT, retries=None, backoff=0.3, **kwargs) -> requests.Response:
+    """
+    Send a request over the pooled session for the target host.
+
+    Parameters:
+    - method (str): HTTP method.
+    - url (str): Full request URL.
+    - timeout (float | tuple): Per-call timeout passed to requests.
+    - retries (int): Retry attempts on connection errors and 502/503/504. Defaults to 2 for
+      idempotent methods and 0 otherwise, so POSTs are never replayed implicitly.
+    - backoff (float): Base delay in seconds, doubled after each attempt.
+    - **kwargs: Forwarded to requests.Session.request (headers, json, data, files, stream...).
+
+    Returns:
+    - requests.Response: The response. Callers still call raise_for_status() as before.
+    """
+    method = method.upper()
+    if retries is None:
+        retries = 2 if method in IDEMPOTENT_METHODS else 0
+
+    session = get_session(url)
+    metrics = _metrics[_host_key(url)]
+    connections_before = _connection_count(session, url)
+    started = time.monotonic()
+
+    attempt = 0
+    try:
+        while True:
+            try:
+                response = session.request(method, url, timeout=timeout, **kwargs)
+                if response.status_code in RETRY_STATUSES and attempt < retries:
+                    response.close()
+                else:
+                    return response
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt >= retries:
+                    with _lock:
+                        metrics.errors += 1
+                    raise
+            attempt += 1
+            with _lock:
+                metrics.retries += 1
+            time.sleep(backoff * (2 ** (attempt - 1)))
+    finally:
+        with _lock:
+            metrics.requests += 1
+            metrics.total_latency += time.monotonic() - started
+            metrics.new_connections += max(0, _connection_count(session, url) - connections_before)
+
+def http_get(url, **kwargs) -> requests.Response:
+    return http_request("GET", url, **kwargs)
+
+def http_post(url, **kwargs) -> requests.Response:
+    return http_request("POST", url, **kwargs)
+
+async def async_http_request(method, url, **kwargs) -> requests.Response:
+    """
+    Asyncio flavour of http_request; the call runs in a worker thread on the same pooled session.
+    """
+    return await asyncio.to_thread(http_request, method, url, **kwargs)
+
+async def async_http_get(url, **kwargs) -> requests.Response:
+    return await async_http_request("GET", url, **kwargs)
+
+async def async_http_post(url, **kwargs) -> requests.Response:
+    return await async_http_request("POST", url, **kwargs)
+
+def get_http_metrics() -> dict:
+    """
+    Return per-host counters, including the average request latency in seconds.
+    """
+    with _lock:
+        snapshot = {host: asdict(metrics) for host, metrics in _metrics.items()}
+    for metrics in snapshot.values():
+        metrics["avg_latency"] = round(metrics["total_latency"] / metrics["requests"], 4) if metrics["requests"] else None
+    return snapshot
+
+def close_all():
+    """
+    Close every pooled session (used on shutdown).
+    """
+    with _lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
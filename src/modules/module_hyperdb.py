@@ -23,7 +23,6 @@ import gzip
 import pickle
 import numpy as np
 import random
-import requests
 from typing import List, Union
 import bm25s
 import Stemmer
@@ -33,6 +32,7 @@ import configparser
 import torch
 
 from modules.module_config import get_api_key
+from modules.module_http import http_post
 from modules.module_messageQue import queue_message
 
 config = configparser.ConfigParser()
@@ -57,7 +57,7 @@ def get_embedding_new(documents):
         "encoding_format": encoding_format
     }
 
-    response = requests.post(url, headers=headers, json=data)
+    response = http_post(url, headers=headers, json=data, timeout=30)
 
     if response.status_code == 200:
         try:
@@ -384,7 +384,7 @@ class HyperDB:
             traceback.print_exc()
             return False
 
-    def query(self, query_text: str, top_k: int = 5, return_similarities: bool = True):
+    def query(self, query_text: str, top_k: int = 5, return_similarities: bool = True, query_vector=None, query_tokens=None):
         """
         Query the database using the configured RAG strategy.
         For backward compatibility, this uses either vector-only search or hybrid search
@@ -394,16 +394,18 @@ class HyperDB:
             query_text (str): The text to search for
             top_k (int): Number of results to return
             return_similarities (bool): Whether to return similarity scores
+            query_vector: Precomputed embedding of query_text (must come from the same embedding function)
+            query_tokens: Precomputed bm25s tokens of query_text (hybrid strategy only)
             
         Returns:
             List of documents or (document, score) tuples if return_similarities is True
         """
         if self.rag_strategy == "naive":
-            return self._vector_query(query_text, top_k, return_similarities)
+            return self._vector_query(query_text, top_k, return_similarities, query_vector)
         else:  # hybrid
-            return self.hybrid_query(query_text, top_k, return_similarities=return_similarities)
+            return self.hybrid_query(query_text, top_k, return_similarities=return_similarities, query_vector=query_vector, query_tokens=query_tokens)
 
-    def _vector_query(self, query_text: str, top_k: int = 5, return_similarities: bool = True):
+    def _vector_query(self, query_text: str, top_k: int = 5, return_similarities: bool = True, query_vector=None):
         """
         Perform vector-only search.
         
@@ -411,11 +413,13 @@ class HyperDB:
             query_text (str): The text to search for
             top_k (int): Number of results to return
             return_similarities (bool): Whether to return similarity scores
+            query_vector: Precomputed embedding of query_text, computed here if None
             
         Returns:
             List of documents or (document, score) tuples if return_similarities is True
         """
-        query_vector = self.embedding_function([query_text])[0]
+        if query_vector is None:
+            query_vector = self.embedding_function([query_text])[0]
         ranked_results, similarities = hyper_SVM_ranking_algorithm_sort(
             self.vectors, query_vector, top_k=top_k, metric=self.similarity_metric
         )
@@ -481,11 +485,14 @@ class HyperDB:
         query_text: str, 
         top_k: int = 5, 
         return_similarities: bool = True,
-        rrf_k: int = 60
+        rrf_k: int = 60,
+        query_vector=None,
+        query_tokens=None
     ):
         """
         Hybrid search using RRF fusion and FlashRank reranker.
         The pipeline: vector search -> BM25 -> RRF fusion -> FlashRank reranking.
+        Precomputed query_vector / query_tokens are used when given.
         """
         if not self.documents or not self.vectors.size:
             queue_message("WARNING: Empty database, returning empty results")
@@ -493,31 +500,33 @@ class HyperDB:
 
         if self.rag_strategy != "hybrid":
             queue_message("WARNING: Hybrid query called but RAG strategy is 'naive'. Falling back to vector search.")
-            return self._vector_query(query_text, top_k, return_similarities)
+            return self._vector_query(query_text, top_k, return_similarities, query_vector)
 
         try:
             # Vector Search
-            query_vector = self.embedding_function([query_text])[0]
+            if query_vector is None:
+                query_vector = self.embedding_function([query_text])[0]
             vector_results, vector_scores = hyper_SVM_ranking_algorithm_sort(
                 self.vectors, query_vector, top_k=min(top_k * 2, len(self.documents)), 
                 metric=self.similarity_metric
             )
             
             # BM25 Search
-            query_tokens = bm25s.tokenize([query_text], stopwords="en", stemmer=self.stemmer)
+            if query_tokens is None:
+                query_tokens = bm25s.tokenize([query_text], stopwords="en", stemmer=self.stemmer)
             bm25_results, bm25_scores = self.bm25_retriever.retrieve(query_tokens, k=min(top_k * 2, len(self.documents)))
             
             # Validate BM25 results
             if not isinstance(bm25_results, (list, np.ndarray)) or not isinstance(bm25_scores, (list, np.ndarray)):
                 queue_message("WARNING: Invalid BM25 results format, falling back to vector search")
-                return self._vector_query(query_text, top_k, return_similarities)
+                return self._vector_query(query_text, top_k, return_similarities, query_vector)
 
             try:
                 bm25_results = bm25_results[0]
                 bm25_scores = bm25_scores[0]
             except (IndexError, TypeError) as e:
                 queue_message(f"WARNING: Error processing BM25 results: {e}")
-                return self._vector_query(query_text, top_k, return_similarities)
+                return self._vector_query(query_text, top_k, return_similarities, query_vector)
 
             # RRF Fusion
             vector_ranks = {doc_id: rank + 1 for rank, doc_id in enumerate(vector_results) 
@@ -527,7 +536,7 @@ class HyperDB:
 
             if not vector_ranks and not bm25_ranks:
                 queue_message("WARNING: No valid ranks found")
-                return self._vector_query(query_text, top_k, return_similarities)
+                return self._vector_query(query_text, top_k, return_similarities, query_vector)
 
             # Calculate RRF scores
             rrf_scores = {}
@@ -555,7 +564,7 @@ class HyperDB:
 
             if not candidate_docs:
                 queue_message("WARNING: No valid candidates for reranking")
-                return self._vector_query(query_text, top_k, return_similarities)
+                return self._vector_query(query_text, top_k, return_similarities, query_vector)
 
             # Apply FlashRank reranking
             reranked_results = self._rerank_results(query_text, candidate_docs)
@@ -585,4 +594,4 @@ class HyperDB:
             queue_message(f"WARNING: Hybrid query failed: {e}")
             import traceback
             traceback.print_exc()
-            return self._vector_query(query_text, top_k, return_similarities)
+            return self._vector_query(query_text, top_k, return_similarities, query_vector)
@@ -5,15 +5,24 @@ LLM module for the TARS-AI application.
 
 Provides:
 - Integration with LLM backends (OpenAI, DeepInfra, Ooba, Tabby).
-- Functions for text generation, emotion detection, and memory management.
+- Failover and hedged requests across an ordered list of backends.
+- Functions for text generation and memory management.
 """
 
 # === Standard Libraries ===
+import os
+import json
+import time
 import requests
 import threading
-import concurrent.futures
-from modules.module_config import load_config
+from modules.module_config import load_config, get_api_key
 from modules.module_prompt import build_prompt
+from modules.module_llm_router import LLMBackend, LLMRouter, RequestCancelled, parse_backend_list
+from modules.module_http import http_post
+from modules.module_scheduler import RequestScheduler, SchedulerBusy, default_concurrency
+from modules.module_llmcache import LLMCache, make_key
+from modules.module_emotion import submit_emotion
+from modules.module_utterance import as_utterance
 
 from modules.module_messageQue import queue_message
 
@@ -22,12 +31,51 @@ CONFIG = load_config()
 character_manager = None
 memory_manager = None
 
-# Threading and Executor
-executor = concurrent.futures.ThreadPoolExecutor(max_workers=4)
+# Priority scheduler in front of the LLM backend (voice > chat UI > Discord)
+scheduler = RequestScheduler(
+    max_concurrent=default_concurrency(CONFIG['LLM']['llm_backend'], CONFIG['LLM']['max_concurrent']),
+    queue_size=CONFIG['LLM']['queue_size'],
+)
 
-if CONFIG['EMOTION']['enabled']:
-    from transformers import pipeline
-    classifier = pipeline("text-classification", model="SamLowe/roberta-base-go_emotions", top_k=None)
+def _build_router():
+    """
+    Build the LLM router from the primary [LLM] backend plus any configured fallbacks.
+    """
+    timeout = CONFIG['LLM']['request_timeout']
+    backends = [LLMBackend(
+        name=CONFIG['LLM']['llm_backend'],
+        base_url=CONFIG['LLM']['base_url'],
+        api_key=CONFIG['LLM']['api_key'],
+        model=CONFIG['LLM']['openai_model'],
+        timeout=timeout,
+    )]
+    for name, base_url, model in parse_backend_list(CONFIG['LLM']['fallback_backends']):
+        try:
+            api_key = get_api_key(name)
+        except ValueError as e:
+            queue_message(f"WARNING: Skipping fallback LLM backend {name}: {e}")
+            continue
+        backends.append(LLMBackend(
+            name=name,
+            base_url=base_url,
+            api_key=api_key,
+            model=model or CONFIG['LLM']['openai_model'],
+            timeout=timeout,
+        ))
+    return LLMRouter(backends, hedge=CONFIG['LLM']['hedge_requests'])
+
+router = _build_router()
+
+# Memoized replies for deterministic (temperature 0) side calls
+llm_cache = LLMCache(
+    path=os.path.join(CONFIG['BASE_DIR'], 'memory', 'llm_cache.json'),
+    max_entries=CONFIG['LLM']['cache_size'],
+    ttl=CONFIG['LLM']['cache_ttl'],
+) if CONFIG['LLM']['cache_enabled'] else None
+if llm_cache is not None:
+    from modules.module_engine import registry_fingerprint, FUNCTION_REGISTRY
+    llm_cache.set_fingerprint(registry_fingerprint())
+    FUNCTION_REGISTRY.add_listener(lambda: llm_cache.set_fingerprint(registry_fingerprint()))
 
 # === Core Functions ===
 
@@ -36,7 +84,7 @@ def get_completion(user_prompt, istext=True):
     Generate a completion using the configured LLM backend.
 
     Parameters:
-    - user_prompt (str): The user's input prompt.
+    - user_prompt (str | UtteranceContext): The user's input prompt.
     - istext (bool): Whether the prompt is a standard text query.
 
     Returns:
@@ -45,18 +93,12 @@ def get_completion(user_prompt, istext=True):
     if memory_manager is None or character_manager is None:
         raise ValueError("MemoryManager and CharacterManager must be initialized before generating completions.")
 
-    prompt = build_prompt(user_prompt, character_manager, memory_manager, CONFIG)
-    headers = {
-        "Content-Type": "application/json",
-        "Authorization": f"Bearer {CONFIG['LLM']['api_key']}"
-    }
-    llm_backend = CONFIG['LLM']['llm_backend']
-    url, data = _prepare_request_data(llm_backend, prompt)
+    utterance = as_utterance(user_prompt)
+    user_prompt = utterance.text
+    prompt = build_prompt(utterance, character_manager, memory_manager, CONFIG)
 
     try:
-        response = requests.post(url, headers=headers, json=data)
-        response.raise_for_status()
-        bot_reply = _extract_text(response.json(), istext)
+        bot_reply = router.route(lambda backend, cancel_event: _send_to_backend(backend, prompt, istext, cancel_event))
         
         llm_process(user_prompt, bot_reply)
         return bot_reply
@@ -65,47 +107,89 @@ def get_completion(user_prompt, istext=True):
         queue_message(f"ERROR: LLM request failed: {e}")
         return None
 
-def _prepare_request_data(llm_backend, prompt):
+def _send_to_backend(backend, prompt, istext, cancel_event, temperature=None):
+    """
+    Send a completion request to a single backend, honouring its timeout and cancellation.
+
+    Parameters:
+    - backend (LLMBackend): The backend to query.
+    - prompt (str): The formatted prompt.
+    - istext (bool): Whether the response should be treated as text.
+    - cancel_event (threading.Event): Set by the router when another backend already answered.
+    - temperature (float): Sampling temperature, defaults to the [LLM] temperature.
+
+    Returns:
+    - str: Extracted text content.
+    """
+    headers = {
+        "Content-Type": "application/json",
+        "Authorization": f"Bearer {backend.api_key}"
+    }
+    url, data = _prepare_request_data(backend.name, prompt, backend.base_url, backend.model, temperature)
+    deadline = time.monotonic() + backend.timeout
+
+    response = http_post(url, headers=headers, json=data, timeout=backend.timeout, stream=True)
+    try:
+        response.raise_for_status()
+        body = bytearray()
+        for block in response.iter_content(chunk_size=4096):
+            if cancel_event.is_set():
+                raise RequestCancelled(backend.label)
+            if time.monotonic() > deadline:
+                raise requests.Timeout(f"{backend.label} exceeded {backend.timeout}s")
+            body.extend(block)
+    finally:
+        response.close()
+
+    return _extract_text(json.loads(body), istext, backend.name)
+
+def _prepare_request_data(llm_backend, prompt, base_url=None, model=None, temperature=None):
     """
     Prepare the request URL and data for the LLM backend.
 
     Parameters:
     - llm_backend (str): The LLM backend name.
     - prompt (str): The formatted prompt.
+    - base_url (str): Backend URL, defaults to the [LLM] base_url.
+    - model (str): Model name for openai-style backends, defaults to the [LLM] openai_model.
+    - temperature (float): Sampling temperature, defaults to the [LLM] temperature.
 
     Returns:
     - tuple: URL and data payload for the request.
     """
+    base_url = base_url or CONFIG['LLM']['base_url']
+    model = model or CONFIG['LLM']['openai_model']
+    temperature = CONFIG['LLM']['temperature'] if temperature is None else temperature
     if llm_backend == "openai":
-        url = f"{CONFIG['LLM']['base_url']}/v1/chat/completions"
+        url = f"{base_url}/v1/chat/completions"
         data = {
-            "model": CONFIG['LLM']['openai_model'],
+            "model": model,
             "messages": [
                 {"role": "system", "content": CONFIG['LLM']['systemprompt']},
                 {"role": "user", "content": prompt}
             ],
             "max_tokens": CONFIG['LLM']['max_tokens'],
-            "temperature": CONFIG['LLM']['temperature'],
+            "temperature": temperature,
             "top_p": CONFIG['LLM']['top_p']
         }
     elif llm_backend == "deepinfra":
-        url = f"{CONFIG['LLM']['base_url']}/v1/openai/chat/completions"
+        url = f"{base_url}/v1/openai/chat/completions"
         data = {
-            "model": CONFIG['LLM']['openai_model'],
+            "model": model,
             "messages": [
                 {"role": "system", "content": CONFIG['LLM']['systemprompt']},
                 {"role": "user", "content": prompt}
             ],
             "max_tokens": CONFIG['LLM']['max_tokens'],
-            "temperature": CONFIG['LLM']['temperature'],
+            "temperature": temperature,
             "top_p": CONFIG['LLM']['top_p']
         }
     elif llm_backend in ["ooba", "tabby"]:
-        url = f"{CONFIG['LLM']['base_url']}/v1/completions"
+        url = f"{base_url}/v1/completions"
         data = {
             "prompt": prompt,
             "max_tokens": CONFIG['LLM']['max_tokens'],
-            "temperature": CONFIG['LLM']['temperature'],
+            "temperature": temperature,
             "top_p": CONFIG['LLM']['top_p']
         }
         if llm_backend == "ooba":
@@ -115,19 +199,20 @@ def _prepare_request_data(llm_backend, prompt):
 
     return url, data
 
-def _extract_text(response_json, istext):
+def _extract_text(response_json, istext, llm_backend=None):
     """
     Extract the generated text from the LLM response.
 
     Parameters:
     - response_json (dict): The JSON response from the LLM backend.
     - istext (bool): Whether the response should be treated as text.
+    - llm_backend (str): Backend that produced the response, defaults to the [LLM] llm_backend.
 
     Returns:
     - str: Extracted text content.
     """
     try:
-        llm_backend = CONFIG['LLM']['llm_backend']
+        llm_backend = llm_backend or CONFIG['LLM']['llm_backend']
         if 'choices' in response_json:
             # Both openai and deepinfra return the message in a similar format.
             return (
@@ -140,36 +225,22 @@ def _extract_text(response_json, istext):
     except (KeyError, IndexError, TypeError) as error:
         return f"Text extraction failed: {str(error)}"
 
-def process_completion(prompt):
+def process_completion(prompt, source="voice"):
     """
     Generate a response for the given prompt using the LLM backend.
 
     Parameters:
-    - prompt (str): The input prompt.
+    - prompt (str | UtteranceContext): The input prompt.
+    - source (str): Where the turn came from (voice, chatui, discord); sets its priority.
 
     Returns:
     - str: The generated response.
-    """
-    future = executor.submit(get_completion, prompt, istext=True)
-    return future.result()
 
-# === Emotion Detection ===
-
-def detect_emotion(text):
-    """
-    Detect the emotion of the given text.
-
-    Parameters:
-    - text (str): The text to analyze.
-
-    Returns:
-    - str: The detected emotion.
+    Raises:
+    - SchedulerBusy: If too many requests from this source are already waiting.
     """
-    model_outputs = classifier(text)
-    emotindetected = max(model_outputs[0], key=lambda x: x['score'])['label']
-    requests.post("http://127.0.0.1:5012/emotion", data=emotindetected, timeout=10)
-    return
-
+    future = scheduler.submit(get_completion, as_utterance(prompt, source=source), istext=True, source=source)
+    return future.result()
 
 # === Memory Integration ===
 
@@ -189,39 +260,70 @@ def llm_process(user_input, bot_response):
         threading.Thread(target=memory_manager.write_longterm_memory, args=(user_input, bot_response)).start()
     
     if CONFIG['EMOTION']['enabled']:  # No need to compare with True
-        emotion_thread = threading.Thread(target=detect_emotion, args=(bot_response,))
-        emotion_thread.start()  # Start the thread
+        submit_emotion(bot_response)  # Classified on the emotion worker, newest reply wins
 
     return bot_response
 
-def raw_complete_llm(user_prompt, istext=True):
+def raw_complete_llm(user_prompt, istext=True, temperature=None):
     """
     Generate a completion using the configured LLM backend.
 
     Parameters:
     - user_prompt (str): The user's input prompt.
     - istext (bool): Whether the prompt is a standard text query.
+    - temperature (float): Sampling temperature, defaults to the [LLM] temperature.
+      Calls made with temperature 0 are deterministic and served from the result cache.
 
     Returns:
     - str: The generated completion.
     """
-    headers = {
-        "Content-Type": "application/json",
-        "Authorization": f"Bearer {CONFIG['LLM']['api_key']}"
-    }
-    llm_backend = CONFIG['LLM']['llm_backend']
-    url, data = _prepare_request_data(llm_backend, user_prompt)
+    cache_key = None
+    if llm_cache is not None and temperature == 0:
+        primary = router.backends[0]
+        cache_key = make_key(user_prompt, primary.name, primary.model)
+        cached = llm_cache.get(cache_key)
+        if cached is not None:
+            return cached
 
     try:
-        response = requests.post(url, headers=headers, json=data)
-        response.raise_for_status()
-        bot_reply = _extract_text(response.json(), istext)
+        bot_reply, backend = router.route(
+            lambda backend, cancel_event: _send_to_backend(backend, user_prompt, istext, cancel_event, temperature),
+            with_backend=True,
+        )
+        # Only cache replies from the primary: a hedged or failed-over reply came from another model
+        if cache_key and backend is router.backends[0] and bot_reply and not bot_reply.startswith("Text extraction failed"):
+            llm_cache.put(cache_key, bot_reply)
         return bot_reply
     
     except requests.RequestException as e:
         queue_message(f"ERROR: LLM request failed: {e}")
         return None
 
+def get_scheduler_metrics():
+    """
+    Return per-source queue depth and queue-time statistics for the LLM scheduler.
+    """
+    return scheduler.get_metrics()
+
+def get_llm_cache_stats():
+    """
+    Return hit/miss statistics for the side-call result cache.
+    """
+    return llm_cache.get_stats() if llm_cache is not None else {}
+
+def save_llm_cache():
+    """
+    Flush the side-call result cache to disk (used on shutdown).
+    """
+    if llm_cache is not None:
+        llm_cache.save()
+
+def get_router_stats():
+    """
+    Return rolling latency/error statistics for each configured LLM backend.
+    """
+    return router.get_stats()
+
 # === Initialization ===
 def initialize_manager_llm(mem_manager, char_manager):
     """
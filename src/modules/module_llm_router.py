@@ -0,0 +1,222 @@
+"""
+module_llm_router.py
+
+Multi-backend LLM routing for the TARS-AI application.
+
+Provides:
+- An ordered list of LLM backends with rolling latency and error statistics.
+- Hedged requests: a duplicate is sent to the next backend once the p95 deadline passes.
+- Failover to the next backend on errors, with a cooldown for backends that keep failing.
+"""
+
+# === Standard Libraries ===
+import time
+import threading
+import concurrent.futures
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional
+
+import requests
+
+from modules.module_messageQue import queue_message
+
+# === Constants ===
+STATS_WINDOW = 50            # Number of recent requests used for latency/error stats
+MIN_SAMPLES_FOR_P95 = 5      # Below this, the configured default hedge delay is used
+FAILURE_THRESHOLD = 3        # Consecutive failures before a backend is put on cooldown
+COOLDOWN_SECONDS = 30.0      # How long an unhealthy backend is skipped
+
+executor = concurrent.futures.ThreadPoolExecutor(max_workers=8, thread_name_prefix="LLMRouter")
+
+class LLMRouterError(requests.RequestException):
+    """Raised when every backend failed to produce a reply."""
+
+class RequestCancelled(Exception):
+    """Raised inside a request attempt that lost a hedge race."""
+
+class BackendStats:
+    """
+    Rolling latency and error statistics for a single backend.
+    """
+    def __init__(self, window=STATS_WINDOW):
+        self.latencies = deque(maxlen=window)
+        self.outcomes = deque(maxlen=window)
+        self.consecutive_failures = 0
+        self.cooldown_until = 0.0
+        self.lock = threading.Lock()
+
+    def record_success(self, latency):
+        with self.lock:
+            self.latencies.append(latency)
+            self.outcomes.append(True)
+            self.consecutive_failures = 0
+            self.cooldown_until = 0.0
+
+    def record_failure(self):
+        with self.lock:
+            self.outcomes.append(False)
+            self.consecutive_failures += 1
+            if self.consecutive_failures >= FAILURE_THRESHOLD:
+                self.cooldown_until = time.monotonic() + COOLDOWN_SECONDS
+
+    def p95(self) -> Optional[float]:
+        """Return the 95th percentile latency, or None if there are too few samples."""
+        with self.lock:
+            if len(self.latencies) < MIN_SAMPLES_FOR_P95:
+                return None
+            ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))]
+
+    def error_rate(self) -> float:
+        with self.lock:
+            if not self.outcomes:
+                return 0.0
+            return self.outcomes.count(False) / len(self.outcomes)
+
+    def is_healthy(self) -> bool:
+        return time.monotonic() >= self.cooldown_until
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            latencies = list(self.latencies)
+        return {
+            "requests": len(self.outcomes),
+            "error_rate": round(self.error_rate(), 3),
+            "p95": self.p95(),
+            "avg_latency": round(sum(latencies) / len(latencies), 3) if latencies else None,
+            "healthy": self.is_healthy(),
+        }
+
+@dataclass
+class LLMBackend:
+    """
+    A single LLM endpoint. `name` is the backend type (openai, deepinfra, ooba, tabby).
+    """
+    name: str
+    base_url: str
+    api_key: Optional[str] = None
+    model: Optional[str] = None
+    timeout: float = 30.0
+    stats: BackendStats = field(default_factory=BackendStats)
+
+    @property
+    def label(self) -> str:
+        return f"{self.name}@{self.base_url}"
+
+class LLMRouter:
+    """
+    Routes a request over an ordered list of backends with hedging and failover.
+    """
+    def __init__(self, backends: List[LLMBackend], hedge=True, hedge_delay=2.0, hedge_min_delay=0.25):
+        """
+        Parameters:
+        - backends (list): Ordered LLMBackend instances, preferred backend first.
+        - hedge (bool): Send a duplicate to the next backend when the p95 deadline passes.
+        - hedge_delay (float): Hedge deadline used until a backend has enough latency samples.
+        - hedge_min_delay (float): Lower bound for the hedge deadline.
+        """
+        if not backends:
+            raise ValueError("LLMRouter requires at least one backend.")
+        self.backends = backends
+        self.hedge = hedge
+        self.hedge_delay = hedge_delay
+        self.hedge_min_delay = hedge_min_delay
+
+    def _ordered_backends(self) -> List[LLMBackend]:
+        """Healthy backends in configured order, followed by those on cooldown as a last resort."""
+        healthy = [b for b in self.backends if b.stats.is_healthy()]
+        cooling = [b for b in self.backends if not b.stats.is_healthy()]
+        return healthy + cooling
+
+    def _hedge_deadline(self, backend: LLMBackend) -> float:
+        p95 = backend.stats.p95()
+        deadline = p95 if p95 is not None else self.hedge_delay
+        return min(max(deadline, self.hedge_min_delay), backend.timeout)
+
+    def route(self, send: Callable[[LLMBackend, threading.Event], str], with_backend=False):
+        """
+        Run `send(backend, cancel_event)` against the backends until one succeeds.
+
+        The send function must honour `cancel_event` and its backend's timeout. Losing
+        attempts are cancelled as soon as a winner is found.
+
+        Parameters:
+        - send (callable): Performs one attempt against a backend.
+        - with_backend (bool): Also return the backend that produced the result.
+
+        Returns:
+        - The result of the first successful attempt, or (result, backend) with `with_backend`.
+
+        Raises:
+        - LLMRouterError: If every backend failed.
+        """
+        candidates = self._ordered_backends()
+        pending = {}
+        next_index = 0
+        last_error = None
+
+        def launch():
+            nonlocal next_index
+            backend = candidates[next_index]
+            next_index += 1
+            cancel_event = threading.Event()
+            future = executor.submit(send, backend, cancel_event)
+            pending[future] = (backend, cancel_event, time.monotonic())
+            return backend
+
+        launch()
+        while pending:
+            timeout = None
+            if self.hedge and next_index < len(candidates):
+                newest_backend, _, newest_start = list(pending.values())[-1]
+                timeout = max(0.0, newest_start + self._hedge_deadline(newest_backend) - time.monotonic())
+
+            done, _ = concurrent.futures.wait(pending, timeout=timeout, return_when=concurrent.futures.FIRST_COMPLETED)
+            if not done:
+                hedged = launch()
+                queue_message(f"INFO: LLM backend slow, hedging request to {hedged.label}")
+                continue
+
+            for future in done:
+                backend, _, started = pending.pop(future)
+                try:
+                    result = future.result()
+                except RequestCancelled:
+                    continue
+                except Exception as e:
+                    backend.stats.record_failure()
+                    last_error = e
+                    queue_message(f"ERROR: LLM backend {backend.label} failed: {e}")
+                    if not pending and next_index < len(candidates):
+                        launch()
+                    continue
+
+                backend.stats.record_success(time.monotonic() - started)
+                for _, cancel_event, _ in pending.values():
+                    cancel_event.set()
+                return (result, backend) if with_backend else result
+
+        raise LLMRouterError(f"All LLM backends failed: {last_error}")
+
+    def get_stats(self) -> dict:
+        """Return latency/error statistics for every backend, keyed by label."""
+        return {backend.label: backend.stats.snapshot() for backend in self.backends}
+
+def parse_backend_list(spec: str) -> List[tuple]:
+    """
+    Parse a comma separated `backend|url|model` list from config.ini.
+
+    Parameters:
+    - spec (str): e.g. "tabby|http://192.168.2.57:5000, openai|https://api.openai.com|gpt-4o-mini"
+
+    Returns:
+    - list: (backend, base_url, model) tuples, model may be None.
+    """
+    entries = []
+    for item in (spec or "").split(","):
+        parts = [part.strip() for part in item.strip().split("|")]
+        if len(parts) < 2 or not parts[0] or not parts[1]:
+            continue
+        entries.append((parts[0], parts[1].rstrip("/"), parts[2] if len(parts) > 2 and parts[2] else None))
+    return entries
@@ -0,0 +1,179 @@
+"""
+module_llmcache.py
+
+Memoized results for auxiliary LLM calls in the TARS-AI application.
+
+Provides:
+- A bounded LRU cache with a TTL, keyed on normalized prompt text, backend and model.
+- Persistence to disk so repeated commands are answered instantly across restarts.
+- Hit/miss metrics and invalidation when the tool registry fingerprint changes.
+"""
+
+# === Standard Libraries ===
+import os
+import re
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+
+from modules.module_messageQue import queue_message
+
+# === Constants ===
+SAVE_DELAY = 5.0  # Seconds to coalesce writes before the cache is flushed to disk
+CACHE_VERSION = 1
+
+def normalize_prompt(prompt):
+    """
+    Normalize a prompt for use as a cache key.
+
+    Lowercases, collapses whitespace and strips object addresses (e.g. the
+    "<function search_google at 0x7f...>" entries of a rendered tool registry),
+    which change on every start.
+    """
+    prompt = re.sub(r" at 0x[0-9a-fA-F]+", "", prompt)
+    return re.sub(r"\s+", " ", prompt).strip().lower()
+
+def make_key(prompt, backend, model):
+    """Return the cache key for a prompt sent to the given backend and model."""
+    raw = f"{backend}|{model}|{normalize_prompt(prompt)}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+class LLMCache:
+    """
+    Thread-safe LRU + TTL cache of LLM replies, persisted as JSON.
+    """
+    def __init__(self, path=None, max_entries=512, ttl=86400):
+        """
+        Parameters:
+        - path (str): JSON file used to persist the cache, or None to keep it in memory only.
+        - max_entries (int): Least recently used entries are evicted beyond this size.
+        - ttl (float): Seconds an entry stays valid.
+        """
+        self.path = path
+        self.max_entries = max(1, int(max_entries))
+        self.ttl = float(ttl)
+        self.entries = OrderedDict()
+        self.fingerprint = None
+        self.stats = {"hits": 0, "misses": 0, "expired": 0, "evictions": 0, "invalidations": 0}
+        self.lock = threading.Lock()
+        self.save_timer = None
+        self._load()
+
+    def get(self, key):
+        """
+        Return the cached reply for `key`, or None on a miss or an expired entry.
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+            value, stored_at = entry
+            if time.time() - stored_at > self.ttl:
+                del self.entries[key]
+                self.stats["expired"] += 1
+                self.stats["misses"] += 1
+                return None
+            self.entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return value
+
+    def put(self, key, value):
+        """
+        Store a reply, evicting the least recently used entries when full.
+        """
+        with self.lock:
+            self.entries[key] = (value, time.time())
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.stats["evictions"] += 1
+        self._schedule_save()
+
+    def invalidate(self):
+        """
+        Drop every cached entry.
+        """
+        with self.lock:
+            self.entries.clear()
+            self.stats["invalidations"] += 1
+        self._schedule_save()
+
+    def set_fingerprint(self, fingerprint):
+        """
+        Bind the cache to a tool registry fingerprint. Entries cached under a
+        different fingerprint (including ones loaded from disk) are dropped.
+        """
+        with self.lock:
+            changed = self.fingerprint is not None and self.fingerprint != fingerprint
+            self.fingerprint = fingerprint
+        if changed:
+            queue_message("INFO: Tool registry changed, clearing LLM result cache.")
+            self.invalidate()
+
+    def get_stats(self) -> dict:
+        """
+        Return hit/miss counters, the current size and the hit rate.
+        """
+        with self.lock:
+            stats = dict(self.stats)
+            stats["size"] = len(self.entries)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 3) if lookups else None
+        return stats
+
+    # === Persistence ===
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as file:
+                data = json.load(file)
+            if data.get("version") != CACHE_VERSION:
+                return
+            now = time.time()
+            for key, value, stored_at in data.get("entries", []):
+                if now - stored_at <= self.ttl:
+                    self.entries[key] = (value, stored_at)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+            self.fingerprint = data.get("fingerprint")
+        except (OSError, ValueError, TypeError) as e:
+            queue_message(f"WARNING: Could not load LLM result cache: {e}")
+            self.entries.clear()
+
+    def _schedule_save(self):
+        if not self.path:
+            return
+        with self.lock:
+            if self.save_timer is not None:
+                return
+            self.save_timer = threading.Timer(SAVE_DELAY, self.save)
+            self.save_timer.daemon = True
+            self.save_timer.start()
+
+    def save(self):
+        """
+        Write the cache to disk atomically.
+        """
+        if not self.path:
+            return
+        with self.lock:
+            if self.save_timer is not None:
+                self.save_timer.cancel()
+                self.save_timer = None
+            data = {
+                "version": CACHE_VERSION,
+                "fingerprint": self.fingerprint,
+                "entries": [[key, value, stored_at] for key, (value, stored_at) in self.entries.items()],
+            }
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as file:
+                json.dump(data, file)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            queue_message(f"WARNING: Could not save LLM result cache: {e}")
@@ -19,8 +19,9 @@ import soundfile as sf
 # === Custom Modules ===
 from modules.module_config import load_config
 from modules.module_discord import *
-from modules.module_llm import process_completion
-from modules.module_tts import play_audio_chunks
+from modules.module_llm import process_completion, SchedulerBusy
+from modules.module_utterance import UtteranceContext
+from modules.module_tts import play_audio_chunks, prewarm_tts
 from modules.module_messageQue import queue_message
 from modules.module_ui import UIManager 
 
@@ -64,6 +65,7 @@ def process_discord_message_callback(user_message):
     Returns:
     - str: The bot's response.
     """
+    reply = None
     try:
         # Parse the user message
         #queue_message(user_message)
@@ -78,11 +80,15 @@ def process_discord_message_callback(user_message):
         #queue_message(message_content)
 
         # Process the message using process_completion
-        reply = process_completion(message_content)  # Process the message
+        utterance = UtteranceContext(message_content, source="discord")
+        reply = process_completion(utterance, source=utterance.source)  # Process the message
 
         #queue_message(f"TARS: {reply}")
         #stream_text_nonblocking(f"TARS: {reply}")
         
+    except SchedulerBusy:
+        queue_message("INFO: Discord message rejected, LLM queue is full.")
+        reply = "I'm a little busy right now, try me again in a moment."
     except Exception as e:
         queue_message(f"ERROR: {e}")
 
@@ -98,6 +104,7 @@ def wake_word_callback(wake_response):
 
     character_name = os.path.splitext(os.path.basename(CONFIG['CHAR']['character_card_path']))[0]
     
+    prewarm_tts()  # The reply is synthesized right after the user stops talking
     ui_manager.wake()
     ui_manager.update_data(character_name, wake_response, character_name)
     
@@ -129,7 +136,8 @@ def utterance_callback(message):
             return  # Exit function after issuing shutdown command
         
         # Process the message using process_completion
-        reply = process_completion(message_dict['text'])  # Process the message
+        utterance = UtteranceContext(message_dict['text'], source="voice")  # Features computed once per turn
+        reply = process_completion(utterance, source=utterance.source)  # Process the message
 
         # Extract the <think> block if present
         try:
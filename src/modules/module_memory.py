@@ -18,7 +18,9 @@ import numpy as np
 # === Custom Modules ===
 from modules.module_hyperdb import *
 from modules.module_config import load_config
+from modules.module_http import http_post
 from modules.module_messageQue import queue_message
+from modules.module_utterance import as_utterance
 
 CONFIG = load_config()
 
@@ -89,16 +91,19 @@ class MemoryManager:
         Retrieve memories related to a given query from the HyperDB.
 
         Parameters:
-        - query (str): The input query.
+        - query (str | UtteranceContext): The input query; its cached embedding and BM25 tokens are reused.
 
         Returns:
         - str: Relevant memories or a fallback message.
         """
         try:
+            utterance = as_utterance(query)
             results = self.hyper_db.query(
-                query, 
+                utterance.text, 
                 top_k=self.top_k, 
-                return_similarities=False
+                return_similarities=False,
+                query_vector=utterance.embedding,
+                query_tokens=utterance.bm25_tokens(self.hyper_db.stemmer) if self.hyper_db.stemmer else None
             )
             
             if results:
@@ -132,7 +137,7 @@ class MemoryManager:
         Retrieve long-term memory relevant to a user input.
 
         Parameters:
-        - user_input (str): The user input.
+        - user_input (str | UtteranceContext): The user input.
 
         Returns:
         - str: Relevant memory or a fallback message.
@@ -286,7 +291,7 @@ class MemoryManager:
             }
 
             try:
-                response = requests.post(url, headers=headers, json=data)
+                response = http_post(url, headers=headers, json=data, timeout=10)
                 response.raise_for_status()
                 return response.json()
             except requests.exceptions.RequestException as e:
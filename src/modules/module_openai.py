@@ -1,79 +1,57 @@
 import io
-import re
-import os
-import hashlib
+import asyncio
 import openai
 from modules.module_messageQue import queue_message
 from modules.module_config import load_config
+from modules.module_segment import speech_chunks
+from modules.module_audio import pcm_stream, iterate_in_thread
 
 CONFIG = load_config()
 openai.api_key = CONFIG["TTS"]["openai_api_key"]
 VOICE = CONFIG["TTS"]["openai_voice"]
 
-CACHE_DIR = os.path.expanduser("~/.local/share/tars_ai_replies")
-os.makedirs(CACHE_DIR, exist_ok=True)
-
-def get_cache_filename(text):
-    """Generate a cache filename based on text hash"""
-    text_hash = hashlib.md5(text.encode('utf-8')).hexdigest()
-    return os.path.join(CACHE_DIR, f"openai_{text_hash}.mp3")
-
-async def text_to_speech_with_pipelining_openai(text, is_wakeword):
-    #print(f"is_wakeword: {is_wakeword}")
-
-    if is_wakeword:
-        cache_file = get_cache_filename(text)
-
-        if os.path.exists(cache_file):
-            #queue_message(f"Loading wakeword from cache: {cache_file}")
-            try:
-                with open(cache_file, 'rb') as f:
-                    audio_bytes = f.read()
-                audio_buffer = io.BytesIO(audio_bytes)
-                audio_buffer.seek(0)
-                yield audio_buffer
-                return
-            except Exception as e:
-                queue_message(f"ERROR: Failed to load cache file: {e}")
-        
-        #queue_message(f"Generating and caching wakeword: {text}")
+PCM_RATE = 24000  # response_format="pcm" is 24 kHz 16-bit mono
+STREAM_BLOCK_BYTES = 4800  # 100 ms of audio
+
+def stream_sentence(chunk):
+    """
+    Yield PCMChunk pieces of a sentence as OpenAI streams them.
+    """
+    with openai.audio.speech.with_streaming_response.create(
+        model="tts-1",
+        voice=VOICE,
+        input=chunk,
+        response_format="pcm"
+    ) as response:
+        yield from pcm_stream(response.iter_bytes(STREAM_BLOCK_BYTES), PCM_RATE)
+
+def synthesize_openai(chunk):
+    """
+    Return a sentence as a complete MP3 in a BytesIO buffer.
+    """
+    response = openai.audio.speech.create(
+        model="tts-1",
+        voice=VOICE,
+        input=chunk
+    )
+    audio_buffer = io.BytesIO(response.read())
+    audio_buffer.seek(0)
+    return audio_buffer
+
+async def text_to_speech_with_pipelining_openai(text):
+    """
+    Converts text to speech with OpenAI sentence by sentence, streaming raw PCM as it
+    arrives ([TTS] tts_streaming) or one MP3 per sentence.
+    """
+    # Wake word responses are cached by the shared phrase cache in module_tts
+    for chunk in speech_chunks(text):
         try:
-            response = openai.audio.speech.create(
-                model="tts-1",
-                voice=VOICE,
-                input=text
-            )
-
-            audio_bytes = response.read()
-
-            try:
-                with open(cache_file, 'wb') as f:
-                    f.write(audio_bytes)
-                #queue_message(f"Cached wakeword to: {cache_file}")
-            except Exception as e:
-                queue_message(f"ERROR: Failed to cache audio: {e}")
-            
-            audio_buffer = io.BytesIO(audio_bytes)
-            audio_buffer.seek(0)
-            yield audio_buffer
-            
-        except Exception as e:
-            queue_message(f"ERROR: OpenAI TTS failed: {e}")
-            yield None
-    else:
-        try:
-            response = openai.audio.speech.create(
-                model="tts-1",
-                voice=VOICE,
-                input=text
-            )
-
-            audio_bytes = response.read()
-            audio_buffer = io.BytesIO(audio_bytes)
-            audio_buffer.seek(0)
-
-            yield audio_buffer
+            if CONFIG['TTS']['tts_streaming']:
+                async for pcm in iterate_in_thread(stream_sentence, chunk):
+                    yield pcm
+            else:
+                yield await asyncio.to_thread(synthesize_openai, chunk)
 
         except Exception as e:
             queue_message(f"ERROR: OpenAI TTS failed: {e}")
-            yield None
\ No newline at end of file
+            yield None  # Marks the sentence as failed
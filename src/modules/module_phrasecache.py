@@ -0,0 +1,131 @@
+"""
+module_phrasecache.py
+
+Pre-synthesized phrase audio for the TARS-AI application.
+
+Fixed phrases (wake word responses, the "processing" acknowledgement...) are synthesized
+once per (backend, voice, effects, text) and stored on disk as the audio chunks the backend
+produced, so they play back without any synthesis latency. The cache is bounded in bytes
+and evicts the least recently used phrases.
+"""
+
+# === Standard Libraries ===
+import os
+import struct
+import hashlib
+import threading
+from collections import OrderedDict
+
+from modules.module_messageQue import queue_message
+
+# === Constants ===
+FILE_SUFFIX = ".phrase"
+_LENGTH = struct.Struct("<I")  # Each stored chunk is prefixed with its byte length
+
+def phrase_key(backend, voice, effects, text):
+    """Return the cache key for a phrase rendered by a backend with a given voice and effects chain."""
+    raw = "|".join([backend, str(voice), str(effects), " ".join(text.split())])
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+class PhraseCache:
+    """
+    Disk-backed, byte-bounded LRU cache of synthesized phrases.
+    """
+    def __init__(self, directory, max_bytes=32 * 1024 * 1024):
+        """
+        Parameters:
+        - directory (str): Where phrase files are stored.
+        - max_bytes (int): Total size above which the least recently used phrases are deleted.
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()  # key -> size in bytes, least recently used first
+        self.total_bytes = 0
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+        self.lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._scan()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + FILE_SUFFIX)
+
+    def _scan(self):
+        """Rebuild the LRU order from file modification times (touched on every hit)."""
+        files = []
+        for name in os.listdir(self.directory):
+            if name.endswith(FILE_SUFFIX):
+                stat = os.stat(os.path.join(self.directory, name))
+                files.append((stat.st_mtime, name[:-len(FILE_SUFFIX)], stat.st_size))
+        for _, key, size in sorted(files):
+            self.entries[key] = size
+            self.total_bytes += size
+        self._evict()
+
+    def _evict(self):
+        while self.total_bytes > self.max_bytes and len(self.entries) > 1:
+            key, size = self.entries.popitem(last=False)
+            self.total_bytes -= size
+            self.stats["evictions"] += 1
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+
+    def __contains__(self, key):
+        with self.lock:
+            return key in self.entries
+
+    def get(self, key):
+        """
+        Return the stored audio chunks (list of bytes) for `key`, or None.
+        """
+        with self.lock:
+            if key not in self.entries:
+                self.stats["misses"] += 1
+                return None
+            self.entries.move_to_end(key)
+            self.stats["hits"] += 1
+        try:
+            with open(self._path(key), "rb") as file:
+                data = file.read()
+            os.utime(self._path(key))
+        except OSError:
+            with self.lock:
+                self.total_bytes -= self.entries.pop(key, 0)
+            return None
+
+        chunks, offset = [], 0
+        while offset < len(data):
+            (length,) = _LENGTH.unpack_from(data, offset)
+            offset += _LENGTH.size
+            chunks.append(data[offset:offset + length])
+            offset += length
+        return chunks
+
+    def put(self, key, chunks):
+        """
+        Store the audio chunks of a phrase, evicting old phrases beyond the size limit.
+        """
+        data = b"".join(_LENGTH.pack(len(chunk)) + chunk for chunk in chunks)
+        tmp_path = self._path(key) + ".tmp"
+        try:
+            with open(tmp_path, "wb") as file:
+                file.write(data)
+            os.replace(tmp_path, self._path(key))
+        except OSError as e:
+            queue_message(f"WARNING: Could not store phrase audio: {e}")
+            return
+        with self.lock:
+            self.total_bytes += len(data) - self.entries.pop(key, 0)
+            self.entries[key] = len(data)
+            self._evict()
+
+    def get_stats(self) -> dict:
+        """
+        Return hit/miss/eviction counters with the number of phrases and bytes stored.
+        """
+        with self.lock:
+            stats = dict(self.stats)
+            stats["phrases"] = len(self.entries)
+            stats["bytes"] = self.total_bytes
+        return stats
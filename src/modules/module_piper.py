@@ -1,15 +1,15 @@
-import sounddevice as sd
-import soundfile as sf
-from io import BytesIO
-from piper.voice import PiperVoice
-import wave
-import re
 import os
+import queue
 import ctypes
+import asyncio
+import threading
+from piper.voice import PiperVoice
 
 # === Custom Modules ===
 from modules.module_config import load_config
 from modules.module_messageQue import queue_message
+from modules.module_segment import speech_chunks
+from modules.module_audio import pcm_chunk
 
 CONFIG = load_config()
 
@@ -35,41 +35,85 @@ asound = ctypes.cdll.LoadLibrary('libasound.so')
 script_dir = os.path.dirname(__file__)
 model_path = os.path.join(script_dir, '..', f'character/{character_name}/voice/{character_name}.onnx')
 
-if CONFIG['TTS']['ttsoption'] == 'piper':
-    voice = PiperVoice.load(model_path)
+WARMUP_TEXT = "Ready."
+_END = object()  # Ends the PCM stream of one request
+
+def stream_pcm(voice, text):
+    """
+    Yield raw int16 PCM bytes for `text`, one piece per phoneme batch (sentence) as Piper
+    produces it.
+    """
+    # need both APIs for compatibility
+    if hasattr(voice, "synthesize_wav"):
+        # piper-tts >= 1.3: synthesize() yields an AudioChunk per sentence
+        for audio_chunk in voice.synthesize(text):
+            yield audio_chunk.audio_int16_bytes
+    elif hasattr(voice, "synthesize_stream_raw"):
+        yield from voice.synthesize_stream_raw(text)
+    else:
+        raise AttributeError("Neither synthesize_wav nor synthesize_stream_raw found in voice object")
 
-async def synthesize(voice, chunk):
+class PiperWorker:
     """
-    Synthesize a chunk of text into a BytesIO buffer.
+    Runs all Piper synthesis on one long-lived thread, so the model (and its ONNX session
+    threads) stay warm across sentences and the event loop is never blocked.
     """
-    wav_buffer = BytesIO()
-    with wave.open(wav_buffer, 'wb') as wav_file:
-        wav_file.setnchannels(1)  # Mono
-        wav_file.setsampwidth(2)  # 16-bit samples
-        wav_file.setframerate(voice.config.sample_rate)
+    def __init__(self, voice):
+        self.voice = voice
+        self.sample_rate = voice.config.sample_rate
+        self.requests = queue.Queue()
+        self.thread = threading.Thread(target=self._run, name="PiperWorker", daemon=True)
+        self.thread.start()
+        self.requests.put((WARMUP_TEXT, None, threading.Event()))  # First inference is the slow one
+
+    def _run(self):
+        while True:
+            text, output, cancel = self.requests.get()
+            try:
+                for pcm in stream_pcm(self.voice, text):
+                    if cancel.is_set():
+                        break
+                    if output is not None:
+                        output.put(pcm)
+            except Exception as e:
+                queue_message(f"ERROR during synthesis: {e}")
+                if output is not None:
+                    output.put(None)  # Marks the sentence as failed
+            finally:
+                if output is not None:
+                    output.put(_END)
+
+    async def synthesize(self, text):
+        """
+        Async generator of PCMChunk pieces for `text`, yielded as soon as each exists.
+        """
+        output, cancel = queue.Queue(), threading.Event()
+        self.requests.put((text, output, cancel))
         try:
-            # need both methods for compatibility
-            if hasattr(voice, "synthesize_wav"):
-                voice.synthesize_wav(chunk, wav_file)
-            elif hasattr(voice, "synthesize"):
-                voice.synthesize(chunk, wav_file)
-            else:
-                raise AttributeError("Neither synthesize_wav nor synthesize found in voice object")
-
-        except Exception as e:
-            queue_message(f"ERROR during synthesis: {e}")
-    wav_buffer.seek(0)
-    return wav_buffer
+            while True:
+                pcm = await asyncio.to_thread(output.get)
+                if pcm is _END:
+                    break
+                if pcm is None:
+                    yield None
+                elif pcm:
+                    yield pcm_chunk(pcm, self.sample_rate)
+        finally:
+            cancel.set()  # Playback stopped early: let the worker move on
+
+if CONFIG['TTS']['ttsoption'] == 'piper':
+    voice = PiperVoice.load(model_path)
+    worker = PiperWorker(voice)
 
 async def text_to_speech_with_pipelining_piper(text):
     """
-    Converts text to speech using the Piper model and streams audio as it's generated.
+    Converts text to speech using the Piper model and streams raw PCM as it's generated.
     """
     # Split text into smaller chunks
-    chunks = re.split(r'(?<=\.)\s', text)  # Split at sentence boundaries
+    chunks = speech_chunks(text)  # Short first clause, then sentence groups
 
-    # Yield each audio chunk as soon as it's ready
+    # Yield audio as soon as each phoneme batch is synthesized
     for chunk in chunks:
         if chunk.strip():  # Ignore empty chunks
-            wav_buffer = await synthesize(voice, chunk.strip())
-            yield wav_buffer  # Return the chunk for external playback
\ No newline at end of file
+            async for pcm in worker.synthesize(chunk.strip()):
+                yield pcm  # Return the samples for external playback
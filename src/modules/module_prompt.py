@@ -7,6 +7,8 @@ Utility module for building prompts for LLM backends.
 from datetime import datetime
 import os
 from modules.module_engine import check_for_module
+from modules.module_utterance import as_utterance
+from modules.module_compress import compress_tool_output, estimate_tokens
 from modules.module_messageQue import queue_message
 
 def build_prompt(user_prompt, character_manager, memory_manager, config, debug=False):
@@ -14,7 +16,7 @@ def build_prompt(user_prompt, character_manager, memory_manager, config, debug=F
     Build a dynamically optimized prompt for the LLM backend.
 
     Parameters:
-    - user_prompt (str): The user's input prompt.
+    - user_prompt (str | UtteranceContext): The user's input prompt.
     - character_manager: The CharacterManager instance.
     - memory_manager: The MemoryManager instance.
     - config (dict): Configuration dictionary.
@@ -23,11 +25,13 @@ def build_prompt(user_prompt, character_manager, memory_manager, config, debug=F
     Returns:
     - str: The formatted prompt for the LLM backend.
     """
+    utterance = as_utterance(user_prompt)
+    user_prompt = utterance.text
     now = datetime.now()
     dtg = f"Current Date: {now.strftime('%m/%d/%Y')}\nCurrent Time: {now.strftime('%H:%M:%S')}\n"
     user_name = config['CHAR']['user_name']
     char_name = character_manager.char_name
-    functioncall = check_for_module(user_prompt)
+    functioncall = check_for_module(utterance)
 
     # Construct persona traits
     persona_traits = "\n".join(
@@ -49,7 +53,7 @@ def build_prompt(user_prompt, character_manager, memory_manager, config, debug=F
 
     # Dynamically append memory and examples
     final_prompt = append_memory_and_examples(
-        base_prompt, user_prompt, memory_manager, config, character_manager, functioncall
+        base_prompt, user_prompt, memory_manager, config, character_manager, functioncall, utterance
     )
 
     final_prompt = inject_dynamic_values(final_prompt, user_name, char_name)
@@ -78,7 +82,7 @@ def clean_text(text):
             .strip()
     )
 
-def append_memory_and_examples(base_prompt, user_prompt, memory_manager, config, character_manager, functioncall):
+def append_memory_and_examples(base_prompt, user_prompt, memory_manager, config, character_manager, functioncall, utterance=None):
     """
     Append short-term memory and example dialog to the prompt based on token availability.
 
@@ -89,12 +93,15 @@ def append_memory_and_examples(base_prompt, user_prompt, memory_manager, config,
     - config (dict): Configuration dictionary.
     - character_manager: The CharacterManager instance.
     - functioncall (str): The function determined by the input.
+    - utterance (UtteranceContext): Features of user_prompt already computed this turn.
 
     Returns:
     - str: The full prompt with memory and examples included.
     """
+    utterance = as_utterance(utterance or user_prompt)
+
     # Prepare memory and examples
-    past_memory = clean_text(memory_manager.get_longterm_memory(user_prompt))
+    past_memory = clean_text(memory_manager.get_longterm_memory(utterance))
     short_term_memory = ""
     example_dialog = ""
 
@@ -102,7 +109,7 @@ def append_memory_and_examples(base_prompt, user_prompt, memory_manager, config,
     base_prompt,
     f"### Memory:\n---\nLong-Term Context:\n{past_memory}\n---\n",
     f"### Interaction:\n{config['CHAR']['user_name']}: {user_prompt}\n\n",
-    f"### Function Calling Tool:\nResult: {functioncall}\n"
+    f"### Function Calling Tool:\nResult: \n"
     f"### Response:\n{character_manager.char_name}: "
     ])
 
@@ -114,6 +121,10 @@ def append_memory_and_examples(base_prompt, user_prompt, memory_manager, config,
 
     #queue_message(f"context_size {context_size}: base_length{base_length}: available_tokens: {available_tokens} ")
 
+    # The tool result and short-term memory share what is left; unused tool tokens go to memory
+    functioncall, tool_tokens = fit_tool_result(functioncall, utterance, available_tokens, memory_manager, config)
+    available_tokens = max(0, available_tokens - tool_tokens)
+
     # Add short-term memory first
     if available_tokens > 0:
         short_term_memory = memory_manager.get_shortterm_memories_tokenlimit(available_tokens)
@@ -138,6 +149,43 @@ def append_memory_and_examples(base_prompt, user_prompt, memory_manager, config,
         f"### Response:\n{character_manager.char_name}: "
     )
 
+def fit_tool_result(functioncall, utterance, available_tokens, memory_manager, config):
+    """
+    Compress a tool result to its share of the free context tokens.
+
+    Parameters:
+    - functioncall: The tool result returned by check_for_module.
+    - utterance (UtteranceContext): The user's utterance, used to rank the result's sentences.
+    - available_tokens (int): Context tokens left for the tool result and short-term memory.
+    - memory_manager: The MemoryManager instance (token counting and BM25 stemmer).
+    - config (dict): Configuration dictionary.
+
+    Returns:
+    - tuple: (result, tokens), the (possibly compressed) tool result and its token length.
+      Placeholders for turns without a tool are estimated instead of counted, since
+      counting is an HTTP request on some backends.
+    """
+    if isinstance(functioncall, tuple) and functioncall and isinstance(functioncall[0], str):
+        functioncall = functioncall[0]  # (content, links) results: the links are not used in the prompt
+    text = str(functioncall)
+    if text in ("None", "Not a Function") or not text.strip():
+        return text, estimate_tokens(text)
+    if not config['TOOLS']['compress_results']:
+        return text, memory_manager.token_count(text).get('length', 0)
+
+    try:
+        return compress_tool_output(
+            text,
+            utterance,
+            budget_tokens=int(available_tokens * config['TOOLS']['result_share']),
+            token_count=lambda t: memory_manager.token_count(t).get('length', 0),
+            stemmer=getattr(memory_manager.hyper_db, 'stemmer', None),
+            with_tokens=True,
+        )
+    except Exception as e:
+        queue_message(f"ERROR: Could not compress tool output: {e}")
+        return text, memory_manager.token_count(text).get('length', 0)
+
 def inject_dynamic_values(template, user_name, char_name):
     """
     Replace placeholders in a template with dynamic values.
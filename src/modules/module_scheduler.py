@@ -0,0 +1,150 @@
+"""
+module_scheduler.py
+
+Priority request scheduler for the TARS-AI LLM path.
+
+Voice turns from the robot, chat UI messages and Discord mentions all share the same
+LLM backend. The scheduler admits them through bounded per-source queues, serves the
+highest priority source first, and caps how many requests reach the backend at once.
+"""
+
+# === Standard Libraries ===
+import time
+import threading
+from collections import deque
+from concurrent.futures import Future
+
+from modules.module_messageQue import queue_message
+
+# === Constants ===
+# Lower number = served first
+PRIORITIES = {
+    "voice": 0,
+    "chatui": 1,
+    "discord": 2,
+}
+WAIT_WINDOW = 100  # Recent queue-time samples kept per source
+
+class SchedulerBusy(Exception):
+    """Raised when a source's queue is full and the request is rejected."""
+
+class RequestScheduler:
+    """
+    Runs submitted callables on a fixed number of workers in priority order.
+    """
+    def __init__(self, max_concurrent=1, queue_size=4, priorities=None):
+        """
+        Parameters:
+        - max_concurrent (int): Number of requests allowed to run against the backend at once.
+        - queue_size (int): Maximum number of waiting requests per source.
+        - priorities (dict): Source name -> priority, lower runs first.
+        """
+        self.priorities = priorities or PRIORITIES
+        self.queue_size = queue_size
+        self.queues = {source: deque() for source in self.priorities}
+        self.metrics = {source: self._new_metrics() for source in self.priorities}
+        self.condition = threading.Condition()
+        self.running = True
+        self.workers = [
+            threading.Thread(target=self._worker, name=f"LLMScheduler-{i}", daemon=True)
+            for i in range(max(1, int(max_concurrent)))
+        ]
+        for worker in self.workers:
+            worker.start()
+
+    @staticmethod
+    def _new_metrics():
+        return {"submitted": 0, "rejected": 0, "completed": 0, "failed": 0, "wait_times": deque(maxlen=WAIT_WINDOW)}
+
+    def submit(self, fn, *args, source="voice", **kwargs) -> Future:
+        """
+        Queue `fn(*args, **kwargs)` under the given source.
+
+        Returns:
+        - Future: Resolves with the callable's result.
+
+        Raises:
+        - SchedulerBusy: If the source's queue is already full.
+        """
+        if source not in self.queues:
+            raise ValueError(f"Unknown request source: {source}")
+
+        future = Future()
+        with self.condition:
+            metrics = self.metrics[source]
+            if len(self.queues[source]) >= self.queue_size:
+                metrics["rejected"] += 1
+                raise SchedulerBusy(f"{source} queue is full ({self.queue_size} waiting)")
+            metrics["submitted"] += 1
+            self.queues[source].append((future, fn, args, kwargs, time.monotonic()))
+            self.condition.notify()
+        return future
+
+    def _next_item(self):
+        """Pop the oldest request from the highest priority non-empty queue. Caller holds the lock."""
+        for source in sorted(self.queues, key=self.priorities.get):
+            if self.queues[source]:
+                return source, self.queues[source].popleft()
+        return None, None
+
+    def _worker(self):
+        while True:
+            with self.condition:
+                source, item = self._next_item()
+                while item is None and self.running:
+                    self.condition.wait()
+                    source, item = self._next_item()
+                if item is None:
+                    return
+                future, fn, args, kwargs, enqueued_at = item
+                self.metrics[source]["wait_times"].append(time.monotonic() - enqueued_at)
+
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                result = fn(*args, **kwargs)
+            except BaseException as e:
+                with self.condition:
+                    self.metrics[source]["failed"] += 1
+                future.set_exception(e)
+            else:
+                with self.condition:
+                    self.metrics[source]["completed"] += 1
+                future.set_result(result)
+
+    def get_metrics(self) -> dict:
+        """
+        Return per-source counters, current queue depth and queue-time statistics in seconds.
+        """
+        with self.condition:
+            snapshot = {}
+            for source, metrics in self.metrics.items():
+                waits = sorted(metrics["wait_times"])
+                snapshot[source] = {
+                    "queued": len(self.queues[source]),
+                    "submitted": metrics["submitted"],
+                    "rejected": metrics["rejected"],
+                    "completed": metrics["completed"],
+                    "failed": metrics["failed"],
+                    "avg_wait": round(sum(waits) / len(waits), 4) if waits else None,
+                    "p95_wait": round(waits[int(0.95 * (len(waits) - 1))], 4) if waits else None,
+                }
+        return snapshot
+
+    def shutdown(self):
+        """
+        Stop the workers once the queues are drained.
+        """
+        with self.condition:
+            self.running = False
+            self.condition.notify_all()
+        queue_message("INFO: LLM scheduler stopped.")
+
+def default_concurrency(llm_backend, configured):
+    """
+    Resolve the `max_concurrent` setting; `auto` means one request at a time for
+    self-hosted backends (ooba, tabby) and four for hosted APIs.
+    """
+    if str(configured).strip().lower() != "auto":
+        return max(1, int(configured))
+    return 1 if llm_backend in ["ooba", "tabby"] else 4
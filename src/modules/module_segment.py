@@ -0,0 +1,130 @@
+"""
+module_segment.py
+
+Sentence segmentation shared by the TTS backends and the tool output compressor.
+
+Provides:
+- Sentence splitting on . ! ? and line breaks that keeps abbreviations ("Dr. Smith") together.
+- Clause splitting on ; : , and dashes for sentences too long to speak in one go.
+- Speech chunking: a short first chunk so audio starts quickly, then chunks that grow
+  so synthesis of the next one finishes before the current one has been played.
+"""
+
+# === Standard Libraries ===
+import re
+
+# === Constants ===
+FIRST_CHUNK_CHARS = 60     # Above this the first sentence is cut at its first clause
+MIN_CLAUSE_WORDS = 3       # Shorter clauses are not spoken on their own
+MAX_CHUNK_CHARS = 300      # Upper bound for later chunks
+GROWTH = 2                 # Each chunk may be this many times longer than the previous one
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+(?=[\"'(\[]?[A-Z0-9])|\n+")
+_ABBREVIATION = re.compile(r"\b(?:Mr|Mrs|Ms|Dr|Prof|St|Mt|vs|etc|e\.g|i\.e|No|Jan|Feb|Mar|Apr|Jun|Jul|Aug|Sep|Sept|Oct|Nov|Dec)\.$")
+_CLAUSE_END = re.compile(r"(?<=[;:,])\s+|\s+(?:--|–|—)\s+")
+
+def split_sentences(text, min_chars=1):
+    """
+    Split text into sentences; line breaks also end a sentence.
+
+    Parameters:
+    - text (str): The text to split.
+    - min_chars (int): Sentences shorter than this are dropped.
+
+    Returns:
+    - list: The sentences, stripped.
+    """
+    sentences, pending = [], ""
+    for part in _SENTENCE_END.split(text):
+        part = f"{pending} {part}".strip() if pending else part.strip()
+        if _ABBREVIATION.search(part):
+            pending = part  # "Dr. Smith" is one sentence
+            continue
+        pending = ""
+        if len(part) >= min_chars:
+            sentences.append(part)
+    if len(pending) >= min_chars:
+        sentences.append(pending)
+    return sentences
+
+def split_clauses(sentence, max_chars):
+    """
+    Cut a sentence at clause boundaries into pieces of at most `max_chars` where possible.
+    Clauses shorter than MIN_CLAUSE_WORDS words are kept with their neighbour.
+    """
+    pieces, current = [], ""
+    for clause in _CLAUSE_END.split(sentence):
+        candidate = f"{current} {clause}".strip()
+        if current and len(candidate) > max_chars and len(current.split()) >= MIN_CLAUSE_WORDS:
+            pieces.append(current)
+            current = clause
+        else:
+            current = candidate
+    if current:
+        if pieces and len(current.split()) < MIN_CLAUSE_WORDS:
+            pieces[-1] = f"{pieces[-1]} {current}"
+        else:
+            pieces.append(current)
+    return pieces
+
+def first_clause(sentence):
+    """
+    Return (head, rest) where head is the first clause long enough to be spoken on its own,
+    or (sentence, "") when the sentence has no usable clause boundary.
+    """
+    for match in _CLAUSE_END.finditer(sentence):
+        head = sentence[:match.start()].strip()
+        if len(head.split()) >= MIN_CLAUSE_WORDS:
+            rest = sentence[match.end():].strip()
+            if len(rest.split()) >= MIN_CLAUSE_WORDS:
+                return head, rest
+            break
+    return sentence, ""
+
+def speech_chunks(text, first_chars=FIRST_CHUNK_CHARS, max_chars=MAX_CHUNK_CHARS):
+    """
+    Split a reply into chunks for synthesis.
+
+    The first chunk is the first sentence, or only its first clause when the sentence is
+    longer than `first_chars`, so the first audio is ready quickly. Each following chunk
+    joins whole sentences up to GROWTH times the length of the previous chunk (capped at
+    `max_chars`): it takes longer to play than the next one takes to synthesize, which
+    keeps the synthesis queue ahead of playback. Sentences over `max_chars` are cut at
+    clause boundaries.
+
+    Returns:
+    - list: The chunks, in order.
+    """
+    sentences = split_sentences(text)
+    if not sentences:
+        return []
+
+    chunks = []
+    head = sentences[0]
+    if len(head) > first_chars:
+        head, rest = first_clause(head)
+        if rest:
+            sentences[0] = rest
+        else:
+            sentences.pop(0)
+    else:
+        sentences.pop(0)
+    chunks.append(head)
+
+    current = ""
+    for sentence in sentences:
+        budget = min(max_chars, max(len(chunks[-1]) * GROWTH, first_chars))
+        candidate = f"{current} {sentence}".strip()
+        if len(candidate) <= budget:
+            current = candidate
+            continue
+        if current:
+            chunks.append(current)
+        if len(sentence) > max_chars:
+            pieces = split_clauses(sentence, max_chars)
+            chunks.extend(pieces[:-1])
+            sentence = pieces[-1]
+        current = sentence
+    if current:
+        chunks.append(current)
+    return chunks
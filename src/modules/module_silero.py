@@ -1,16 +1,20 @@
 """
 Enhanced Silero TTS with TARS Effects, Audio Normalization, and Better Playback
+
+The model is loaded in the background at startup (or on first use), inference runs with a
+bounded torch thread budget, sentences are grouped into larger model calls after the first one, and the
+float32 output goes straight into the numpy effects chain and on to playback as PCM.
 """
 
-import io
-import torch
-import re
 import os
-import wave
-from pydub import AudioSegment
-import numpy as np
+import asyncio
+import threading
+import torch
 
 from modules.module_messageQue import queue_message
+from modules.module_segment import speech_chunks
+from modules.module_dsp import TarsEffect
+from modules.module_audio import pcm_chunk
 
 # Set relative path for model storage
 model_dir = os.path.join(os.path.dirname(__file__), "..", "stt")  # Relative to script location
@@ -20,79 +24,110 @@ torch.hub.set_dir(model_dir)  # Set PyTorch hub directory
 from module_config import load_config
 CONFIG = load_config()
 
-# Load Silero model globally
 device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+sample_rate = 24000  # Set to Silero's recommended sample rate
+speaker = "en_2"  # Use a valid speaker ID
+MAX_BATCH_CHARS = 800  # Longest text per model call (the model accepts about 1000 characters)
+
+model = None
+_model_lock = threading.Lock()
+_synth_lock = threading.Lock()  # One inference at a time, so the thread budget can be swapped in and out
+tars_effect = TarsEffect(sample_rate)
+
+def optimize_model(loaded):
+    """
+    Freeze the TorchScript graph inside the Silero package model for faster inference
+    ([TTS] silero_optimize). Leaves the model unchanged if it cannot be optimized.
+    """
+    scripted = getattr(loaded, "model", None)
+    if not isinstance(scripted, torch.jit.ScriptModule):
+        queue_message("WARNING: Silero model has no TorchScript module to optimize.")
+        return loaded
+    try:
+        loaded.model = torch.jit.optimize_for_inference(torch.jit.freeze(scripted.eval()))
+        queue_message("LOAD: Silero TorchScript graph frozen for inference.")
+    except Exception as e:
+        queue_message(f"WARNING: Could not optimize the Silero model: {e}")
+    return loaded
+
+def get_model():
+    """
+    Return the Silero model, loading it on first use.
+    """
+    global model
+    with _model_lock:
+        if model is None:
+            loaded, _ = torch.hub.load(
+                repo_or_dir="snakers4/silero-models",
+                model="silero_tts",
+                language="en",
+                speaker="v3_en"  # Model version, not speaker ID
+            )
+            loaded.to(device)
+            if CONFIG['TTS']['silero_optimize']:
+                loaded = optimize_model(loaded)
+            model = loaded
+            queue_message(f"LOAD: Silero TTS ready on {device}.")
+        return model
+
+def preload_model():
+    """
+    Load the model in a background thread so startup is not blocked.
+    """
+    threading.Thread(target=get_model, name="SileroLoad", daemon=True).start()
 
 if CONFIG['TTS']['ttsoption'] == 'silero':
-    model, example_texts = torch.hub.load(
-        repo_or_dir="snakers4/silero-models",
-        model="silero_tts",
-        language="en",
-        speaker="v3_en"  # Model version, not speaker ID
-    )
-    model.to(device)
-    sample_rate = 24000  # Set to Silero's recommended sample rate
-    speaker = "en_2"  # Use a valid speaker ID
+    preload_model()
 
 def apply_tars_effects(audio):
     """
     Apply TARS-like effects: pitch change, speed up, reverb, and echo.
+
+    Takes float32 or int16 samples and returns int16 samples (see module_dsp).
     """
-    lower_rate = int(sample_rate * 0.88)
-    audio = audio._spawn(audio.raw_data, overrides={"frame_rate": lower_rate})
-    audio = audio.set_frame_rate(sample_rate)
-    audio = audio.speedup(playback_speed=1.42)
-    # Apply echo and reverb
-    reverb_decay = -2
-    delay_ms = 3
-    echo1 = audio - reverb_decay
-    echo2 = echo1 - 1
-    audio = audio.overlay(echo1, position=delay_ms)
-    audio = audio.overlay(echo2, position=delay_ms * 2)  # Fixed the delay overlap
-    return audio
+    return tars_effect.apply(audio)
+
+def render(text):
+    """
+    Synthesize a chunk of text with TARS effects and return int16 samples.
+    """
+    silero = get_model()
+    threads = CONFIG['TTS']['silero_threads']
+    with _synth_lock, torch.inference_mode():
+        # The torch thread count is process-wide: cap it for this call only and restore it,
+        # so the embedding model keeps its own thread count
+        previous = torch.get_num_threads()
+        if threads > 0:
+            torch.set_num_threads(threads)
+        try:
+            audio_tensor = silero.apply_tts(text=text, speaker=speaker, sample_rate=sample_rate)
+        finally:
+            if threads > 0:
+                torch.set_num_threads(previous)
+        # Float32 samples go straight into the effects chain (16-bit PCM out)
+        return apply_tars_effects(audio_tensor.cpu().numpy())
 
 async def synthesize_silero(text):
     """
-    Synthesize a chunk of text into a BytesIO buffer using Silero TTS with TARS effects.
+    Synthesize a chunk of text into a PCMChunk using Silero TTS with TARS effects.
     """
-    with torch.no_grad():
-        audio_tensor = model.apply_tts(text=text, speaker=speaker, sample_rate=sample_rate)
-
-    # Convert tensor to NumPy
-    audio_np = audio_tensor.numpy()  # Convert tensor to numpy
-    audio_int16 = (audio_np * 32767).astype("int16")  # Convert to 16-bit PCM
-
-    # Convert NumPy audio to Pydub AudioSegment
-    audio = AudioSegment(
-        audio_int16.tobytes(),
-        frame_rate=sample_rate,
-        sample_width=2,  # 16-bit PCM = 2 bytes per sample
-        channels=1  # Mono
-    )
-
-    # Apply TARS-like effects
-    audio = apply_tars_effects(audio)
-
-    # Convert Pydub AudioSegment back to BytesIO WAV buffer
-    wav_buffer = io.BytesIO()
-    with wave.open(wav_buffer, 'wb') as wav_file:
-        wav_file.setnchannels(1)  # Mono
-        wav_file.setsampwidth(2)  # 16-bit samples
-        wav_file.setframerate(sample_rate)
-        wav_file.writeframes(audio.raw_data)
-
-    wav_buffer.seek(0)
-    return wav_buffer  # Return the BytesIO object
+    return pcm_chunk(await asyncio.to_thread(render, text), sample_rate)
 
 async def text_to_speech_with_pipelining_silero(text):
     """
     Converts text to speech using Silero TTS, applies TARS effects, and streams audio as it's generated.
+
+    After a short first chunk, sentences are batched into model calls of up to
+    MAX_BATCH_CHARS characters, which costs less per sentence than one call each.
     """
     # Split text into smaller chunks
-    chunks = re.split(r'(?<=\.)\s', text)  # Split at sentence boundaries
+    chunks = speech_chunks(text, max_chars=MAX_BATCH_CHARS)  # Short first clause, then sentence batches
 
     # Yield each audio chunk as soon as it's ready
     for chunk in chunks:
         if chunk.strip():  # Ignore empty chunks
-            wav_buffer = await synthesize_silero(chunk.strip())
-            yield wav_buffer  # Return the chunk for external playback
\ No newline at end of file
+            try:
+                yield await synthesize_silero(chunk.strip())  # Return the chunk for external playback
+            except Exception as e:
+                queue_message(f"ERROR: Silero TTS synthesis failed: {e}")
+                yield None  # Marks the chunk as failed
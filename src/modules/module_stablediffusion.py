@@ -11,6 +11,7 @@ import threading
 from io import BytesIO
 
 from modules.module_config import load_config
+from modules.module_http import http_get, http_post
 from modules.module_messageQue import queue_message
 
 # Load configuration
@@ -53,7 +54,7 @@ def get_image_from_dalle_v3(prompt):
         image_url = response.data[0].url
 
         # Fetch the image data from the URL
-        image_response = requests.get(image_url)
+        image_response = http_get(image_url, timeout=60)
         image_response.raise_for_status()
 
         # Decode the image data into a PIL image
@@ -97,7 +98,7 @@ def get_image_from_automatic1111(sdpromptllm):
 
     try:
         # Making a POST request to the API with the payload
-        response = requests.post(url, json=payload)
+        response = http_post(url, json=payload, timeout=300)
         response.raise_for_status()
 
         # Assuming the response returns a JSON with an 'images' key containing base64 encoded images
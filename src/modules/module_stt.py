@@ -35,9 +35,11 @@ from openai import OpenAI
 import requests
 
 from modules.module_messageQue import queue_message
+from modules.module_http import http_get, http_post, CHATUI_URL
 from modules.module_config import load_config
 from modules.module_main import ui_manager
 from modules.module_atomik import WakeWordSystem
+from modules.module_audio import get_audio_output
 
 CONFIG = load_config()
 
@@ -176,7 +178,7 @@ class STTManager:
         dest_path = os.path.join(dest_folder, file_name)
 
         queue_message(f"INFO: Downloading Vosk model from {url}...")
-        response = requests.get(url, stream=True)
+        response = http_get(url, stream=True, timeout=60)
         response.raise_for_status()
 
         total_size = int(response.headers.get('content-length', 0))
@@ -630,7 +632,7 @@ class STTManager:
                 return None
 
             files = {"audio": ("audio.wav", audio_buffer, "audio/wav")}
-            response = requests.post(
+            response = http_post(
                 f"{self.config['STT'].get('external_url')}/save_audio",
                 files=files, timeout=10
             )
@@ -692,7 +694,7 @@ class STTManager:
             return False
 
         try:
-            requests.get("http://127.0.0.1:5012/stop_talking", timeout=1)
+            http_get(f"{CHATUI_URL}/stop_talking", timeout=1, retries=0)
         except Exception:
             pass
 
@@ -740,7 +742,7 @@ class STTManager:
                     if self.config["STT"].get("use_indicators"):
                         self.play_beep(1200, 0.1, 44100, 0.8)
                     try:
-                        requests.get("http://127.0.0.1:5012/start_talking", timeout=1)
+                        http_get(f"{CHATUI_URL}/start_talking", timeout=1, retries=0)
                     except Exception:
                         pass
                     wake_response = random.choice(self.WAKE_WORD_RESPONSES)
@@ -761,7 +763,7 @@ class STTManager:
         """
         # Notify external service to stop talking.
         try:
-            requests.get("http://127.0.0.1:5012/stop_talking", timeout=1)
+            http_get(f"{CHATUI_URL}/stop_talking", timeout=1, retries=0)
         except Exception:
             pass
 
@@ -785,7 +787,7 @@ class STTManager:
                     try:
                         if self.config["STT"].get("use_indicators"):
                             self.play_beep(1200, 0.1, 44100, 0.8)
-                        requests.get("http://127.0.0.1:5012/start_talking", timeout=1)
+                        http_get(f"{CHATUI_URL}/start_talking", timeout=1, retries=0)
                     except Exception:
                         pass
 
@@ -821,7 +823,7 @@ class STTManager:
             if self.config["STT"].get("use_indicators"):
                 self.play_beep(1200, 0.1, 44100, 0.8)
                 try:
-                    requests.get("http://127.0.0.1:5012/start_talking", timeout=1)
+                    http_get(f"{CHATUI_URL}/start_talking", timeout=1, retries=0)
                 except Exception:
                     pass
                 wake_response = random.choice(self.WAKE_WORD_RESPONSES)
@@ -1068,11 +1070,13 @@ class STTManager:
     def play_beep(self, frequency: int, duration: float, sample_rate: int, volume: float):
         """
         Play a beep sound to indicate state changes.
+
+        The beep is mixed over any speech still playing (which is ducked meanwhile)
+        and returns once it has been heard.
         """
         t = np.linspace(0, duration, int(sample_rate * duration), endpoint=False)
-        sine_wave = volume * np.sin(2 * np.pi * frequency * t)
-        sd.play(sine_wave, samplerate=sample_rate, device=1)
-        sd.wait()
+        sine_wave = (volume * np.sin(2 * np.pi * frequency * t)).astype(np.float32)
+        get_audio_output().play_cue(sine_wave, sample_rate).wait(duration + 1.0)
 
     # === Callback Setters ===
 
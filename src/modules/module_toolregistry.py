@@ -0,0 +1,241 @@
+"""
+module_toolregistry.py
+
+Lazy, plugin-style tool registry for the TARS-AI application.
+
+Tools are registered as entry points ("package.module:function") instead of imported
+functions, so a tool's module (and whatever it starts, such as a headless browser) is only
+loaded on first use or by an optional background warm-up. Modules can expose init and
+shutdown hooks; modules that have been idle for a while are shut down and loaded again
+on their next call.
+"""
+
+# === Standard Libraries ===
+import time
+import importlib
+import threading
+from collections.abc import Mapping
+
+from modules.module_messageQue import queue_message
+
+# === Constants ===
+REAPER_INTERVAL = 30  # Seconds between idle checks
+
+class ToolModule:
+    """
+    A module providing one or more tools, with optional init/shutdown hooks.
+    """
+    def __init__(self, path, init=None, shutdown=None, idle_unload=None):
+        """
+        Parameters:
+        - path (str): Import path, e.g. "modules.module_websearch".
+        - init (str): Name of a function in the module called once after import (and after each unload).
+        - shutdown (str): Name of a function in the module that releases its resources.
+        - idle_unload (float): Seconds without calls after which shutdown is called, None to keep it loaded.
+        """
+        self.path = path
+        self.init = init
+        self.shutdown = shutdown
+        self.idle_unload = idle_unload
+        self.module = None
+        self.initialized = False
+        self.active = 0
+        self.last_used = 0.0
+        self.lock = threading.RLock()
+
+    def load(self):
+        """Import the module and run its init hook if needed."""
+        with self.lock:
+            if self.module is None:
+                started = time.monotonic()
+                self.module = importlib.import_module(self.path)
+                queue_message(f"LOAD: Tool module {self.path} loaded in {time.monotonic() - started:.2f}s")
+            if not self.initialized:
+                if self.init:
+                    getattr(self.module, self.init)()
+                self.initialized = True
+            return self.module
+
+    def unload(self):
+        """Run the shutdown hook; the next call initializes the module again."""
+        with self.lock:
+            if not self.initialized or self.active:
+                return False
+            if self.shutdown and self.module is not None:
+                try:
+                    getattr(self.module, self.shutdown)()
+                except Exception as e:
+                    queue_message(f"ERROR: Shutdown of tool module {self.path} failed: {e}")
+            self.initialized = False
+            return True
+
+class LazyTool:
+    """
+    A callable tool entry that resolves its function on first call.
+    """
+    def __init__(self, name, target, module=None, func=None):
+        """
+        Parameters:
+        - name (str): Tool name.
+        - target (str): Entry point as "module:function", used for display and fingerprints.
+        - module (ToolModule): Module that provides the function (None for plain callables).
+        - func (callable): Already loaded function, for tools defined in module_engine itself.
+        """
+        self.name = name
+        self.target = target
+        self.module = module
+        self.func = func
+
+    def resolve(self):
+        """Return the tool function, loading and initializing its module if necessary."""
+        if self.module is None:
+            return self.func
+        return getattr(self.module.load(), self.target.split(":", 1)[1])
+
+    def __call__(self, *args, **kwargs):
+        module = self.module
+        if module is not None:
+            with module.lock:
+                module.active += 1
+                module.last_used = time.monotonic()
+        try:
+            func = self.resolve()
+            # Tools that take no arguments are called without the user input
+            if func.__code__.co_argcount == 0:
+                return func()
+            return func(*args, **kwargs)
+        finally:
+            if module is not None:
+                with module.lock:
+                    module.active -= 1
+                    module.last_used = time.monotonic()
+
+    def __repr__(self):
+        return f"<tool {self.target.split(':')[-1]}>"
+
+class ToolRegistry(Mapping):
+    """
+    Read-only mapping of tool name -> LazyTool, with registration, warm-up and idle unloading.
+    """
+    def __init__(self):
+        self.tools = {}
+        self.modules = {}
+        self.listeners = []
+        self.lock = threading.Lock()
+        self.reaper = None
+
+    # === Mapping interface (used like the former FUNCTION_REGISTRY dict) ===
+    def __getitem__(self, name):
+        return self.tools[name]
+
+    def __iter__(self):
+        return iter(self.tools)
+
+    def __len__(self):
+        return len(self.tools)
+
+    def __repr__(self):
+        return repr(self.tools)
+
+    # === Registration ===
+    def register_module(self, path, init=None, shutdown=None, idle_unload=None):
+        """
+        Declare hooks for a tool module. Modules registered implicitly by `register` have none.
+        """
+        with self.lock:
+            self.modules[path] = ToolModule(path, init, shutdown, idle_unload)
+        return self.modules[path]
+
+    def register(self, name, target):
+        """
+        Register a tool.
+
+        Parameters:
+        - name (str): Tool name used by the intent router.
+        - target (str | callable): "package.module:function" entry point, or a loaded function.
+        """
+        if callable(target):
+            tool = LazyTool(name, f"{target.__module__}:{target.__qualname__}", func=target)
+        else:
+            path = target.split(":", 1)[0]
+            with self.lock:
+                module = self.modules.get(path) or ToolModule(path)
+                self.modules[path] = module
+            tool = LazyTool(name, target, module=module)
+        with self.lock:
+            self.tools[name] = tool
+        self._notify()
+        return tool
+
+    def unregister(self, name):
+        with self.lock:
+            self.tools.pop(name, None)
+        self._notify()
+
+    def add_listener(self, callback):
+        """Call `callback()` whenever tools are registered or removed."""
+        self.listeners.append(callback)
+
+    def _notify(self):
+        for callback in list(self.listeners):
+            try:
+                callback()
+            except Exception as e:
+                queue_message(f"ERROR: Tool registry listener failed: {e}")
+
+    # === Lifecycle ===
+    def warm_up(self, names):
+        """
+        Load the modules of the given tools in a background thread.
+        """
+        modules = {self.tools[name].module for name in names if name in self.tools and self.tools[name].module}
+
+        def load_all():
+            for module in modules:
+                try:
+                    module.load()
+                except Exception as e:
+                    queue_message(f"ERROR: Warm-up of tool module {module.path} failed: {e}")
+
+        if modules:
+            threading.Thread(target=load_all, name="ToolWarmUp", daemon=True).start()
+
+    def start_reaper(self):
+        """
+        Start the background thread that shuts down idle tool modules.
+        """
+        if self.reaper is None:
+            self.reaper = threading.Thread(target=self._reap, name="ToolReaper", daemon=True)
+            self.reaper.start()
+
+    def _reap(self):
+        while True:
+            time.sleep(REAPER_INTERVAL)
+            now = time.monotonic()
+            for module in list(self.modules.values()):
+                if module.idle_unload and module.initialized and not module.active \
+                        and now - module.last_used > module.idle_unload:
+                    if module.unload():
+                        queue_message(f"INFO: Tool module {module.path} unloaded after being idle.")
+
+    def shutdown(self):
+        """
+        Run the shutdown hook of every initialized module.
+        """
+        for module in list(self.modules.values()):
+            module.unload()
+
+    def get_status(self) -> dict:
+        """
+        Return load state and idle time per tool module.
+        """
+        now = time.monotonic()
+        return {
+            path: {
+                "loaded": module.module is not None,
+                "initialized": module.initialized,
+                "active": module.active,
+                "idle_seconds": round(now - module.last_used, 1) if module.last_used else None,
+            }
+            for path, module in self.modules.items()
+        }
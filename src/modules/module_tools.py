@@ -0,0 +1,234 @@
+"""
+module_tools.py
+
+Tool execution runtime for the TARS-AI application.
+
+Provides:
+- A worker pool for tool calls (web search, vision, image generation, Home Assistant...),
+  so a slow tool cannot stall prompt construction indefinitely.
+- Per-tool deadlines: when one passes, the prompt gets a "tool timed out" result.
+- Cooperative cancellation: tools can poll `is_cancelled()` and stop early.
+- A per-tool TTL result cache keyed on the normalized query.
+- Per-tool latency, timeout, error and cache statistics.
+"""
+
+# === Standard Libraries ===
+import re
+import time
+import threading
+import concurrent.futures
+from collections import OrderedDict, deque
+
+from modules.module_messageQue import queue_message
+
+# === Constants ===
+STATS_WINDOW = 100   # Recent latency samples kept per tool
+CACHE_SIZE = 64      # Cached results kept per tool
+
+# Tools that drive the same device or browser must not run at the same time
+TOOL_GROUPS = {
+    "Weather": "browser",
+    "News": "browser",
+    "Search": "browser",
+    "Vision": "camera",
+}
+
+_local = threading.local()
+
+def is_cancelled():
+    """
+    Return True if the tool call running on this thread has been cancelled or timed out.
+    """
+    event = getattr(_local, "cancel_event", None)
+    return event is not None and event.is_set()
+
+def parse_tool_settings(spec, cast=float):
+    """
+    Parse a comma separated `Tool:value` list from config.ini, e.g. "Vision:30, Move:15".
+    """
+    settings = {}
+    for item in (spec or "").split(","):
+        name, _, value = item.partition(":")
+        if name.strip() and value.strip():
+            settings[name.strip()] = cast(value.strip())
+    return settings
+
+def normalize_query(query):
+    return re.sub(r"\s+", " ", str(query)).strip().lower()
+
+class ToolRuntime:
+    """
+    Runs tool functions on a worker pool with deadlines, caching and statistics.
+    """
+    def __init__(self, max_workers=4, default_timeout=20.0, timeouts=None, cache_ttls=None):
+        """
+        Parameters:
+        - max_workers (int): Tool calls that may run at once.
+        - default_timeout (float): Deadline in seconds for tools without their own.
+        - timeouts (dict): Tool name -> deadline in seconds.
+        - cache_ttls (dict): Tool name -> seconds a result stays cached; tools not listed are not cached.
+        """
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ToolRuntime")
+        self.default_timeout = default_timeout
+        self.timeouts = timeouts or {}
+        self.cache_ttls = cache_ttls or {}
+        self.caches = {}
+        self.stats = {}
+        self.group_locks = {group: threading.Lock() for group in set(TOOL_GROUPS.values())}
+        self.running = {}
+        self.lock = threading.Lock()
+
+    def _tool_stats(self, name):
+        return self.stats.setdefault(name, {
+            "calls": 0, "cache_hits": 0, "timeouts": 0, "errors": 0, "cancelled": 0,
+            "latencies": deque(maxlen=STATS_WINDOW),
+        })
+
+    # === Cache ===
+    def _cache_get(self, name, key):
+        ttl = self.cache_ttls.get(name)
+        if not ttl:
+            return None
+        with self.lock:
+            cache = self.caches.get(name)
+            if not cache or key not in cache:
+                return None
+            value, stored_at = cache[key]
+            if time.monotonic() - stored_at > ttl:
+                del cache[key]
+                return None
+            cache.move_to_end(key)
+            return value
+
+    def _cache_put(self, name, key, value):
+        if not self.cache_ttls.get(name):
+            return
+        with self.lock:
+            cache = self.caches.setdefault(name, OrderedDict())
+            cache[key] = (value, time.monotonic())
+            cache.move_to_end(key)
+            while len(cache) > CACHE_SIZE:
+                cache.popitem(last=False)
+
+    def clear_cache(self, name=None):
+        """
+        Drop cached results for one tool, or for all tools.
+        """
+        with self.lock:
+            if name is None:
+                self.caches.clear()
+            else:
+                self.caches.pop(name, None)
+
+    # === Execution ===
+    def _invoke(self, name, func, args, kwargs, cancel_event):
+        _local.cancel_event = cancel_event
+        try:
+            if cancel_event.is_set():
+                return None
+            group = TOOL_GROUPS.get(name)
+            if group:
+                with self.group_locks[group]:
+                    return func(*args, **kwargs)
+            return func(*args, **kwargs)
+        finally:
+            _local.cancel_event = None
+
+    def run(self, name, func, *args, query=None, **kwargs):
+        """
+        Run a tool and wait for its result until the tool's deadline.
+
+        Parameters:
+        - name (str): Tool name (FUNCTION_REGISTRY key).
+        - func (callable): The tool function.
+        - *args, **kwargs: Passed to the tool.
+        - query (str): Cache key source, normally the user's utterance.
+
+        Returns:
+        - The tool result, or a "tool timed out" message if the deadline passed.
+        """
+        key = normalize_query(query) if query is not None else None
+        with self.lock:
+            stats = self._tool_stats(name)
+            stats["calls"] += 1
+
+        if key is not None:
+            cached = self._cache_get(name, key)
+            if cached is not None:
+                with self.lock:
+                    stats["cache_hits"] += 1
+                return cached
+
+        timeout = self.timeouts.get(name, self.default_timeout)
+        cancel_event = threading.Event()
+        wake = threading.Event()  # Set when the call finishes or is cancelled
+        started = time.monotonic()
+        future = self.executor.submit(self._invoke, name, func, args, kwargs, cancel_event)
+        future.add_done_callback(lambda _: wake.set())
+        with self.lock:
+            self.running[future] = (cancel_event, wake)
+
+        try:
+            finished = wake.wait(timeout)
+        finally:
+            with self.lock:
+                self.running.pop(future, None)
+
+        if not finished:
+            cancel_event.set()
+            future.cancel()
+            with self.lock:
+                stats["timeouts"] += 1
+            queue_message(f"WARNING: Tool {name} timed out after {timeout:g}s")
+            return f"The {name} tool timed out after {timeout:g} seconds and returned no result."
+
+        if cancel_event.is_set():
+            with self.lock:
+                stats["cancelled"] += 1
+            return f"The {name} tool was cancelled."
+
+        try:
+            result = future.result()
+        except Exception:
+            with self.lock:
+                stats["errors"] += 1
+            raise
+
+        with self.lock:
+            stats["latencies"].append(time.monotonic() - started)
+        if key is not None and result:
+            self._cache_put(name, key, result)
+        return result
+
+    def cancel_all(self):
+        """
+        Cancel every queued or running tool call. Running tools stop at their next
+        `is_cancelled()` check; their callers return immediately with a cancelled result.
+        """
+        with self.lock:
+            running = list(self.running.items())
+        for future, (cancel_event, wake) in running:
+            cancel_event.set()
+            future.cancel()
+            wake.set()
+        return len(running)
+
+    def get_stats(self) -> dict:
+        """
+        Return per-tool call, cache, timeout and error counters with latency statistics in seconds.
+        """
+        with self.lock:
+            snapshot = {}
+            for name, stats in self.stats.items():
+                latencies = sorted(stats["latencies"])
+                snapshot[name] = {key: value for key, value in stats.items() if key != "latencies"}
+                snapshot[name]["avg_latency"] = round(sum(latencies) / len(latencies), 4) if latencies else None
+                snapshot[name]["p95_latency"] = round(latencies[int(0.95 * (len(latencies) - 1))], 4) if latencies else None
+        return snapshot
+
+    def shutdown(self):
+        """
+        Cancel outstanding calls and stop the worker pool.
+        """
+        self.cancel_all()
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -8,6 +8,8 @@ Handles TTS functionality to convert text into audio using:
 - Local tools (e.g., espeak-ng)
 - Server-based TTS systems
 
+Fixed phrases (wake word responses, acknowledgements) are served from a phrase cache
+shared by all backends.
 """
 
 # === Standard Libraries ===
@@ -15,19 +17,44 @@ import requests
 import os 
 from datetime import datetime
 import numpy as np
-import sounddevice as sd
 import soundfile as sf
 from io import BytesIO
 import asyncio
+import threading
+import queue
 
 from modules.module_piper import text_to_speech_with_pipelining_piper
 from modules.module_silero import text_to_speech_with_pipelining_silero
 from modules.module_espeak import text_to_speech_with_pipelining_espeak
 from modules.module_alltalk import text_to_speech_with_pipelining_alltalk
 from modules.module_elevenlabs import text_to_speech_with_pipelining_elevenlabs
-from modules.module_azure import text_to_speech_with_pipelining_azure
+from modules.module_azure import text_to_speech_with_pipelining_azure, prewarm_azure
 from modules.module_openai import text_to_speech_with_pipelining_openai
 from modules.module_messageQue import queue_message
+from modules.module_http import http_get, http_post, CHATUI_URL
+from modules.module_config import load_config
+from modules.module_phrasecache import PhraseCache, phrase_key
+from modules.module_audio import get_audio_output, PCMChunk, pcm_to_wav
+from modules.module_dsp import TARS_EFFECTS_VERSION
+
+# === Constants and Globals ===
+CONFIG = load_config()
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))  # Move up to "src"
+PROCESSING_PHRASE = "processing, processing, processing"
+_END_OF_AUDIO = object()  # Marks the end of a reply in the playback queue
+
+# Effects chain each backend applies to its output; change the value when an effect changes
+# so phrases rendered with the old chain are not reused
+BACKEND_EFFECTS = {
+    "silero": TARS_EFFECTS_VERSION,
+    "espeak": TARS_EFFECTS_VERSION,
+}
+
+phrase_cache = PhraseCache(
+    os.path.join(BASE_DIR, 'tts', 'phrase_cache'),
+    max_bytes=CONFIG['TTS']['phrase_cache_mb'] * 1024 * 1024,
+) if CONFIG['TTS']['phrase_cache_mb'] > 0 else None
+_known_phrases = set()
 
 def update_tts_settings(ttsurl):
     """
@@ -54,7 +81,7 @@ def update_tts_settings(ttsurl):
     }
 
     try:
-        response = requests.post(url, headers=headers, json=payload)
+        response = http_post(url, headers=headers, json=payload, timeout=10)
         if response.status_code == 200:
             queue_message(f"LOAD: TTS Settings updated successfully.")
         else:
@@ -65,7 +92,7 @@ def update_tts_settings(ttsurl):
 
 def play_audio_stream(tts_stream, samplerate=22050, channels=1, gain=1.0, normalize=False):
     """
-    Play the audio stream through speakers using SoundDevice with volume/gain adjustment.
+    Play the audio stream through the shared output stream with volume/gain adjustment.
     
     Parameters:
     - tts_stream: Stream of audio data in chunks.
@@ -75,29 +102,125 @@ def play_audio_stream(tts_stream, samplerate=22050, channels=1, gain=1.0, normal
     - normalize: Whether to normalize the audio to use the full dynamic range.
     """
     try:
-        with sd.OutputStream(samplerate=samplerate, channels=channels, dtype='int16', blocksize=4096) as stream:
-            for chunk in tts_stream:
-                if chunk:
-                    # Convert bytes to int16 using numpy
-                    audio_data = np.frombuffer(chunk, dtype='int16')
-                    
-                    # Normalize the audio (if enabled)
-                    if normalize:
-                        max_value = np.max(np.abs(audio_data))
-                        if max_value > 0:
-                            audio_data = audio_data / max_value * 32767
-                    
-                    # Apply gain adjustment
-                    audio_data = np.clip(audio_data * gain, -32768, 32767).astype('int16')
-
-                    # Write the adjusted audio data to the stream
-                    stream.write(audio_data)
-                else:
-                    queue_message(f"ERROR: Received empty chunk.")
+        output = get_audio_output()
+        handle = None
+        for chunk in tts_stream:
+            if chunk:
+                # Convert bytes to int16 using numpy
+                audio_data = np.frombuffer(chunk, dtype='int16')
+                
+                # Normalize the audio (if enabled)
+                if normalize:
+                    max_value = np.max(np.abs(audio_data))
+                    if max_value > 0:
+                        audio_data = audio_data / max_value * 32767
+                
+                # Apply gain adjustment
+                audio_data = np.clip(audio_data * gain, -32768, 32767).astype('int16')
+
+                # Queue the adjusted audio data behind the previous chunk
+                handle = output.play(audio_data.reshape(-1, channels), samplerate)
+            else:
+                queue_message(f"ERROR: Received empty chunk.")
+        if handle is not None:
+            handle.wait()
     except Exception as e:
         queue_message(f"ERROR: Error during audio playback: {e}")
 
 
+# === Phrase Cache ===
+def voice_signature(ttsoption):
+    """
+    Return the (voice, effects) pair that, with the backend and text, identifies rendered audio.
+    """
+    tts = CONFIG['TTS']
+    character_name = os.path.splitext(os.path.basename(CONFIG['CHAR']['character_card_path']))[0]
+    voices = {
+        "azure": tts['tts_voice'],
+        "alltalk": tts['tts_voice'],
+        "elevenlabs": f"{tts['voice_id']}/{tts['model_id']}",
+        "openai": tts['openai_voice'],
+        "piper": character_name,
+        "silero": "v3_en/en_2",
+        "espeak": "en-us+m3",
+    }
+    return voices.get(ttsoption), BACKEND_EFFECTS.get(ttsoption, "none")
+
+def _phrase_key(text, ttsoption):
+    voice, effects = voice_signature(ttsoption)
+    return phrase_key(ttsoption, voice, effects, text)
+
+def register_phrases(phrases):
+    """
+    Mark texts as fixed phrases: their audio is cached whenever they are spoken.
+    """
+    _known_phrases.update(" ".join(phrase.split()) for phrase in phrases)
+
+def is_cached_phrase(text):
+    return " ".join(text.split()) in _known_phrases
+
+def prerender_phrases(phrases, ttsoption=None):
+    """
+    Synthesize fixed phrases that are not cached yet in a background thread.
+
+    Parameters:
+    - phrases (list): Texts to render, e.g. the wake word responses.
+    - ttsoption (str): Backend to render with (the configured one by default).
+    """
+    register_phrases(phrases)
+    ttsoption = ttsoption or CONFIG['TTS']['ttsoption']
+    if phrase_cache is None:
+        return None
+    missing = [phrase for phrase in dict.fromkeys(phrases) if _phrase_key(phrase, ttsoption) not in phrase_cache]
+    if not missing:
+        return None
+
+    async def render_all():
+        for phrase in missing:
+            async for _ in generate_tts_audio(phrase, ttsoption, is_wakeword=True):
+                pass
+
+    def run():
+        asyncio.run(render_all())
+        queue_message(f"LOAD: Pre-rendered {len(missing)} phrase(s) for {ttsoption}.")
+
+    thread = threading.Thread(target=run, name="PhrasePrerender", daemon=True)
+    thread.start()
+    return thread
+
+def play_phrase(text):
+    """
+    Speak a fixed phrase in the background (from the phrase cache once rendered).
+
+    The phrase is queued on the shared output stream ahead of the reply and sends no
+    start/stop talking pings: the reply's play_audio_chunks owns the talk state.
+    """
+    register_phrases([text])
+    ttsoption = CONFIG['TTS']['ttsoption']
+
+    async def queue_phrase():
+        output = get_audio_output()
+        async for audio_chunk in generate_tts_audio(text, ttsoption, is_wakeword=True):
+            decoded = _decode_chunk(audio_chunk)
+            if decoded is not None:
+                await asyncio.to_thread(output.play, *decoded)
+
+    threading.Thread(target=lambda: asyncio.run(queue_phrase()), name="PhrasePlayback", daemon=True).start()
+
+def prewarm_tts(ttsoption=None):
+    """
+    Open the backend's connection ahead of a reply (called when the wake word fires).
+    """
+    ttsoption = ttsoption or CONFIG['TTS']['ttsoption']
+    if ttsoption == "azure":
+        prewarm_azure()
+
+def get_phrase_cache_stats():
+    """
+    Return hit/miss/eviction counters and the size of the phrase cache.
+    """
+    return phrase_cache.get_stats() if phrase_cache is not None else {}
+
 async def generate_tts_audio(text, ttsoption, is_wakeword=False, azure_api_key=None, azure_region=None, ttsurl=None, toggle_charvoice=True, tts_voice=None):
     """
     Generate TTS audio for the given text using the specified TTS system.
@@ -108,7 +231,34 @@ async def generate_tts_audio(text, ttsoption, is_wakeword=False, azure_api_key=N
     - ttsurl (str): The base URL of the TTS server (for server-based TTS).
     - toggle_charvoice (bool): Flag indicating whether to use character voice for TTS.
     - tts_voice (str): The TTS speaker/voice configuration.
-    - is_wakeword (bool): use to store the cache in order to save tokens / speed up things
+    - is_wakeword (bool): Fixed phrase; served from and stored in the phrase cache.
+    """
+    cacheable = phrase_cache is not None and (is_wakeword or is_cached_phrase(text))
+    if cacheable:
+        key = _phrase_key(text, ttsoption)
+        chunks = phrase_cache.get(key)
+        if chunks:
+            for chunk in chunks:
+                yield BytesIO(chunk)
+            return
+
+    rendered, failed = [], False
+    async for chunk in _synthesize(text, ttsoption):
+        if chunk is None:
+            failed = True  # A sentence failed or was cut short: do not cache the phrase
+            continue
+        if cacheable:
+            rendered.append(pcm_to_wav(chunk) if isinstance(chunk, PCMChunk) else chunk.getvalue())
+        yield chunk
+    if cacheable and rendered and not failed:
+        phrase_cache.put(key, rendered)
+
+async def _synthesize(text, ttsoption):
+    """
+    Dispatch synthesis to the selected backend.
+
+    Backends yield WAV buffers (BytesIO) or, when they stream, PCMChunk samples, and None
+    for a sentence that failed (its error is already logged).
     """
     try:
         # Azure TTS generation
@@ -131,7 +281,7 @@ async def generate_tts_audio(text, ttsoption, is_wakeword=False, azure_api_key=N
                 yield chunk  
 
         elif ttsoption == "elevenlabs":
-            async for chunk in text_to_speech_with_pipelining_elevenlabs(text, is_wakeword):
+            async for chunk in text_to_speech_with_pipelining_elevenlabs(text):
                 yield chunk
 
         elif ttsoption == "silero":
@@ -139,7 +289,7 @@ async def generate_tts_audio(text, ttsoption, is_wakeword=False, azure_api_key=N
                 yield chunk 
 
         elif ttsoption == "openai":
-            async for chunk in text_to_speech_with_pipelining_openai(text, is_wakeword):
+            async for chunk in text_to_speech_with_pipelining_openai(text):
                 yield chunk
 
         else:
@@ -147,27 +297,94 @@ async def generate_tts_audio(text, ttsoption, is_wakeword=False, azure_api_key=N
 
     except Exception as e:
         queue_message(f"ERROR: Text-to-speech generation failed: {e}")
+        yield None
+
+def _decode_chunk(audio_chunk):
+    """
+    Return (samples, samplerate) for a backend chunk, or None if it cannot be decoded.
+    """
+    if isinstance(audio_chunk, PCMChunk):
+        # Streaming backends hand over raw samples; nothing to decode
+        return audio_chunk.samples, audio_chunk.samplerate
+    try:
+        return sf.read(audio_chunk, dtype='float32')
+    except Exception as e:
+        queue_message(f"ERROR: Failed to decode audio chunk: {e}")
+        return None
+
+def _produce_audio(text, ttsoption, is_wakeword, audio_queue, stop_event):
+    """
+    Synthesis side of the playback pipeline, run in its own thread with its own event loop.
+
+    Decoded chunks are put into the bounded `audio_queue`, so synthesis runs at most
+    `lookahead` chunks ahead of playback and never waits for a chunk to finish playing.
+    """
+    def put(item):
+        while not stop_event.is_set():
+            try:
+                audio_queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    async def produce():
+        async for audio_chunk in generate_tts_audio(text, ttsoption, is_wakeword):
+            decoded = _decode_chunk(audio_chunk)  # Decode here so the playback side only has to play
+            if decoded is None:
+                continue
+            if not put(decoded):
+                return
+
+    try:
+        asyncio.run(produce())
+    except Exception as e:
+        queue_message(f"ERROR: Text-to-speech producer failed: {e}")
+    finally:
+        put(_END_OF_AUDIO)
 
 async def play_audio_chunks(text, config, is_wakeword=False):
     """
     Plays audio chunks sequentially from the generate_tts_audio function.
     Calls stop_talking when done.
+
+    Synthesis runs in a producer thread that stays up to [TTS] lookahead chunks ahead,
+    so the next sentence is ready when the current one ends. Chunks are queued on the
+    persistent output stream and play back to back; stop_talking is sent once the last
+    one has actually been heard.
     """  
+    output = get_audio_output()
+    last_handle = None
+    audio_queue = queue.Queue(maxsize=max(1, CONFIG['TTS']['lookahead']))
+    stop_event = threading.Event()
+    producer = threading.Thread(
+        target=_produce_audio, args=(text, config, is_wakeword, audio_queue, stop_event),
+        name="TTSProducer", daemon=True,
+    )
+    producer.start()
+
+    try:
+        while True:
+            item = await asyncio.to_thread(audio_queue.get)
+            if item is _END_OF_AUDIO:
+                break
+            data, samplerate = item
+            try:
+                if last_handle is None:
+                    http_get(f"{CHATUI_URL}/start_talking", timeout=1, retries=0)
+                # Blocks only while the output buffer is full
+                last_handle = await asyncio.to_thread(output.play, data, samplerate)
 
-    async for audio_chunk in generate_tts_audio(text, config, is_wakeword):
-        try:
-            requests.get("http://127.0.0.1:5012/start_talking", timeout=1)
-            # Read the audio chunk into a format playable by sounddevice
-            data, samplerate = sf.read(audio_chunk, dtype='float32')
-            sd.play(data, samplerate, device=1)
-            await asyncio.sleep(len(data) / samplerate)  # Wait for playback to finish
-            
-        except Exception as e:
-            queue_message(f"ERROR: Failed to play audio chunk: {e}")
+            except Exception as e:
+                queue_message(f"ERROR: Failed to play audio chunk: {e}")
+        if last_handle is not None:
+            await asyncio.to_thread(last_handle.wait)  # Wait for playback to finish
+    finally:
+        stop_event.set()  # Lets the producer exit if playback stopped early
 
     # ✅ Call stop_talking when all audio chunks are played
     try:
-        requests.get("http://127.0.0.1:5012/stop_talking", timeout=1)
+        http_get(f"{CHATUI_URL}/stop_talking", timeout=1, retries=0)
     except requests.exceptions.RequestException as e:
         queue_message(f"ERROR: Failed to send stop_talking request: {e}")
 
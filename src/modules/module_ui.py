@@ -20,12 +20,12 @@ import subprocess
 import os
 import sounddevice as sd
 import json
-import requests
 from io import BytesIO
 from PIL import Image
 import socket
 
 from module_config import load_config
+from modules.module_http import http_get
 from UI.module_ui_camera import CameraModule
 from UI.module_ui_spectrum import SineWaveVisualizer, BarVisualizer
 from UI.module_ui_buttons import Button
@@ -217,7 +217,7 @@ class StreamingAvatar:
         while self.running:
             try:
                 #print(f"Connecting to stream at {self.stream_url}")
-                response = requests.get(self.stream_url, stream=True, timeout=5)
+                response = http_get(self.stream_url, stream=True, timeout=5, retries=0)
                 if response.status_code == 200:
                     #print("Connected to stream. Reading data...")
                     for chunk in response.iter_content(chunk_size=1024):
@@ -0,0 +1,83 @@
+"""
+module_utterance.py
+
+Per-utterance feature cache for the TARS-AI application.
+
+An UtteranceContext is created once per user turn by the entry point (voice, chat UI, Discord)
+and handed down to intent routing and memory retrieval. Features are computed lazily on first
+use and then shared, so the embedding model runs at most once per turn.
+"""
+
+# === Standard Libraries ===
+import re
+import threading
+
+# === Constants ===
+TOKEN_PATTERN = re.compile(r"(?u)\b\w\w+\b")  # Same tokens the intent vectorizer sees by default
+
+class UtteranceContext:
+    """
+    A user utterance with lazily computed, cached features.
+    """
+    def __init__(self, text, source="voice"):
+        """
+        Parameters:
+        - text (str): The raw utterance.
+        - source (str): Where it came from (voice, chatui, discord).
+        """
+        self.text = text
+        self.source = source
+        self._features = {}
+        self._lock = threading.RLock()
+
+    def __str__(self):
+        return self.text
+
+    def __repr__(self):
+        return f"UtteranceContext({self.text!r}, source={self.source!r})"
+
+    def feature(self, name, compute):
+        """
+        Return the feature `name`, computing it with `compute()` the first time it is requested.
+        """
+        with self._lock:
+            if name not in self._features:
+                self._features[name] = compute()
+            return self._features[name]
+
+    @property
+    def normalized(self):
+        """Lowercased text with collapsed whitespace."""
+        return self.feature("normalized", lambda: re.sub(r"\s+", " ", self.text).strip().lower())
+
+    @property
+    def intent_key(self):
+        """The token stream the intent vectorizer sees, used as the intent cache key."""
+        return self.feature("intent_key", lambda: " ".join(TOKEN_PATTERN.findall(self.normalized)))
+
+    @property
+    def embedding(self):
+        """Sentence embedding from the memory embedding model (all-MiniLM-L6-v2)."""
+        def compute():
+            from modules.module_hyperdb import get_embedding
+            return get_embedding([self.text])[0]
+        return self.feature("embedding", compute)
+
+    def bm25_tokens(self, stemmer=None):
+        """bm25s query tokens, as used by the hybrid memory search."""
+        def compute():
+            import bm25s
+            return bm25s.tokenize([self.text], stopwords="en", stemmer=stemmer)
+        return self.feature(("bm25_tokens", id(stemmer)), compute)
+
+    def tfidf_vector(self, vectorizer):
+        """Sparse intent vector for the given vectorizer (recomputed if the model is swapped)."""
+        return self.feature(("tfidf", id(vectorizer)), lambda: vectorizer.transform([self.intent_key]))
+
+def as_utterance(value, source="voice"):
+    """
+    Return `value` as an UtteranceContext, wrapping plain strings.
+    """
+    if isinstance(value, UtteranceContext):
+        return value
+    return UtteranceContext(value, source=source)
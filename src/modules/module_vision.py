@@ -2,7 +2,6 @@ import traceback
 from PIL import Image
 from transformers import BlipProcessor, BlipForConditionalGeneration
 from io import BytesIO
-import requests
 import torch
 import base64
 from datetime import datetime
@@ -10,6 +9,7 @@ from pathlib import Path
 
 # === Custom Modules ===
 from modules.module_config import load_config
+from modules.module_http import http_post
 from modules.module_messageQue import queue_message
 from UI.module_ui_camera import CameraModule  # Import once, no reinitialization in function calls
 
@@ -97,7 +97,7 @@ def send_image_to_server(image_path: str) -> str:
         with open(image_path, "rb") as img_file:
             files = {'image': ('image.jpg', img_file, 'image/jpeg')}
 
-            response = requests.post(f"{CONFIG['VISION']['base_url']}/caption", files=files)
+            response = http_post(f"{CONFIG['VISION']['base_url']}/caption", files=files, timeout=30)
 
             if response.status_code == 200:
                 return response.json().get("caption", "No caption returned")
@@ -4,6 +4,7 @@ import subprocess
 import re
 
 from modules.module_messageQue import queue_message
+from modules.module_fastpath import parse_volume
 
 class RaspbianVolumeManager:
     def __init__(self, control='Master'):
@@ -92,6 +93,11 @@ def handle_volume_command(user_input):
     # Correct the input text based on common misinterpretations
     user_input = correct_transcription(user_input)
 
+    parsed = parse_volume(user_input)
+    if parsed is None:
+        return "Volume control command not recognized. Please specify a valid action (e.g., increase, decrease, adjust, mute, unmute, set)."
+    action, amount = parsed
+
     volume_manager = RaspbianVolumeManager()  # Create volume manager instance
 
     current_volume = volume_manager.get_volume()
@@ -102,78 +108,48 @@ def handle_volume_command(user_input):
     #queue_message(f"TOOL: Current Volume {current_volume / 100:.2f}")  # Report the correct volume value
 
     # Handle specific volume commands
-    if "increase" in user_input.lower() or "raise" in user_input.lower():
-        increment = 10
-        if "by" in user_input.lower():
-            match = re.search(r'by (\d+)', user_input.lower())
-            if match:
-                increment = int(match.group(1))
-        new_volume = min(current_volume + increment, 100)
-        volume_manager.set_volume(new_volume)
+    if action == "increase":
+        increment = amount if amount is not None else 10
+        volume_manager.set_volume(min(current_volume + increment, 100))
         current_volume = volume_manager.get_volume()  # Ensure updated value is fetched
         return f"Volume increased by {increment}%. Current volume is {current_volume}%."
 
-    elif "decrease" in user_input.lower() or "lower" in user_input.lower():
-        decrement = 10
-        if "by" in user_input.lower():
-            match = re.search(r'by (\d+)', user_input.lower())
-            if match:
-                decrement = int(match.group(1))
-        new_volume = max(current_volume - decrement, 0)
-        volume_manager.set_volume(new_volume)
+    elif action == "decrease":
+        decrement = amount if amount is not None else 10
+        volume_manager.set_volume(max(current_volume - decrement, 0))
         current_volume = volume_manager.get_volume()  # Ensure updated value is fetched
         return f"Volume decreased by {decrement}%. Current volume is {current_volume}%."
 
-    elif "adjust" in user_input.lower():
-        if "up" in user_input.lower():
-            increment = 5
-            if "by" in user_input.lower():
-                match = re.search(r'by (\d+)', user_input.lower())
-                if match:
-                    increment = int(match.group(1))
-            new_volume = min(current_volume + increment, 100)
-            volume_manager.set_volume(new_volume)
-            current_volume = volume_manager.get_volume()  # Ensure updated value is fetched
-            return f"Volume adjusted up by {increment}%. Current volume is {current_volume}%."
-
-        elif "down" in user_input.lower():
-            decrement = 5
-            if "by" in user_input.lower():
-                match = re.search(r'by (\d+)', user_input.lower())
-                if match:
-                    decrement = int(match.group(1))
-            new_volume = max(current_volume - decrement, 0)
-            volume_manager.set_volume(new_volume)
-            current_volume = volume_manager.get_volume()  # Ensure updated value is fetched
-            return f"Volume adjusted down by {decrement}%. Current volume is {current_volume}%."
-        else:
-            return "Please specify 'up' or 'down' when using 'adjust'."
-
-    elif "set" in user_input.lower():
-        match = re.search(r'(\d{1,3})%', user_input)
-        if match:
-            volume = int(match.group(1))
-            if 0 <= volume <= 100:
-                volume_manager.set_volume(volume)
-                current_volume = volume_manager.get_volume()  # Ensure updated value is fetched
-                return f"Volume set to {volume}%. Current volume is {current_volume}%."
-            else:
-                return "Please provide a valid volume between 0 and 100."
-        else:
+    elif action == "adjust_up":
+        increment = amount if amount is not None else 5
+        volume_manager.set_volume(min(current_volume + increment, 100))
+        current_volume = volume_manager.get_volume()  # Ensure updated value is fetched
+        return f"Volume adjusted up by {increment}%. Current volume is {current_volume}%."
+
+    elif action == "adjust_down":
+        decrement = amount if amount is not None else 5
+        volume_manager.set_volume(max(current_volume - decrement, 0))
+        current_volume = volume_manager.get_volume()  # Ensure updated value is fetched
+        return f"Volume adjusted down by {decrement}%. Current volume is {current_volume}%."
+
+    elif action == "set":
+        if amount is None:
             return "Please specify the volume percentage."
+        if 0 <= amount <= 100:
+            volume_manager.set_volume(amount)
+            current_volume = volume_manager.get_volume()  # Ensure updated value is fetched
+            return f"Volume set to {amount}%. Current volume is {current_volume}%."
+        return "Please provide a valid volume between 0 and 100."
 
-    elif "mute" in user_input.lower():
+    elif action == "mute":
         volume_manager.set_volume(0)
         current_volume = volume_manager.get_volume()  # Ensure updated value is fetched
         return "Volume has been muted. Current volume is 0%."
 
-    elif "unmute" in user_input.lower() or "activate sound" in user_input.lower():
+    elif action == "unmute":
         default_volume = 50  # Default volume level when unmuting
         volume_manager.set_volume(default_volume)
         current_volume = volume_manager.get_volume()  # Ensure updated value is fetched
         return f"Volume has been unmuted. Current volume is {current_volume}%."
 
-    elif "check volume" in user_input.lower() or "current volume" in user_input.lower():
-        return f"The current volume is {current_volume}%."
-
-    return "Volume control command not recognized. Please specify a valid action (e.g., increase, decrease, adjust, mute, unmute, set)."
\ No newline at end of file
+    return f"The current volume is {current_volume}%."
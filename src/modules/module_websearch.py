@@ -1,28 +1,96 @@
-
 """
 module_websearch.py
 
 Web Search Module for TARS-AI Application.
 
-This module provides functionality for performing web searches using Selenium WebDriver. 
-It supports multiple search engines and allows for extracting specific content, links, 
-and structured data from search results.
+This module provides functionality for performing web searches. Result pages are fetched
+with the pooled HTTP client and parsed while they stream in, with byte and time limits;
+a headless browser (Selenium WebDriver) is only started for pages that need JavaScript.
+It supports multiple search engines and allows for extracting specific content, links,
+and structured data from search results. The Weather, News and Search tools query several
+providers at once, keep the first usable answer and cache it on disk per category.
 """
 
 # === Standard Libraries ===
 import os
 import sys
+import time
+import codecs
+import threading
+import concurrent.futures
 from contextlib import contextmanager
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options as ChromeOptions
-from selenium.webdriver.chrome.service import Service as ChromeService
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+from urllib.parse import quote_plus
 import atexit
 from datetime import datetime
 
+from modules.module_config import load_config
+from modules.module_http import http_get
+from modules.module_htmlselect import SelectorExtractor, extract
 from modules.module_messageQue import queue_message
+from modules.module_llmcache import LLMCache
+from modules.module_tools import is_cancelled, normalize_query, parse_tool_settings
+
+# === Constants ===
+CONFIG = load_config()
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))  # Move up to "src"
+DEBUG_PAGE = os.path.join(BASE_DIR, "engine", "debug.html")
+CHUNK_SIZE = 16 * 1024
+MIN_SNIPPET_CHARS = 40   # Shorter results (or none) do not end a fan-out search
+POLL_INTERVAL = 0.1      # Seconds between cancellation checks while providers run
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (X11; Linux aarch64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Safari/537.36",
+    "Accept-Language": "en-GB,en;q=0.8",
+}
+
+# Search providers: the HTTP page and its selectors, plus the JavaScript page used by the
+# browser fallback. Selector groups are concatenated in order into the result text.
+SEARCH_ENGINES = {
+    "google": {
+        "url": "https://www.google.com/search?hl=en&q=",
+        "content": {
+            "featured": ".wDYxhc",           # Featured snippets
+            "knowledge": ".hgKElc",          # Knowledge panels
+            "snippets": ".r025kc.lVm3ye",    # Page snippets
+            "compat": ".yDYNvb.lyLwlc",      # Additional selectors for compatibility
+            "basic": "div.BNeawe.s3v9rd.AP7Wnd, div.BNeawe.iBp4i.AP7Wnd",  # Non-JavaScript result page
+        },
+        "browser_url": "https://google.com/search?hl=en&q=",
+        "wait_for": "res",
+    },
+    "google_news": {
+        "url": "https://www.google.com/search?hl=en&gl=us&tbm=nws&q=",
+        "content": {"news": ".dURPMd, div.BNeawe.s3v9rd.AP7Wnd"},
+        "links": "a[href^='http']",
+        "browser_url": "https://google.com/search?hl=en&gl=us&tbm=nws&q=",
+        "wait_for": "res",
+    },
+    "duckduckgo": {
+        "url": "https://html.duckduckgo.com/html/?kp=-2&kl=wt-wt&q=",
+        "content": {"snippets": ".result__snippet"},
+        "links": "a.result__a",
+        "browser_url": "https://duckduckgo.com/?kp=-2&kl=wt-wt&q=",
+        "browser_content": '[data-result="snippet"]',
+        "wait_for": "res",
+    },
+    "mojeek": {
+        "url": "https://www.mojeek.com/search?q=",
+        "content": {"results": ".result-title, .result-desc, ul.results-standard a.title, ul.results-standard p.s"},
+        "links": ".result-title > a, ul.results-standard a.title",
+        "browser_url": "https://www.mojeek.com/search?q=",
+        "wait_for": "results",
+    },
+}
+
+# Providers queried concurrently per search category
+SEARCH_CATEGORIES = {
+    "weather": ["google", "duckduckgo", "mojeek"],
+    "news": ["google_news", "duckduckgo", "mojeek"],
+    "search": ["google", "duckduckgo", "mojeek"],
+}
+
+_executor = concurrent.futures.ThreadPoolExecutor(max_workers=6, thread_name_prefix="WebSearch")
+_caches = {}
+_caches_lock = threading.Lock()
 
 # === Helper Functions ===
 # Silence logs to suppress unnecessary outputs
@@ -47,6 +115,10 @@ def initialize_driver():
     Returns:
     - WebDriver: Configured Selenium WebDriver instance.
     """
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options as ChromeOptions
+    from selenium.webdriver.chrome.service import Service as ChromeService
+
     options = ChromeOptions()
     options.add_argument("--headless")  # Run in headless mode
     options.add_argument("--no-sandbox")  # Bypass OS security model
@@ -57,27 +129,41 @@ def initialize_driver():
     service = ChromeService(executable_path="/usr/bin/chromedriver")  # Path to the chromedriver
     return webdriver.Chrome(service=service, options=options)
 
+def start_driver():
+    """
+    Start the WebDriver if it is not running. Only the browser fallback needs it.
+    """
+    global driver
+    if driver is None:
+        queue_message("INFO: Starting headless browser for JavaScript pages...")
+        driver = initialize_driver()
+
 def quit_driver():
     """
-    Quit the WebDriver instance when the script ends.
+    Quit the WebDriver instance (tool registry shutdown hook, and when the script ends).
     """
+    global driver
     if driver:
         driver.quit()
+        driver = None
 
-def save_debug():
+def save_debug(page_source=None):
     """
-    Save the current page source for debugging purposes.
+    Save a page source for debugging purposes (the browser's current page by default).
     """
-    with open("engine/debug.html", "w", encoding='utf-8') as f:
-        f.write(driver.page_source)
+    with open(DEBUG_PAGE, "w", encoding='utf-8') as f:
+        f.write(page_source if page_source is not None else driver.page_source)
 
 def wait_for_element(element_id: str, delay: int = 10):
     """Wait for an element with a specific ID to be present."""
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
     try:
         WebDriverWait(driver, delay).until(EC.presence_of_element_located((By.ID, element_id)))
     except Exception:
         queue_message(f"ERROR: Element with ID '{element_id}' not found.")
-        
+
 def extract_text(selector):
     """
     Extract text content from elements matching the specified CSS selector.
@@ -88,6 +174,7 @@ def extract_text(selector):
     Returns:
     - str: Concatenated text content of matched elements.
     """
+    from selenium.webdriver.common.by import By
     return '\n'.join(el.text for el in driver.find_elements(By.CSS_SELECTOR, selector) if el and el.text).strip()
 
 def extract_links(selector):
@@ -100,9 +187,267 @@ def extract_links(selector):
     Returns:
     - list: List of extracted hyperlinks.
     """
+    from selenium.webdriver.common.by import By
     return [el.get_attribute('href') for el in driver.find_elements(By.CSS_SELECTOR, selector) if el and el.text]
 
+# === HTTP Fetching ===
+def fetch_page(url, selectors, max_bytes=None, timeout=None, cancel_event=None):
+    """
+    Download a page over the pooled HTTP client and extract the selectors while it streams.
+
+    Reading stops at `max_bytes`, at the `timeout` deadline, or when the calling tool (or
+    `cancel_event`) is cancelled; whatever was parsed up to that point is returned.
+
+    Parameters:
+    - url (str): Page URL.
+    - selectors (dict): Name -> CSS selector.
+    - max_bytes (int): Maximum bytes to read ([WEBSEARCH] max_bytes by default).
+    - timeout (float): Seconds for the whole download ([WEBSEARCH] fetch_timeout by default).
+    - cancel_event (threading.Event): Stops the download when set, e.g. by a fan-out search.
+
+    Returns:
+    - dict: Name -> list of {"text", "href"} matches.
+    """
+    max_bytes = max_bytes or CONFIG['WEBSEARCH']['max_bytes']
+    timeout = timeout or CONFIG['WEBSEARCH']['fetch_timeout']
+    deadline = time.monotonic() + timeout
+    parser = SelectorExtractor(selectors)
+
+    response = http_get(url, headers=HEADERS, timeout=timeout, stream=True, retries=0)
+    try:
+        response.raise_for_status()
+        decoder = codecs.getincrementaldecoder(response.encoding or "utf-8")(errors="replace")
+        received = 0
+        for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+            received += len(chunk)
+            parser.feed(decoder.decode(chunk))
+            if received >= max_bytes:
+                queue_message(f"INFO: Stopped reading {url} after {received} bytes.")
+                break
+            if time.monotonic() > deadline or is_cancelled() or (cancel_event and cancel_event.is_set()):
+                queue_message(f"INFO: Stopped reading {url} at the time limit.")
+                break
+    finally:
+        response.close()
+    return parser.close()
+
+def join_matches(results, names=None):
+    """
+    Join extracted matches into one text, selector group by selector group.
+    """
+    names = names or list(results)
+    return "\n".join(match["text"] for name in names for match in results.get(name, [])).strip()
+
+def _engine_selectors(engine):
+    spec = SEARCH_ENGINES[engine]
+    selectors = dict(spec["content"])
+    if spec.get("links"):
+        selectors["links"] = spec["links"]
+    return selectors
+
+def _engine_results(engine, results):
+    text = join_matches(results, list(SEARCH_ENGINES[engine]["content"]))
+    links = [match["href"] for match in results.get("links", []) if match["href"]]
+    return text, links
+
+def parse_search_page(engine, html):
+    """
+    Extract the result text and links from a provider's result page, e.g. a saved fixture.
+
+    Returns:
+    - tuple: Extracted text content and links.
+    """
+    return _engine_results(engine, extract(html, _engine_selectors(engine)))
+
+def browser_search(engine, query):
+    """
+    Load a provider's JavaScript result page in the headless browser and extract its text.
+
+    Returns:
+    - tuple: Extracted text content and links.
+    """
+    spec = SEARCH_ENGINES[engine]
+    start_driver()
+    driver.get(spec["browser_url"] + quote_plus(query))
+    wait_for_element(spec["wait_for"])  # Wait for page to load
+
+    content_selector = spec.get("browser_content") or ", ".join(spec["content"].values())
+    text = extract_text(content_selector)
+    links = extract_links(spec["links"]) if spec.get("links") else []
+    if not text:
+        save_debug()
+    return text, links
+
+def engine_search(engine, query):
+    """
+    Search a provider over HTTP, falling back to the browser when the page yields nothing
+    (typically because it is only rendered with JavaScript).
+
+    Parameters:
+    - engine (str): Key in SEARCH_ENGINES.
+    - query (str): The search query.
+
+    Returns:
+    - tuple: Extracted text content and links.
+    """
+    text, links = "", []
+    try:
+        results = fetch_page(SEARCH_ENGINES[engine]["url"] + quote_plus(query), _engine_selectors(engine))
+        text, links = _engine_results(engine, results)
+    except Exception as e:
+        queue_message(f"ERROR: {engine} request failed: {e}")
+
+    if text or is_cancelled() or not CONFIG['WEBSEARCH']['selenium_fallback']:
+        return text, links
+    queue_message(f"INFO: No {engine} results over HTTP, retrying in the browser.")
+    return browser_search(engine, query)
+
+# === Fan-out Search ===
+def get_search_cache(category):
+    """
+    Return the on-disk result cache for a search category, with the category's TTL.
+    """
+    with _caches_lock:
+        cache = _caches.get(category)
+        if cache is None:
+            ttls = parse_tool_settings(CONFIG['WEBSEARCH']['category_ttls'])
+            cache = LLMCache(
+                path=os.path.join(BASE_DIR, 'memory', f'search_cache_{category}.json'),
+                max_entries=CONFIG['WEBSEARCH']['cache_size'],
+                ttl=ttls.get(category, ttls.get("search", 86400)),
+            )
+            _caches[category] = cache
+    return cache
+
+def cache_key(query):
+    """Normalize a query for the result cache ("What's the weather?" == "what's the weather")."""
+    return normalize_query(query).rstrip("?!. ")
+
+def is_usable(text):
+    return bool(text) and len(text) >= MIN_SNIPPET_CHARS
+
+def _provider_search(engine, query, cancel_event):
+    results = fetch_page(SEARCH_ENGINES[engine]["url"] + quote_plus(query), _engine_selectors(engine),
+                         cancel_event=cancel_event)
+    return _engine_results(engine, results)[0]
+
+def fan_out_search(query, category="search"):
+    """
+    Query every provider of a category concurrently and return the first usable result.
+
+    The remaining downloads are cancelled as soon as one provider answers. If none gives a
+    usable snippet, the longest partial result is used, then the browser fallback. Results
+    are cached on disk per category ([WEBSEARCH] category_ttls).
+
+    Parameters:
+    - query (str): The search query.
+    - category (str): Key in SEARCH_CATEGORIES (weather, news or search).
+
+    Returns:
+    - str: The result text, empty if nothing was found.
+    """
+    key = cache_key(query)
+    cache = get_search_cache(category)
+    cached = cache.get(key)
+    if cached is not None:
+        queue_message(f"INFO: Using cached {category} result for: {query}")
+        return cached
+
+    engines = [engine for engine in CONFIG['WEBSEARCH']['providers'] if engine in SEARCH_CATEGORIES[category]] \
+        or SEARCH_CATEGORIES[category]
+    news_engines = {"google": "google_news"} if category == "news" else {}
+    engines = [news_engines.get(engine, engine) for engine in engines]
+
+    cancel_event = threading.Event()
+    futures = {_executor.submit(_provider_search, engine, query, cancel_event): engine for engine in engines}
+    pending = set(futures)
+    deadline = time.monotonic() + CONFIG['WEBSEARCH']['fetch_timeout'] + 1
+    winner, partial = "", ""
+    try:
+        while pending and not winner and time.monotonic() < deadline and not is_cancelled():
+            done, pending = concurrent.futures.wait(pending, timeout=POLL_INTERVAL,
+                                                    return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                try:
+                    text = future.result()
+                except Exception as e:
+                    queue_message(f"ERROR: {futures[future]} request failed: {e}")
+                    continue
+                if is_usable(text):
+                    queue_message(f"INFO: {futures[future]} answered first.")
+                    winner = text
+                    break
+                if len(text) > len(partial):
+                    partial = text
+    finally:
+        cancel_event.set()
+        for future in pending:
+            future.cancel()
+
+    winner = winner or partial
+    if not winner and CONFIG['WEBSEARCH']['selenium_fallback'] and not is_cancelled():
+        queue_message(f"INFO: No {category} results over HTTP, retrying in the browser.")
+        winner, _ = browser_search(engines[0], query)
+    if winner:
+        cache.put(key, winner)
+    return winner
+
+def save_search_caches():
+    """
+    Flush the search result caches to disk.
+    """
+    with _caches_lock:
+        caches = list(_caches.values())
+    for cache in caches:
+        cache.save()
+
+def close_search():
+    """
+    Quit the browser and flush the result caches (tool registry shutdown hook).
+    """
+    quit_driver()
+    save_search_caches()
+
 # === Search Functions ===
+def search_weather(query):
+    """
+    Look up the weather on all providers at once.
+
+    Parameters:
+    - query (str): The user's weather question.
+
+    Returns:
+    - str: The first usable result.
+    """
+    queue_message(f"INFO: Searching the weather for: {query}")
+    return fan_out_search(query, "weather")
+
+def search_news(query):
+    """
+    Search news on all providers at once.
+
+    Parameters:
+    - query (str): The search query.
+
+    Returns:
+    - str: The first usable result.
+    """
+    queue_message(f"INFO: Searching news for: {query}")
+    return fan_out_search(query, "news")
+
+def search_web(query):
+    """
+    Search the web on all providers at once.
+
+    Parameters:
+    - query (str): The search query.
+
+    Returns:
+    - str: The first usable result.
+    """
+    queue_message(f"INFO: Searching the web for: {query}")
+    return fan_out_search(query, "search")
+
 def search_query(url, query, content_selector, link_selector=None):
     """
     Perform a web search and extract content and links.
@@ -116,11 +461,12 @@ def search_query(url, query, content_selector, link_selector=None):
     Returns:
     - tuple: Extracted text content and links (if applicable).
     """
-    driver.get(url + query)
-    wait_for_element('res')  # Wait for page to load
-
-    content = extract_text(content_selector)
-    links = extract_links(link_selector) if link_selector else []
+    selectors = {"content": content_selector}
+    if link_selector:
+        selectors["links"] = link_selector
+    results = fetch_page(url + quote_plus(query), selectors)
+    content = join_matches(results, ["content"])
+    links = [match["href"] for match in results.get("links", []) if match["href"]]
     return content, links
 
 def search_google(query):
@@ -131,26 +477,11 @@ def search_google(query):
     - query (str): The search query.
 
     Returns:
-    - tuple: Extracted content and links.
+    - str: Extracted content.
     """
     queue_message(f"INFO: Searching Google for: {query}")
-    driver.get("https://google.com/search?hl=en&q=" + query)
-    wait_for_element('res')
-    save_debug()
-
-    text = ""
-    # Featured snippets
-    text += extract_text('.wDYxhc')
-    queue_message(f"INFO: Featured snippets: {text}")
-    # Knowledge panels
-    text += extract_text('.hgKElc')
-    queue_message(f"INFO: Knowledge panels: {text}")
-    # Page snippets
-    text += extract_text('.r025kc.lVm3ye')
-    queue_message(f"INFO: Page snippets: {text}")
-    # Additional selectors for compatibility
-    text += extract_text('.yDYNvb.lyLwlc')
-
+    text, _ = engine_search("google", query)
+    queue_message(f"INFO: Google results: {text}")
     return text
 
 def search_google_news(query):
@@ -164,11 +495,7 @@ def search_google_news(query):
     - tuple: Extracted content and links.
     """
     queue_message(f"INFO: Fetching Google News for: {query}")
-    return search_query(
-        "https://google.com/search?hl=en&gl=us&tbm=nws&q=",
-        query,
-        ".dURPMd"
-    )
+    return engine_search("google_news", query)
 
 def search_duckduckgo(query):
     """
@@ -181,11 +508,7 @@ def search_duckduckgo(query):
     - tuple: Extracted content and links.
     """
     queue_message(f"INFO: Searching DuckDuckGo for: {query}")
-    return search_query(
-        "https://duckduckgo.com/?kp=-2&kl=wt-wt&q=",
-        query,
-        '[data-result="snippet"]'
-    )
+    return engine_search("duckduckgo", query)
 
 def search_mojeek(query):
     """
@@ -195,25 +518,16 @@ def search_mojeek(query):
     - query (str): The search query.
 
     Returns:
-    - tuple: Extracted content and links.
+    - str: Extracted titles and descriptions.
     """
     queue_message(f"INFO: Searching Mojeek for: {query}")
-    base_url = "https://www.mojeek.com/search?q="
-    full_url = base_url + query
-
-    # Load the page
-    driver.get(full_url)
-    wait_for_element("results")  # Wait for results container to load
-
-    # Extract search result snippets
-    content = extract_text(".result-title, .result-desc")  # Titles and descriptions
-    links = extract_links(".result-title > a")  # Result links
-
+    content, _ = engine_search("mojeek", query)
     return content
 
 def search_mojeek_summary(query):
     """
-    Perform a search on Mojeek and extract the summary text. Includes debugging information.
+    Perform a search on Mojeek and extract the summary text. The summary box is rendered
+    with JavaScript, so this always uses the browser.
 
     Parameters:
     - query (str): The search query.
@@ -221,25 +535,19 @@ def search_mojeek_summary(query):
     Returns:
     - str: The extracted summary text, or an error message if not found.
     """
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+
     queue_message(f"INFO: Searching Mojeek for: {query}")
     base_url = "https://www.mojeek.com/search?q="
-    full_url = base_url + query
+    full_url = base_url + quote_plus(query)
 
     try:
         # Load the Mojeek search results page
+        start_driver()
         driver.get(full_url)
 
-        # Save page source for debugging
-        save_debug()
-
-        # Print all elements with 'id=kalid' for verification
-        elements = driver.find_elements(By.ID, "kalid")
-        if not elements:
-            queue_message("DEBUG: No elements with ID 'kalid' found.")
-        else:
-            for el in elements:
-                queue_message("DEBUG: Found element with ID 'kalid':", el.get_attribute("outerHTML"))
-
         # Wait for the summary box to load
         WebDriverWait(driver, 10).until(
             EC.presence_of_element_located((By.CSS_SELECTOR, "div#kalid.infobox-right.llm-ib"))
@@ -251,10 +559,14 @@ def search_mojeek_summary(query):
         return summary
 
     except Exception as e:
+        # Save page source for debugging
+        if driver is not None:
+            save_debug()
         queue_message(f"ERROR: Unable to extract summary. {e}")
         return "Summary not found. Check debug.html for details."
 
 
 # === Initialize and Cleanup ===
-driver = initialize_driver()
-atexit.register(quit_driver)
+# The browser is started by start_driver() only when a page needs JavaScript.
+driver = None
+atexit.register(close_search)